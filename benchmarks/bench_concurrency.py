@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark upload throughput for different --jobs values against a local mock PeerTube server.
+
+Usage:
+    python benchmarks/bench_concurrency.py [--files 40] [--size 2M] [--latency 0.05] [--jobs 1,2,4,8]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from peertube_uploader.client import PeerTubeClient
+from peertube_uploader.scheduler import UploadScheduler
+from peertube_uploader.throttle import BandwidthLimiter, parse_rate
+from tests.peertube_stub import PeerTubeStub, StubConfig
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=40, help="Number of synthetic videos")
+    parser.add_argument("--size", type=parse_rate, default=parse_rate("2M"), help="Size of each video")
+    parser.add_argument("--latency", type=float, default=0.05, help="Server delay per request (s)")
+    parser.add_argument("--jobs", default="1,2,4,8", help="Comma-separated job counts")
+    parser.add_argument("--max-bandwidth", type=parse_rate, default=None, help="Total bandwidth cap")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = []
+        for i in range(args.files):
+            path = os.path.join(tmp, f"bench{i:03d}_1.1_en.mp4")
+            with open(path, "wb") as f:
+                f.write(os.urandom(args.size))
+            files.append(path)
+
+        for jobs in (int(j) for j in args.jobs.split(",")):
+            with PeerTubeStub() as stub:
+                stub.latency = args.latency
+                limiter = BandwidthLimiter(args.max_bandwidth) if args.max_bandwidth else None
+                client = PeerTubeClient(StubConfig(stub.url), limiter=limiter)
+                scheduler = UploadScheduler(
+                    lambda idx, path: client.upload_video(path, os.path.basename(path)),
+                    jobs=jobs,
+                )
+                start = time.perf_counter()
+                results = scheduler.run(files)
+                elapsed = time.perf_counter() - start
+            total_bytes = args.size * args.files
+            print(json.dumps({
+                "jobs": jobs,
+                "files": args.files,
+                "failed": sum(1 for r in results if not r.ok),
+                "seconds": round(elapsed, 3),
+                "files_per_second": round(args.files / elapsed, 2),
+                "megabytes_per_second": round(total_bytes / elapsed / 1e6, 2),
+            }))
+
+
+if __name__ == "__main__":
+    main()
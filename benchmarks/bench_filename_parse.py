@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark parse_filename against the separate extract_* functions.
+
+Checks that both produce identical results on every synthetic filename,
+then reports the time taken by each approach.
+
+Usage:
+    python benchmarks/bench_filename_parse.py [--count 1000000]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from peertube_uploader.utils import (
+    extract_course_index,
+    extract_language,
+    extract_part_chapter,
+    parse_filename,
+    parse_filenames,
+)
+
+_TEMPLATES = [
+    "{course}_{part}.{chapter}_{lang}.mp4",
+    "{course}-{part}.{chapter}-{lang}.mp4",
+    "{course}_{part}.{chapter}_{speaker}_{lang}-{region}.mp4",
+    "{course}_{part}.{chapter}_{lang}_{region}.mp4",
+    "/archive/{course}/{lang}/{course}_{part}.{chapter}_{lang}_final.MP4",
+    "intro_{speaker}.mp4",
+]
+
+
+def synthetic_names(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    courses = [f"{a}{n:03d}" for a in ("btc", "cyp", "lnp", "eco", "BTC") for n in range(101, 111)]
+    langs = ["en", "fr", "es", "de", "it", "pt", "ja", "zh"]
+    for _ in range(count):
+        yield rng.choice(_TEMPLATES).format(
+            course=rng.choice(courses),
+            part=rng.randint(1, 12),
+            chapter=rng.randint(1, 20),
+            lang=rng.choice(langs),
+            region=rng.choice(["US", "BR", "CA"]),
+            speaker=rng.choice(["Loic", "Rogzy", "Fanis"]),
+        )
+
+
+def legacy_parse(name: str):
+    """Parse one name with the separate extract_* functions."""
+    try:
+        course = extract_course_index(name)
+    except ValueError:
+        course = None
+    try:
+        part, chapter = extract_part_chapter(name)
+    except ValueError:
+        part = chapter = None
+    try:
+        lang = extract_language(name)
+    except ValueError:
+        lang = None
+    return course, part, chapter, lang
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=1_000_000, help="Number of filenames")
+    args = parser.parse_args()
+
+    names = list(synthetic_names(args.count))
+
+    start = time.perf_counter()
+    legacy = [legacy_parse(n) for n in names]
+    legacy_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    single = [parse_filename(n) for n in names]
+    single_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = parse_filenames(names)
+    batch_s = time.perf_counter() - start
+
+    mismatches = sum(1 for old, new in zip(legacy, single) if old != tuple(new[:4]))
+    mismatches += sum(1 for a, b in zip(single, batch) if a != b)
+    print(json.dumps({
+        "filenames": args.count,
+        "mismatches": mismatches,
+        "extract_functions_seconds": round(legacy_s, 3),
+        "parse_filename_seconds": round(single_s, 3),
+        "parse_filenames_seconds": round(batch_s, 3),
+        "speedup": round(legacy_s / single_s, 2),
+        "batch_speedup": round(legacy_s / batch_s, 2),
+    }))
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
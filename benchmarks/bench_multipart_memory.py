@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark peak memory of building an upload body for large video files.
+
+Each measurement runs in a fresh subprocess so peak RSS is not shared between
+sizes. Synthetic files are sparse, so they take no real disk space.
+
+Usage:
+    python benchmarks/bench_multipart_memory.py [--sizes 100M,1G,4G] [--legacy]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_UNITS = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+
+def parse_size(text: str) -> int:
+    text = text.strip().upper()
+    if text[-1] in _UNITS:
+        return int(float(text[:-1]) * _UNITS[text[-1]])
+    return int(text)
+
+
+def _peak_rss_bytes() -> int:
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _measure(path: str, mode: str) -> None:
+    """Child process: build the body once and print peak RSS as JSON."""
+    baseline = _peak_rss_bytes()
+    start = time.perf_counter()
+    if mode == "streaming":
+        from peertube_uploader.multipart import MultipartEncoder
+        body = MultipartEncoder({"name": "bench", "privacy": 1}, "videofile", path)
+        sent = 0
+        for piece in body:
+            sent += len(piece)
+    else:
+        import requests
+        with open(path, "rb") as f:
+            prepared = requests.Request(
+                "POST",
+                "http://localhost/api/v1/videos/upload",
+                files={"name": (None, "bench"), "videofile": ("bench.mp4", f, "video/mp4")},
+            ).prepare()
+        sent = len(prepared.body)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({
+        "mode": mode,
+        "file_bytes": os.path.getsize(path),
+        "body_bytes": sent,
+        "peak_rss_bytes": _peak_rss_bytes(),
+        "peak_rss_delta_bytes": _peak_rss_bytes() - baseline,
+        "seconds": round(elapsed, 3),
+    }))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="100M,1G,4G", help="Comma-separated file sizes")
+    parser.add_argument(
+        "--legacy",
+        action="store_true",
+        help="Also measure requests' in-memory files= encoding (needs RAM >= file size)",
+    )
+    parser.add_argument("--child", nargs=2, metavar=("PATH", "MODE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _measure(*args.child)
+        return
+
+    modes = ["streaming"] + (["legacy"] if args.legacy else [])
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in (parse_size(s) for s in args.sizes.split(",")):
+            path = os.path.join(tmp, f"synthetic_{size}.mp4")
+            with open(path, "wb") as f:
+                f.truncate(size)
+            for mode in modes:
+                out = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "--child", path, mode],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                )
+                print(out.stdout.strip())
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Simulate the makespan of each upload ordering policy on a file size distribution.
+
+Sizes come from a metrics report written with --metrics-out (JSON or CSV), a
+text file with one size in bytes per line, a folder to scan, or, by default,
+a synthetic log-normal distribution with a few very large files.
+
+Usage:
+    python benchmarks/bench_ordering.py [--sizes metrics.json | --scan /videos] [--jobs 1,2,4,8]
+        [--bandwidth 10M] [--overhead 0.5]
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from peertube_uploader.finder import ScanEntry, scan_mp4_files
+from peertube_uploader.ordering import makespans
+from peertube_uploader.throttle import parse_rate
+
+
+def load_sizes(path: str) -> List[ScanEntry]:
+    """Read recorded sizes; the recorded order stands in for scan order and mtime."""
+    if path.lower().endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            rows = json.load(f)["files"]
+    elif path.lower().endswith(".csv"):
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            rows = list(csv.DictReader(f))
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            rows = [{"size": line} for line in f if line.strip()]
+    return [
+        ScanEntry(row.get("path") or f"file{i:05d}.mp4", int(row["size"]), i)
+        for i, row in enumerate(rows)
+    ]
+
+
+def synthetic_sizes(count: int, seed: int) -> List[ScanEntry]:
+    rng = random.Random(seed)
+    entries = []
+    for i in range(count):
+        # Mostly 20-300 MB lectures, with the odd multi-GB recording
+        size = int(rng.lognormvariate(18.5, 0.8))
+        if rng.random() < 0.02:
+            size *= 20
+        entries.append(ScanEntry(f"abc{i % 7:03d}_{i % 5 + 1}.{i % 11 + 1}_en.mp4", size, rng.randrange(10**9)))
+    return entries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--sizes", help="Metrics report (.json/.csv) or file of sizes")
+    source.add_argument("--scan", help="Folder whose .mp4 files are used")
+    parser.add_argument("--files", type=int, default=500, help="Synthetic file count")
+    parser.add_argument("--seed", type=int, default=1, help="Synthetic distribution seed")
+    parser.add_argument("--jobs", default="1,2,4,8", help="Comma-separated job counts")
+    parser.add_argument("--bandwidth", type=parse_rate, default=parse_rate("10M"), help="Upload rate per job")
+    parser.add_argument("--overhead", type=float, default=0.5, help="Fixed seconds per file")
+    args = parser.parse_args()
+
+    if args.sizes:
+        entries = load_sizes(args.sizes)
+    elif args.scan:
+        entries = list(scan_mp4_files(args.scan))
+    else:
+        entries = synthetic_sizes(args.files, args.seed)
+
+    durations = [args.overhead + e.size / args.bandwidth for e in entries]
+    for jobs in (int(j) for j in args.jobs.split(",")):
+        # No schedule can beat an even split of the work or the longest file
+        lower_bound = max(sum(durations) / jobs, max(durations, default=0.0))
+        for policy, makespan in makespans(entries, jobs, args.bandwidth, args.overhead).items():
+            print(json.dumps({
+                "jobs": jobs,
+                "policy": policy,
+                "files": len(entries),
+                "makespan_s": round(makespan, 1),
+                "vs_lower_bound": round(makespan / lower_bound, 3) if lower_bound else None,
+            }))
+
+
+if __name__ == "__main__":
+    main()
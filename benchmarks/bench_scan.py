@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark cold and warm directory scans on a generated course tree.
+
+Compares the previous os.walk scanner, a scandir scan without an index, a
+cold scan that builds the index, and a warm scan that reuses it.
+
+Usage:
+    python benchmarks/bench_scan.py [--dirs 2000] [--files-per-dir 50] [--mp4-ratio 0.2]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from peertube_uploader.finder import ScanIndex, scan_mp4_files
+
+
+def walk_mp4_files(directory: str):
+    """The original os.walk-based scanner, kept for comparison."""
+    for root, dirs, files in os.walk(directory):
+        for name in files:
+            if name.lower().endswith(".mp4"):
+                yield os.path.join(root, name)
+
+
+def build_tree(root: str, dirs: int, files_per_dir: int, mp4_ratio: float) -> None:
+    per_course = 20
+    mp4_every = max(1, round(1 / mp4_ratio)) if mp4_ratio > 0 else files_per_dir + 1
+    for d in range(dirs):
+        path = os.path.join(root, f"course{d // per_course:03d}", f"part{d % per_course:02d}")
+        os.makedirs(path, exist_ok=True)
+        for i in range(files_per_dir):
+            ext = ".mp4" if i % mp4_every == 0 else ".txt"
+            open(os.path.join(path, f"abc{d:03d}_{i}.{i % 9}_en{ext}"), "wb").close()
+
+
+def timed(label: str, fn) -> dict:
+    start = time.perf_counter()
+    count = sum(1 for _ in fn())
+    return {"scan": label, "files": count, "seconds": round(time.perf_counter() - start, 4)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dirs", type=int, default=2000, help="Number of leaf directories")
+    parser.add_argument("--files-per-dir", type=int, default=50, help="Files per directory")
+    parser.add_argument("--mp4-ratio", type=float, default=0.2, help="Fraction of files that are .mp4")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tree = os.path.join(tmp, "tree")
+        build_tree(tree, args.dirs, args.files_per_dir, args.mp4_ratio)
+        index_path = os.path.join(tmp, "scan_index.json")
+
+        def cold_indexed():
+            index = ScanIndex(index_path)
+            yield from scan_mp4_files(tree, index)
+            index.save()
+
+        results = [
+            timed("os.walk", lambda: walk_mp4_files(tree)),
+            timed("scandir", lambda: scan_mp4_files(tree)),
+            timed("scandir+index cold", cold_indexed),
+            timed("scandir+index warm", lambda: scan_mp4_files(tree, ScanIndex(index_path))),
+        ]
+        for result in results:
+            print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Measure CLI startup: import time of the CLI module and `--help` wall time.
+
+Runs ``python -X importtime`` in fresh interpreters and reports the best
+cumulative import time, the slowest imported modules, and which heavy
+dependencies (requests, urllib3, aiohttp, process pools) got loaded.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5] [--top 10]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("requests", "urllib3", "aiohttp", "concurrent.futures.process", "dotenv")
+
+
+def import_times(module: str) -> Dict[str, int]:
+    """
+    Import ``module`` in a fresh interpreter; return cumulative µs per imported module.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        fields = line.split("|")
+        if not line.startswith("import time:") or len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        times[fields[2].strip()] = int(fields[1])
+    return times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="upload_folder_peertube", help="Module to import")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to start")
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules to list")
+    args = parser.parse_args()
+
+    best = None
+    for _ in range(args.runs):
+        times = import_times(args.module)
+        if best is None or times[args.module] < best[args.module]:
+            best = times
+
+    help_s = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, os.path.join(ROOT, "upload_folder_peertube.py"), "--help"],
+            cwd=ROOT, capture_output=True, check=True,
+        )
+        help_s.append(time.perf_counter() - start)
+
+    slowest = sorted(
+        ((name, us) for name, us in best.items() if name != args.module),
+        key=lambda item: item[1], reverse=True,
+    )[:args.top]
+    print(json.dumps({
+        "module": args.module,
+        "import_ms": round(best[args.module] / 1000, 1),
+        "help_wall_ms": round(min(help_s) * 1000, 1),
+        "heavy_modules_loaded": [name for name in HEAVY_MODULES if name in best],
+        "slowest": [{"module": name, "ms": round(us / 1000, 1)} for name, us in slowest],
+    }))
+
+
+if __name__ == "__main__":
+    main()
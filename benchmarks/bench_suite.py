@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Run upload scenarios against the local mock PeerTube server and report JSON.
+
+Scenarios:
+    token_churn   small uploads with 1-second tokens, so tokens are refreshed throughout
+    small_files   1000 small files through the single-request upload
+    huge_files    a few large (sparse) files through the resumable upload
+    parallel      the same batch with 1, 4 and 8 jobs over a capped, high-latency link
+    errors        small uploads with 5% of requests failing with 503 (retried)
+
+Each result is printed as a JSON line. --output writes all results, the git
+commit and the Python version to one file; --compare prints the change in
+time per scenario against such a file from another commit.
+
+Usage:
+    python benchmarks/bench_suite.py [--scenarios small_files,parallel] [--scale 0.1]
+        [--repeat 3] [--output results.json] [--compare baseline.json]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from peertube_uploader.client import PeerTubeClient
+from peertube_uploader.metrics import MetricsRecorder
+from peertube_uploader.scheduler import UploadScheduler
+from peertube_uploader.session import HttpSession
+from peertube_uploader.throttle import parse_rate
+from tests.peertube_stub import PeerTubeStub, StubConfig
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_files(directory: str, count: int, size: int, sparse: bool = False) -> List[str]:
+    """
+    Create ``count`` files of ``size`` bytes (sparse files need no disk space).
+    """
+    os.makedirs(directory, exist_ok=True)
+    payload = b"" if sparse else os.urandom(size)
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"bench{i:04d}_1.1_en.mp4")
+        with open(path, "wb") as f:
+            if sparse:
+                f.truncate(size)
+            else:
+                f.write(payload)
+        paths.append(path)
+    return paths
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run_uploads(
+    stub: PeerTubeStub,
+    files: List[str],
+    jobs: int = 1,
+    resumable: bool = False,
+    chunk_size: int = 8 * 1024 * 1024,
+) -> Dict[str, Any]:
+    """
+    Upload ``files`` to ``stub`` and return timing, throughput and request counts.
+    """
+    metrics = MetricsRecorder()
+    client = PeerTubeClient(
+        StubConfig(stub.url), session=HttpSession(pool_size=jobs + 1), metrics=metrics
+    )
+
+    def upload(idx: int, path: str) -> Dict[str, Any]:
+        with metrics.track(path, os.path.getsize(path)):
+            if resumable:
+                return client.upload_video_resumable(path, "bench", chunk_size=chunk_size)
+            return client.upload_video(path, "bench")
+
+    start = time.perf_counter()
+    results = UploadScheduler(upload, jobs=jobs).run(files)
+    elapsed = time.perf_counter() - start
+    rows = [record.to_dict() for record in metrics.records]
+    durations = [row["duration_s"] for row in rows if row.get("duration_s") is not None]
+    sent = sum(os.path.getsize(path) for path in files)
+    stats = client.session.stats()
+    return {
+        "files": len(files),
+        "failed": sum(1 for r in results if not r.ok),
+        "seconds": round(elapsed, 3),
+        "files_per_s": round(len(files) / elapsed, 2),
+        "mb_per_s": round(sent / elapsed / 1e6, 2),
+        "p50_file_s": round(percentile(durations, 50) or 0, 4),
+        "p95_file_s": round(percentile(durations, 95) or 0, 4),
+        "requests": stats["requests"],
+        "connections": stats["connections"],
+        "retries": stats["retries"],
+        "token_grants": stub.token_grants,
+        "token_refresh_s": round(sum(row.get("token_refresh_s") or 0 for row in rows), 4),
+    }
+
+
+def token_churn(tmp: str, scale: float) -> List[Dict[str, Any]]:
+    files = make_files(os.path.join(tmp, "churn"), max(10, int(300 * scale)), 16 * 1024)
+    with PeerTubeStub() as stub:
+        stub.token_ttl = 1
+        stub.latency = 0.01
+        result = run_uploads(stub, files, jobs=4)
+    return [dict(result, params={"token_ttl_s": 1, "latency_s": 0.01, "jobs": 4})]
+
+
+def small_files(tmp: str, scale: float) -> List[Dict[str, Any]]:
+    files = make_files(os.path.join(tmp, "small"), max(10, int(1000 * scale)), 32 * 1024)
+    with PeerTubeStub() as stub:
+        stub.latency = 0.002
+        result = run_uploads(stub, files, jobs=4)
+    return [dict(result, params={"size": 32 * 1024, "latency_s": 0.002, "jobs": 4})]
+
+
+def huge_files(tmp: str, scale: float) -> List[Dict[str, Any]]:
+    size = max(parse_rate("16M"), int(parse_rate("1G") * scale))
+    files = make_files(os.path.join(tmp, "huge"), 3, size, sparse=True)
+    with PeerTubeStub() as stub:
+        stub.keep_data = False
+        result = run_uploads(stub, files, jobs=3, resumable=True)
+    return [dict(result, params={"size": size, "jobs": 3, "resumable": True, "chunk_size": 8 * 1024 * 1024})]
+
+
+def parallel(tmp: str, scale: float) -> List[Dict[str, Any]]:
+    files = make_files(os.path.join(tmp, "parallel"), max(8, int(40 * scale)), parse_rate("2M"))
+    results = []
+    for jobs in (1, 4, 8):
+        with PeerTubeStub() as stub:
+            stub.latency = 0.05
+            stub.bandwidth = 50_000_000
+            stub.keep_data = False
+            result = run_uploads(stub, files, jobs=jobs)
+        results.append(dict(result, params={"latency_s": 0.05, "bandwidth": 50_000_000, "jobs": jobs}))
+    return results
+
+
+def errors(tmp: str, scale: float) -> List[Dict[str, Any]]:
+    files = make_files(os.path.join(tmp, "errors"), max(10, int(200 * scale)), 32 * 1024)
+    with PeerTubeStub() as stub:
+        stub.error_rate = 0.05
+        result = run_uploads(stub, files, jobs=4)
+    return [dict(result, params={"error_rate": 0.05, "jobs": 4})]
+
+
+SCENARIOS: Dict[str, Callable[[str, float], List[Dict[str, Any]]]] = {
+    "token_churn": token_churn,
+    "small_files": small_files,
+    "huge_files": huge_files,
+    "parallel": parallel,
+    "errors": errors,
+}
+
+
+def result_key(result: Dict[str, Any]) -> str:
+    return f"{result['scenario']}[jobs={result['params'].get('jobs', 1)}]"
+
+
+def git_commit() -> Optional[str]:
+    try:
+        proc = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True
+        )
+    except OSError:
+        return None
+    return proc.stdout.strip() or None
+
+
+def compare(baseline_path: str, results: List[Dict[str, Any]]) -> None:
+    """
+    Print the change in seconds per scenario against an earlier --output file.
+    """
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    before = {result_key(r): r for r in baseline["results"]}
+    for result in results:
+        old = before.get(result_key(result))
+        if old is None or not old["seconds"]:
+            continue
+        print(json.dumps({
+            "compare": result_key(result),
+            "baseline_commit": baseline.get("commit"),
+            "baseline_seconds": old["seconds"],
+            "seconds": result["seconds"],
+            "change_pct": round((result["seconds"] / old["seconds"] - 1) * 100, 1),
+        }))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--scenarios", default=",".join(SCENARIOS), help="Comma-separated scenarios to run"
+    )
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="Multiply file counts and sizes (e.g. 0.1 for a quick run)"
+    )
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per scenario; the fastest is kept")
+    parser.add_argument("--output", default=None, help="Write all results to this JSON file")
+    parser.add_argument("--compare", default=None, help="Earlier --output file to compare against")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"Unknown scenario(s): {', '.join(unknown)}")
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in names:
+            best: Optional[List[Dict[str, Any]]] = None
+            for _ in range(args.repeat):
+                runs = SCENARIOS[name](tmp, args.scale)
+                if best is None or sum(r["seconds"] for r in runs) < sum(r["seconds"] for r in best):
+                    best = runs
+            for result in best:
+                result = dict(result, scenario=name)
+                results.append(result)
+                print(json.dumps(result))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "commit": git_commit(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "scale": args.scale,
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "results": results,
+            }, f, indent=2)
+    if args.compare:
+        compare(args.compare, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Asyncio client for uploading many videos to PeerTube from one thread.
+
+Requires the optional ``aiohttp`` dependency (``pip install peertube_uploader[async]``).
+"""
+import asyncio
+import os
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple, Union
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from .client import PROFILE_TTL, find_channel
+from .config import Config
+from .multipart import DEFAULT_BUFFER_SIZE, MultipartEncoder
+from .scheduler import UploadResult
+from .token_manager import TokenManager
+
+
+class AsyncPeerTubeClient:
+    """
+    Asyncio counterpart of ``PeerTubeClient`` built on aiohttp.
+
+    Mirrors ``get_channel_id`` and ``upload_video`` as coroutines. File
+    bodies are streamed with reads run in the default executor, so dozens of
+    uploads can be in flight from a single thread. Token refresh is delegated
+    to a (thread-safe) ``TokenManager``, which may be shared with a
+    synchronous ``PeerTubeClient``. Use as an async context manager.
+    """
+    def __init__(
+        self,
+        config: Config,
+        token_manager: Optional[TokenManager] = None,
+        max_connections: int = 100,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+    ) -> None:
+        if aiohttp is None:
+            raise ImportError("AsyncPeerTubeClient requires aiohttp: pip install aiohttp")
+        self.config: Config = config
+        self.token_manager: TokenManager = token_manager or TokenManager(config)
+        self.max_connections: int = max_connections
+        self.buffer_size: int = buffer_size
+        self._session: Optional["aiohttp.ClientSession"] = None
+        self._profile: Optional[Dict[str, Any]] = None
+        self._profile_expires: float = 0.0
+        self._profile_lock: Optional[asyncio.Lock] = None
+
+    async def __aenter__(self) -> "AsyncPeerTubeClient":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.close()
+
+    @property
+    def session(self) -> "aiohttp.ClientSession":
+        if self._session is None or self._session.closed:
+            # Disable SSL verification to avoid certificate errors
+            connector = aiohttp.TCPConnector(limit=self.max_connections, ssl=False)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=None, sock_connect=30),
+            )
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _auth_headers(self) -> Dict[str, str]:
+        loop = asyncio.get_running_loop()
+        token = await loop.run_in_executor(None, self.token_manager.get_valid_token)
+        return {"Authorization": f"Bearer {token}"}
+
+    async def get_user_info(self, refresh: bool = False) -> Dict[str, Any]:
+        """
+        Return the users/me profile, memoized for ``PROFILE_TTL`` seconds.
+        Concurrent callers share one request.
+        """
+        if self._profile_lock is None:
+            self._profile_lock = asyncio.Lock()
+        async with self._profile_lock:
+            loop = asyncio.get_running_loop()
+            if not refresh and self._profile is not None and loop.time() < self._profile_expires:
+                return self._profile
+            headers = await self._auth_headers()
+            headers["Accept"] = "application/json"
+            url = f"{self.config.instance_url}/api/v1/users/me"
+            async with self.session.get(url, headers=headers) as resp:
+                resp.raise_for_status()
+                self._profile = await resp.json()
+            self._profile_expires = loop.time() + PROFILE_TTL
+            return self._profile
+
+    async def get_channel_id(self, channel: Optional[str] = None) -> int:
+        """
+        Return a video channel ID of the user, by selector or the first one.
+        """
+        channels = (await self.get_user_info()).get("videoChannels")
+        if not channels:
+            raise Exception("No video channels available for user")
+        if channel is None:
+            return channels[0].get("id")
+        return find_channel(channels, channel).get("id")
+
+    async def _stream_body(self, body: MultipartEncoder) -> AsyncIterator[bytes]:
+        """
+        Yield a multipart body, reading the file off the event loop.
+        """
+        loop = asyncio.get_running_loop()
+        yield body.head
+        with open(body.file_path, "rb") as f:
+            remaining = body.file_size
+            while remaining > 0:
+                # A fresh bytes object per chunk: the transport may keep a
+                # reference to it after write() returns
+                chunk = await loop.run_in_executor(None, f.read, min(self.buffer_size, remaining))
+                if not chunk:
+                    raise IOError(f"File shrank during upload: {body.file_path}")
+                remaining -= len(chunk)
+                yield chunk
+        yield body.tail
+
+    async def upload_video(
+        self,
+        video_path: str,
+        title: str,
+        description: str = "",
+        channel_id: Optional[Union[int, str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Upload a single video file to PeerTube.
+
+        Raises:
+            FileNotFoundError: If the video file does not exist.
+            Exception: For HTTP or API errors.
+        """
+        if not os.path.isfile(video_path):
+            raise FileNotFoundError(f"Video file not found: {video_path}")
+        if channel_id is None:
+            channel_id = await self.get_channel_id()
+
+        fields = {
+            "name": title,
+            "description": description,
+            "privacy": 1,
+            "channelId": channel_id,
+        }
+        body = MultipartEncoder(fields, "videofile", video_path)
+        headers = await self._auth_headers()
+        headers["Content-Type"] = body.content_type
+        headers["Content-Length"] = str(len(body))
+        url = f"{self.config.upload_url}/api/v1/videos/upload"
+        async with self.session.post(url, headers=headers, data=self._stream_body(body)) as resp:
+            if resp.status not in (200, 201):
+                detail = await resp.text()
+                raise Exception(f"Upload failed: HTTP {resp.status} - {detail}")
+            return await resp.json()
+
+    async def upload_many(
+        self,
+        videos: Iterable[Tuple[str, str, str]],
+        concurrency: int = 8,
+        channel_id: Optional[Union[int, str]] = None,
+    ) -> List[UploadResult]:
+        """
+        Upload (path, title, description) tuples with at most
+        ``concurrency`` uploads in flight. Returns results in input order;
+        failures are reported in the results rather than raised.
+        """
+        if channel_id is None:
+            channel_id = await self.get_channel_id()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(index: int, path: str, title: str, description: str) -> UploadResult:
+            async with semaphore:
+                try:
+                    response = await self.upload_video(path, title, description, channel_id)
+                    return UploadResult(index, path, response, None)
+                except Exception as exc:
+                    return UploadResult(index, path, None, exc)
+
+        tasks = [
+            run(index, path, title, description)
+            for index, (path, title, description) in enumerate(videos, start=1)
+        ]
+        return list(await asyncio.gather(*tasks))
@@ -0,0 +1,81 @@
+"""
+Small in-process and on-disk caches for PeerTube API data.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "peertube_uploader")
+
+
+class TTLCache:
+    """
+    Thread-safe in-memory mapping whose entries expire after ``ttl`` seconds.
+    """
+    def __init__(self, ttl: float) -> None:
+        self.ttl: float = ttl
+        self._data: Dict[str, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if time.monotonic() >= expires:
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class DiskCache:
+    """
+    JSON values stored one file per key under ``cache_dir``, valid for ``ttl``
+    seconds. Unreadable or expired entries are treated as missing. Entries
+    hold account data, so like ``TokenStore`` files they are readable by
+    their owner only.
+    """
+    def __init__(self, cache_dir: Optional[str] = None, ttl: float = 3600.0) -> None:
+        self.cache_dir: str = cache_dir or os.path.join(DEFAULT_CACHE_DIR, "profiles")
+        self.ttl: float = ttl
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("key") != key or time.time() >= entry.get("expires", 0):
+            return None
+        return entry.get("value")
+
+    def set(self, key: str, value: Any) -> None:
+        os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "expires": time.time() + self.ttl, "value": value}, f)
+        os.replace(tmp_path, path)
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
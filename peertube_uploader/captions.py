@@ -0,0 +1,236 @@
+"""
+Upload one video per chapter and attach its language variants as caption tracks.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from .finder import ScanEntry
+from .utils import parse_filename
+
+if TYPE_CHECKING:
+    from .client import PeerTubeClient
+
+# Sidecar subtitle formats PeerTube accepts, preferred first
+CAPTION_EXTENSIONS = (".vtt", ".srt")
+
+
+class CaptionTrack(NamedTuple):
+    """
+    A sidecar subtitle file and its language.
+    """
+    lang: str
+    path: str
+
+
+class VariantGroup(NamedTuple):
+    """
+    The video uploaded for one chapter, the language variants it replaces
+    and the caption tracks to attach to it.
+    """
+    base: str
+    folded: List[str]
+    captions: List[CaptionTrack]
+
+
+def group_variants(
+    paths: Iterable[str],
+    base_lang: Optional[str] = None,
+    digest: Optional[Callable[[str], Optional[str]]] = None,
+) -> List[VariantGroup]:
+    """
+    Group videos and sidecar captions by (directory, course, part, chapter).
+
+    In each group the base video is the one without a language code, else
+    the ``base_lang`` variant, else the first language alphabetically.
+    Another variant is folded into the base only if a caption file in its
+    language exists and its ``digest`` (by default ``media_digest()``, over
+    the video and audio tracks) equals the base's. Other variants, such as
+    dubbed audio or burned-in subtitles, are kept as groups of their own.
+    Files whose names lack a course or part.chapter are never grouped.
+    Caption files without a language are ignored.
+    """
+    if digest is None:
+        from .probe import media_digest as digest
+    videos: Dict[Tuple, Dict[Optional[str], str]] = {}
+    captions: Dict[Tuple, Dict[str, str]] = {}
+    single: List[str] = []
+    for path in sorted(paths):
+        ext = os.path.splitext(path)[1].lower()
+        info = parse_filename(path)
+        key = None
+        if info.course is not None and info.part is not None:
+            key = (os.path.dirname(path), info.course, info.part, info.chapter)
+        if ext in CAPTION_EXTENSIONS:
+            if key is not None and info.lang is not None:
+                found = captions.setdefault(key, {})
+                current = found.get(info.lang)
+                if current is None or CAPTION_EXTENSIONS.index(ext) < \
+                        CAPTION_EXTENSIONS.index(os.path.splitext(current)[1].lower()):
+                    found[info.lang] = path
+        elif key is None:
+            single.append(path)
+        else:
+            videos.setdefault(key, {}).setdefault(info.lang, path)
+
+    groups = [VariantGroup(path, [], []) for path in single]
+    for key, variants in videos.items():
+        tracks = captions.get(key, {})
+        if None in variants:
+            base_key: Optional[str] = None
+        elif base_lang in variants:
+            base_key = base_lang
+        else:
+            base_key = min(variants)
+        folded = []
+        base_digest: Optional[str] = None
+        for lang, path in sorted(variants.items(), key=lambda item: item[0] or ""):
+            if lang == base_key:
+                continue
+            if lang in tracks and base_digest is None:
+                base_digest = digest(variants[base_key]) or ""
+            if lang in tracks and base_digest and digest(path) == base_digest:
+                folded.append(path)
+            else:
+                groups.append(VariantGroup(path, [], []))
+        attached = [CaptionTrack(lang, path) for lang, path in sorted(tracks.items())]
+        groups.append(VariantGroup(variants[base_key], folded, attached))
+    return groups
+
+
+def _list_variants(directory: str) -> List[str]:
+    paths = []
+    with os.scandir(directory) as it:
+        for entry in it:
+            ext = os.path.splitext(entry.name)[1].lower()
+            if (ext == ".mp4" or ext in CAPTION_EXTENSIONS) and entry.is_file():
+                paths.append(os.path.join(directory, entry.name))
+    return paths
+
+
+class CaptionFolder:
+    """
+    Filter scanned files down to one upload per chapter.
+
+    The first time a file from a directory is seen, the directory is listed
+    for videos and ``.vtt``/``.srt`` sidecars and grouped with
+    ``group_variants()``, so entries stream through as the scan goes. Base
+    videos are yielded and folded variants dropped; afterwards ``groups``
+    maps each yielded path to its ``VariantGroup``.
+    """
+    def __init__(self, base_lang: Optional[str] = None) -> None:
+        self.base_lang: Optional[str] = base_lang
+        self.groups: Dict[str, VariantGroup] = {}
+        self._by_path: Dict[str, VariantGroup] = {}
+        self._listed: Set[str] = set()
+
+    @property
+    def folded_count(self) -> int:
+        return sum(len(group.folded) for group in self.groups.values())
+
+    def _group_of(self, path: str) -> Optional[VariantGroup]:
+        directory = os.path.dirname(path)
+        if directory not in self._listed:
+            self._listed.add(directory)
+            try:
+                paths = _list_variants(directory)
+            except OSError:
+                paths = []
+            for group in group_variants(paths, self.base_lang):
+                for video in [group.base] + group.folded:
+                    self._by_path[video] = group
+        return self._by_path.get(path)
+
+    def fold(self, entries: Iterable[ScanEntry]) -> Iterator[ScanEntry]:
+        """
+        Yield the entries to upload, in scan order.
+        """
+        for entry in entries:
+            group = self._group_of(entry.path) or VariantGroup(entry.path, [], [])
+            if group.base == entry.path:
+                self.groups[entry.path] = group
+                yield entry
+
+
+class CaptionResult(NamedTuple):
+    """
+    Outcome of attaching one caption track to a video.
+    """
+    video: str
+    track: CaptionTrack
+    # False if the video already had a caption in this language
+    uploaded: bool
+    error: Optional[BaseException]
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class CaptionUploader:
+    """
+    Attach caption tracks to uploaded videos with parallel API calls.
+
+    Each video's existing captions are listed first and only missing
+    languages are uploaded, so reruns send nothing for complete videos.
+    Both the listings and the uploads run on up to ``jobs`` threads.
+    """
+    def __init__(self, client: "PeerTubeClient", jobs: int = 4) -> None:
+        if jobs < 1:
+            raise ValueError("jobs must be at least 1")
+        self.client: "PeerTubeClient" = client
+        self.jobs: int = jobs
+
+    def _existing(self, video: str) -> Set[str]:
+        data = self.client.list_captions(video).get("data") or []
+        return {(caption.get("language") or {}).get("id") for caption in data}
+
+    def sync(
+        self,
+        tracks: Iterable[Tuple[str, CaptionTrack]],
+        on_result: Optional[Callable[[CaptionResult], None]] = None,
+    ) -> List[CaptionResult]:
+        """
+        Attach each (video UUID, track) pair and return a result per pair,
+        in the same order. Failures are reported in the results rather than
+        raised; ``on_result`` is called as each finishes.
+        """
+        pairs = list(tracks)
+        if not pairs:
+            return []
+        results: List[Optional[CaptionResult]] = [None] * len(pairs)
+
+        def finish(index: int, result: CaptionResult) -> None:
+            results[index] = result
+            if on_result is not None:
+                on_result(result)
+
+        def existing(video: str) -> Tuple[Optional[Set[str]], Optional[BaseException]]:
+            try:
+                return self._existing(video), None
+            except Exception as exc:
+                return None, exc
+
+        def upload(index: int) -> None:
+            video, track = pairs[index]
+            try:
+                self.client.upload_caption(video, track.lang, track.path)
+            except Exception as exc:
+                finish(index, CaptionResult(video, track, False, exc))
+                return
+            finish(index, CaptionResult(video, track, True, None))
+
+        videos = list(dict.fromkeys(video for video, _ in pairs))
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            found = dict(zip(videos, pool.map(existing, videos)))
+            missing = []
+            for index, (video, track) in enumerate(pairs):
+                langs, error = found[video]
+                if error is not None:
+                    finish(index, CaptionResult(video, track, False, error))
+                elif track.lang in langs:
+                    finish(index, CaptionResult(video, track, False, None))
+                else:
+                    missing.append(index)
+            list(pool.map(upload, missing))
+        return results
@@ -0,0 +1,31 @@
+"""
+Command-line interface: ``main()`` dispatches to the subcommand modules.
+
+Each subcommand's module is imported only when it runs, which keeps
+startup (and ``--help``) fast.
+"""
+import importlib
+import sys
+from typing import Dict, List, Optional, Tuple
+
+# Subcommand name -> (module in this package, handler)
+COMMANDS: Dict[str, Tuple[str, str]] = {
+    "plan": ("plan", "plan"),
+    "execute": ("plan", "execute"),
+    "fanout": ("fanout", "fanout"),
+    "watch": ("watch", "watch"),
+    "queue": ("queue", "queue_command"),
+    "worker": ("queue", "worker"),
+    "playlists": ("playlists", "playlists"),
+}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in COMMANDS:
+        module, handler = COMMANDS[argv[0]]
+        argv = argv[1:]
+    else:
+        module, handler = "upload", "upload"
+    command = getattr(importlib.import_module(f".{module}", __name__), handler)
+    return command(argv)
@@ -0,0 +1,307 @@
+"""
+Argument groups and helpers shared by the command-line subcommands.
+"""
+import argparse
+import sys
+from typing import Dict, List, Optional
+
+from ..cache import DiskCache
+from ..client import PeerTubeClient
+from ..config import Config, queue_token
+from ..finder import DEFAULT_SCAN_INDEX_PATH
+from ..ledger import DEFAULT_LEDGER_PATH
+from ..metrics import MetricsRecorder, ProgressLine
+from ..ordering import POLICIES
+from ..publish import DEFAULT_PUBLISH_TIMEOUT, PublishWatcher
+from ..resumable import DEFAULT_CHUNK_SIZE, AdaptiveChunkSizer
+from ..scheduler import UploadScheduler, prefetch
+from ..session import HttpSession
+from ..throttle import BandwidthLimiter, RateControl, parse_rate
+from ..token_store import TokenStore
+
+
+def add_channel_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--channel",
+        default=None,
+        help="Channel to upload to, by name, display name, handle (name@host) or ID "
+             "(default: the account's first channel)"
+    )
+    parser.add_argument(
+        "--cache-profile",
+        action="store_true",
+        help="Keep the account profile and channel list on disk between runs"
+    )
+
+
+def add_index_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--scan-index",
+        default=DEFAULT_SCAN_INDEX_PATH,
+        help="Directory listing cache that lets rescans skip unchanged folders "
+             "(default: %(default)s)"
+    )
+    parser.add_argument(
+        "--no-scan-index",
+        action="store_true",
+        help="List every folder instead of using the scan index"
+    )
+
+
+def add_scan_arguments(parser: argparse.ArgumentParser) -> None:
+    add_index_arguments(parser)
+    parser.add_argument(
+        "--order",
+        choices=POLICIES,
+        default="scan",
+        help="Upload order: as found while scanning, largest-first (shortest total time "
+             "with --jobs), newest-first, or by course (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--course-priority",
+        default=None,
+        help="Comma-separated courses to upload first with --order course, e.g. btc101,cyp201"
+    )
+
+
+def add_send_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--resumable",
+        action="store_true",
+        help="Use PeerTube's resumable upload protocol (survives dropped connections and reruns)"
+    )
+    add_rate_arguments(parser)
+    parser.add_argument(
+        "--adaptive-chunks",
+        action="store_true",
+        help="With --resumable, size chunks from measured latency and throughput, "
+             "starting from --chunk-size"
+    )
+
+
+def add_transfer_arguments(parser: argparse.ArgumentParser) -> None:
+    add_send_arguments(parser)
+    add_ledger_arguments(parser)
+    parser.add_argument(
+        "--progress",
+        action="store_true",
+        help="Show a live aggregate progress line (MB/s, ETA) on stderr"
+    )
+    parser.add_argument(
+        "--metrics-out",
+        default=None,
+        help="Write per-file upload metrics to this file (.csv for CSV, otherwise JSON)"
+    )
+    parser.add_argument(
+        "--wait-published",
+        action="store_true",
+        help="After uploading, wait until PeerTube has finished processing the videos"
+    )
+    parser.add_argument(
+        "--publish-timeout",
+        type=float,
+        default=DEFAULT_PUBLISH_TIMEOUT,
+        help="Give up waiting for processing after this many seconds, 0 for no limit "
+             "(default: %(default)s)"
+    )
+
+
+def add_rate_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE // (1024 * 1024),
+        help="Chunk size in MiB for resumable uploads (default: %(default)s)"
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=1,
+        help="Number of videos to upload in parallel (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--max-bandwidth",
+        type=parse_rate,
+        default=None,
+        help="Cap on total upload bandwidth in bytes/s across all jobs, e.g. 500K, 20M "
+             "(default: MAX_UPLOAD_RATE from the environment, if set)"
+    )
+    parser.add_argument(
+        "--rate-control",
+        default=None,
+        help="File holding the bandwidth cap (e.g. 5M, or 'off'), re-read while uploading; "
+             "SIGHUP re-reads it at once, SIGUSR1/SIGUSR2 halve/double the cap"
+    )
+
+
+def add_ledger_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--token-cache",
+        action="store_true",
+        help="Share OAuth tokens on disk between runs and parallel processes"
+    )
+    parser.add_argument(
+        "--ledger",
+        default=DEFAULT_LEDGER_PATH,
+        help="Ledger of completed uploads used to skip files on reruns (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Upload files even if the ledger says they were already uploaded"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="List the files that would be uploaded and exit"
+    )
+
+
+
+
+def add_queue_token_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--token",
+        default=None,
+        help="Shared token of the queue coordinator (default: QUEUE_TOKEN from the "
+             "environment or .env)"
+    )
+
+
+def resolve_queue_token(args: argparse.Namespace) -> Optional[str]:
+    return args.token or queue_token()
+
+
+def load_config() -> Config:
+    try:
+        return Config()
+    except Exception as e:
+        print(f"Configuration error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def build_limiter(args: argparse.Namespace, default_rate: Optional[int]) -> Optional[BandwidthLimiter]:
+    max_bandwidth = getattr(args, "max_bandwidth", None) or default_rate
+    rate_control = getattr(args, "rate_control", None)
+    limiter = None
+    if max_bandwidth or rate_control:
+        limiter = BandwidthLimiter(max_bandwidth)
+    if rate_control:
+        # Runs for the life of the process; the thread is a daemon
+        control = RateControl(
+            limiter, rate_control, on_change=lambda msg: print(msg, file=sys.stderr)
+        )
+        control.install_signals()
+        control.start()
+    return limiter
+
+
+def build_client(
+    args: argparse.Namespace,
+    config: Config,
+    metrics: Optional[MetricsRecorder] = None,
+    limiter: Optional[BandwidthLimiter] = None,
+) -> PeerTubeClient:
+    jobs = getattr(args, "jobs", 1)
+    if limiter is None:
+        limiter = build_limiter(args, config.max_bandwidth)
+    # Keep one pooled connection per upload job plus one for API calls
+    session = HttpSession(pool_size=jobs + 1)
+    profile_cache = DiskCache() if getattr(args, "cache_profile", False) else None
+    token_store = None
+    if getattr(args, "token_cache", False):
+        token_store = TokenStore(config.instance_url, config.username)
+    return PeerTubeClient(
+        config,
+        limiter=limiter,
+        session=session,
+        profile_cache=profile_cache,
+        token_store=token_store,
+        metrics=metrics,
+    )
+
+
+def resolve_channel(client: PeerTubeClient, channel: Optional[str]):
+    # Resolve the target channel once instead of once per upload
+    try:
+        return client.get_channel_id(channel)
+    except Exception as e:
+        print(f"Channel lookup failed: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def send_video(client: PeerTubeClient, args: argparse.Namespace, video_path: str,
+          title: str, description: str, channel_id) -> Dict:
+    if args.resumable:
+        return client.upload_video_resumable(
+            video_path,
+            title,
+            description,
+            channel_id=channel_id,
+            chunk_size=args.chunk_size * 1024 * 1024,
+            chunk_sizer=AdaptiveChunkSizer(args.chunk_size * 1024 * 1024) if args.adaptive_chunks else None,
+        )
+    return client.upload_video(video_path, title, description, channel_id=channel_id)
+
+
+def run_scheduler(args: argparse.Namespace, scheduler: UploadScheduler,
+                   metrics: MetricsRecorder, files) -> List:
+    if args.progress:
+        with ProgressLine(metrics, lock=scheduler.output_lock):
+            return scheduler.run(prefetch(files))
+    return scheduler.run(prefetch(files))
+
+
+def print_totals(results: List, metrics: MetricsRecorder) -> None:
+    failed = sum(1 for r in results if not r.ok)
+    print(f"{len(results) - failed} uploaded, {failed} failed.")
+    totals = metrics.aggregate()
+    print(
+        f"Sent {totals['bytes_sent'] / 1e6:.1f} MB in {totals['elapsed_s']:.1f}s "
+        f"({totals['bytes_per_s'] / 1e6:.2f} MB/s)."
+    )
+
+
+def start_publish_watcher(client: PeerTubeClient) -> PublishWatcher:
+    return PublishWatcher(
+        client,
+        on_error=lambda exc: print(f"Processing check failed: {exc}", file=sys.stderr),
+    ).start()
+
+
+def wait_published(watcher: PublishWatcher, timeout: Optional[float],
+                    uploaded_paths: Dict[str, str]) -> None:
+    print("Waiting for PeerTube to finish processing...")
+    statuses = watcher.wait(timeout or None)
+    if watcher.gave_up:
+        print(
+            f"Stopped checking processing after {watcher.errors} failed attempts in a row: "
+            f"{watcher.last_error}", file=sys.stderr,
+        )
+    for uuid, status in statuses.items():
+        if status.failed:
+            print(
+                f"Processing failed: '{uploaded_paths[uuid]}' ({status.label or 'not found'})",
+                file=sys.stderr,
+            )
+        elif status.pending:
+            print(f"Still processing: '{uploaded_paths[uuid]}' ({status.label})")
+    ready = sum(1 for s in statuses.values() if s.ready)
+    failed_processing = sum(1 for s in statuses.values() if s.failed)
+    print(
+        f"Published: {ready} ready, {failed_processing} failed, "
+        f"{len(statuses) - ready - failed_processing} still processing."
+    )
+
+
+def finish_run(args: argparse.Namespace, client: PeerTubeClient, metrics: MetricsRecorder) -> None:
+    if args.metrics_out:
+        metrics.write_report(args.metrics_out)
+        print(f"Metrics written to '{args.metrics_out}'.")
+    stats = client.session.stats()
+    print(
+        f"HTTP: {stats['requests']} requests over {stats['connections']} connection(s) "
+        f"({stats['handshakes_saved']} handshakes saved), {stats['retries']} retries."
+    )
+
+    print("Upload process completed.")
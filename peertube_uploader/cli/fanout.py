@@ -0,0 +1,205 @@
+"""
+The ``fanout`` subcommand: upload a folder to several instances at once.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from ..config import Config
+from ..fanout import DEFAULT_RING_SLOTS, DEFAULT_STALL_TIMEOUT, FanoutTarget, FanoutUploader
+from ..finder import ScanIndex, scan_mp4_files
+from ..fingerprint import file_fingerprint
+from ..ledger import UploadLedger
+from ..ordering import order_entries
+from ..scheduler import UploadScheduler, prefetch
+from ..utils import generate_description, generate_title
+from .common import (
+    add_channel_arguments,
+    add_ledger_arguments,
+    add_rate_arguments,
+    add_scan_arguments,
+    build_client,
+    build_limiter,
+)
+
+
+def fanout(argv: List[str]) -> None:
+    """
+    Upload a folder to several PeerTube instances, reading each file once.
+    """
+    parser = argparse.ArgumentParser(
+        prog="upload-folder-peertube fanout",
+        description="Upload all .mp4 files in a folder to several PeerTube instances at once. "
+                    "Each file is read once into a shared buffer that feeds a resumable "
+                    "upload to every instance."
+    )
+    parser.add_argument("path", help="Path to the folder to scan for .mp4 files")
+    parser.add_argument(
+        "--instance",
+        action="append",
+        required=True,
+        metavar="ENV_FILE",
+        help="Instance profile: a .env file with UPLOAD_URL, PEERTUBE_INSTANCE, credentials "
+             "and optionally PEERTUBE_CHANNEL. Repeat for each instance."
+    )
+    add_channel_arguments(parser)
+    add_scan_arguments(parser)
+    add_rate_arguments(parser)
+    add_ledger_arguments(parser)
+    parser.add_argument(
+        "--buffer-chunks",
+        type=int,
+        default=DEFAULT_RING_SLOTS,
+        help="Chunks of each file kept in memory: how far the fastest instance may get "
+             "ahead of the slowest (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--stall-timeout",
+        type=float,
+        default=DEFAULT_STALL_TIMEOUT,
+        help="Seconds a lagging instance may hold up the others before it reads the rest "
+             "of the file from disk itself (default: %(default)s)"
+    )
+    args = parser.parse_args(argv)
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.buffer_chunks < 1:
+        parser.error("--buffer-chunks must be at least 1")
+
+    configs: Dict[str, Config] = {}
+    for env_file in args.instance:
+        name = os.path.splitext(os.path.basename(env_file))[0] or env_file
+        while name in configs:
+            name += "_"
+        try:
+            configs[name] = Config.from_env_file(env_file)
+        except Exception as e:
+            print(f"Configuration error in '{env_file}': {e}", file=sys.stderr)
+            sys.exit(1)
+    names = list(configs)
+
+    # One limiter: the instances share this machine's uplink
+    limiter = build_limiter(args, configs[names[0]].max_bandwidth)
+    clients = {name: build_client(args, configs[name], limiter=limiter) for name in names}
+    ledger = UploadLedger(args.ledger)
+    counts = {"found": 0, "skipped": 0}
+    skipped = {name: 0 for name in names}
+    needed: Dict[str, List[str]] = {}
+    fingerprints = {}
+
+    def pending():
+        """Stream files still missing on at least one instance."""
+        index = None if args.no_scan_index else ScanIndex(args.scan_index)
+        course_priority = args.course_priority.split(",") if args.course_priority else None
+        for entry in order_entries(scan_mp4_files(args.path, index), args.order, course_priority):
+            counts["found"] += 1
+            fingerprint = file_fingerprint(entry.path)
+            missing = []
+            for name in names:
+                if args.force or ledger.get(configs[name].upload_url, fingerprint) is None:
+                    missing.append(name)
+                else:
+                    skipped[name] += 1
+            if not missing:
+                counts["skipped"] += 1
+                continue
+            needed[entry.path] = missing
+            fingerprints[entry.path] = fingerprint
+            yield entry.path
+        if index is not None:
+            index.save()
+
+    def scan_summary() -> str:
+        return (
+            f"Found {counts['found']} .mp4 file(s) in '{args.path}', "
+            f"{counts['skipped']} already on every instance."
+        )
+
+    if args.dry_run:
+        for idx, video_path in enumerate(pending(), start=1):
+            print(f"[{idx}] Would upload '{video_path}' to {', '.join(needed[video_path])}")
+        print(scan_summary())
+        sys.exit(0)
+
+    # Log in and resolve the channel on every instance at the same time
+    with ThreadPoolExecutor(max_workers=len(names)) as pool:
+        lookups = {
+            name: pool.submit(clients[name].get_channel_id, configs[name].channel or args.channel)
+            for name in names
+        }
+    channel_ids = {}
+    for name, future in lookups.items():
+        try:
+            channel_ids[name] = future.result()
+        except Exception as e:
+            print(f"Channel lookup failed on {name} ({configs[name].upload_url}): {e}", file=sys.stderr)
+            sys.exit(1)
+
+    uploader = FanoutUploader(
+        [FanoutTarget(name, clients[name], channel_ids[name]) for name in names],
+        chunk_size=args.chunk_size * 1024 * 1024,
+        slots=args.buffer_chunks,
+        stall_timeout=args.stall_timeout,
+    )
+    totals = {name: {"uploaded": 0, "failed": 0, "bytes": 0, "seconds": 0.0} for name in names}
+    totals_lock = threading.Lock()
+
+    def upload(idx: int, video_path: str):
+        title = generate_title(video_path)
+        with scheduler.output_lock:
+            print(f"[{idx}] Uploading '{title}' to {', '.join(needed[video_path])}...")
+        results = uploader.upload(
+            video_path, title, generate_description(video_path), only=needed[video_path]
+        )
+        size = os.path.getsize(video_path)
+        for name, result in results.items():
+            with totals_lock:
+                totals[name]["seconds"] += result.seconds
+                if result.ok:
+                    totals[name]["uploaded"] += 1
+                    totals[name]["bytes"] += size
+                else:
+                    totals[name]["failed"] += 1
+            if result.ok:
+                video = result.response.get("video") or {}
+                ledger.record(
+                    configs[name].upload_url,
+                    fingerprints[video_path],
+                    video_path,
+                    video.get("uuid"),
+                    clients[name].video_url(result.response),
+                )
+        return results
+
+    def report(result) -> None:
+        if not result.ok:
+            print(f"[{result.index}] Upload failed: {result.error}", file=sys.stderr)
+            return
+        for name, outcome in result.response.items():
+            if outcome.ok:
+                print(f"[{result.index}] {name}: Upload successful: {clients[name].video_url(outcome.response)}")
+            else:
+                print(f"[{result.index}] {name}: Upload failed: {outcome.error}", file=sys.stderr)
+
+    started = time.perf_counter()
+    scheduler = UploadScheduler(upload, jobs=args.jobs, on_result=report)
+    scheduler.run(prefetch(pending()))
+    elapsed = time.perf_counter() - started
+
+    print(scan_summary())
+    for name in names:
+        t = totals[name]
+        rate = t["bytes"] / t["seconds"] / 1e6 if t["seconds"] else 0.0
+        print(
+            f"{name} ({configs[name].upload_url}): {t['uploaded']} uploaded, {t['failed']} failed, "
+            f"{skipped[name]} already there; {t['bytes'] / 1e6:.1f} MB at {rate:.2f} MB/s."
+        )
+    print(
+        f"Read {uploader.bytes_read / 1e6:.1f} MB from disk in {elapsed:.1f}s "
+        f"({uploader.bytes_reread / 1e6:.1f} MB re-read for lagging instances)."
+    )
+    print("Upload process completed.")
@@ -0,0 +1,176 @@
+"""
+The ``plan`` and ``execute`` subcommands: write an upload manifest, then
+upload the files it lists.
+"""
+import argparse
+import os
+import sys
+import time
+from typing import List
+
+from ..course_index import CourseIndex
+from ..finder import ScanIndex, scan_mp4_files
+from ..fingerprint import file_fingerprint
+from ..ledger import UploadLedger
+from ..manifest import parse_line_range, plan_entries, read_manifest, write_manifest
+from ..metrics import MetricsRecorder
+from ..ordering import order_entries
+from ..scheduler import UploadScheduler
+from .common import (
+    add_channel_arguments,
+    add_scan_arguments,
+    add_transfer_arguments,
+    build_client,
+    finish_run,
+    load_config,
+    print_totals,
+    resolve_channel,
+    run_scheduler,
+    send_video,
+    start_publish_watcher,
+    wait_published,
+)
+
+
+def plan(argv: List[str]) -> None:
+    """
+    Scan a folder and write a manifest of the files to upload.
+    """
+    parser = argparse.ArgumentParser(
+        prog="upload-folder-peertube plan",
+        description="Scan a folder and write an upload manifest (JSONL) with titles, "
+                    "descriptions, chapter titles and channel IDs resolved."
+    )
+    parser.add_argument("path", help="Path to the folder to scan for .mp4 files")
+    parser.add_argument("-o", "--output", required=True, help="Manifest file to write")
+    add_channel_arguments(parser)
+    add_scan_arguments(parser)
+    args = parser.parse_args(argv)
+
+    config = load_config()
+    started = time.perf_counter()
+    channel_id = resolve_channel(build_client(args, config), args.channel)
+    index = None if args.no_scan_index else ScanIndex(args.scan_index)
+    course_priority = args.course_priority.split(",") if args.course_priority else None
+    course_index = CourseIndex(config.course_path) if config.course_path else None
+
+    entries = order_entries(scan_mp4_files(args.path, index), args.order, course_priority)
+    count = write_manifest(args.output, plan_entries(entries, channel_id, course_index))
+    if index is not None:
+        index.save()
+    print(
+        f"Planned {count} .mp4 file(s) from '{args.path}' into '{args.output}' "
+        f"in {time.perf_counter() - started:.2f}s."
+    )
+
+
+def execute(argv: List[str]) -> None:
+    """
+    Upload the files listed in a manifest.
+    """
+    parser = argparse.ArgumentParser(
+        prog="upload-folder-peertube execute",
+        description="Upload the files of a manifest written by 'plan'. Files already in "
+                    "the ledger are skipped, so an interrupted run can simply be restarted."
+    )
+    parser.add_argument("manifest", help="Manifest file written by 'plan'")
+    parser.add_argument(
+        "--lines",
+        type=parse_line_range,
+        default=(1, None),
+        help="Only upload this 1-based range of manifest lines, e.g. 1-5000 or 5001- "
+             "(to split a manifest across machines)"
+    )
+    add_transfer_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+
+    config = load_config()
+    metrics = MetricsRecorder()
+    client = build_client(args, config, metrics)
+    ledger = UploadLedger(args.ledger)
+    counts = {"listed": 0, "skipped": 0, "changed": 0}
+    records = {}
+    fingerprints = {}
+
+    def pending():
+        """Stream manifest entries that still need uploading."""
+        first, last = args.lines
+        for line_no, record in read_manifest(args.manifest, first, last):
+            counts["listed"] += 1
+            path = record["path"]
+            try:
+                st = os.stat(path)
+            except OSError:
+                counts["changed"] += 1
+                print(f"[line {line_no}] Missing: '{path}'", file=sys.stderr)
+                continue
+            if (st.st_size, st.st_mtime_ns) != (record["size"], record["mtime_ns"]):
+                # Planned metadata may no longer match; re-plan to pick the file up
+                counts["changed"] += 1
+                print(f"[line {line_no}] Changed since planning, skipped: '{path}'", file=sys.stderr)
+                continue
+            fingerprint = file_fingerprint(path)
+            if not args.force and ledger.get(config.upload_url, fingerprint) is not None:
+                counts["skipped"] += 1
+                continue
+            record["line"] = line_no
+            records[path] = record
+            fingerprints[path] = fingerprint
+            metrics.queued(record["size"])
+            yield path
+
+    def summary() -> str:
+        text = f"{counts['listed']} manifest entries"
+        if counts["skipped"]:
+            text += f", {counts['skipped']} already uploaded"
+        if counts["changed"]:
+            text += f", {counts['changed']} missing or changed"
+        return text + "."
+
+    if args.dry_run:
+        for video_path in pending():
+            print(f"[line {records[video_path]['line']}] Would upload '{video_path}'")
+        print(summary())
+        sys.exit(0)
+
+    watcher = start_publish_watcher(client) if args.wait_published else None
+    uploaded_paths = {}
+
+    def upload(idx: int, video_path: str):
+        record = records[video_path]
+        with scheduler.output_lock:
+            print(f"[line {record['line']}] Uploading '{record['title']}'...")
+        with metrics.track(video_path, record["size"]):
+            response = send_video(
+                client, args, video_path, record["title"], record["description"],
+                record["channel_id"],
+            )
+        video = response.get("video") or {}
+        ledger.record(
+            config.upload_url,
+            fingerprints[video_path],
+            video_path,
+            video.get("uuid"),
+            client.video_url(response),
+        )
+        if watcher is not None and video.get("uuid"):
+            uploaded_paths[video["uuid"]] = video_path
+            watcher.track(video["uuid"])
+        return response
+
+    def report(result) -> None:
+        line = records[result.path]["line"]
+        if result.ok:
+            print(f"[line {line}] Upload successful: {client.video_url(result.response)}")
+        else:
+            print(f"[line {line}] Upload failed: {result.error}", file=sys.stderr)
+
+    scheduler = UploadScheduler(upload, jobs=args.jobs, on_result=report)
+    results = run_scheduler(args, scheduler, metrics, pending())
+    print(summary())
+    print_totals(results, metrics)
+    if watcher is not None:
+        wait_published(watcher, args.publish_timeout, uploaded_paths)
+    finish_run(args, client, metrics)
@@ -0,0 +1,135 @@
+"""
+The ``playlists`` subcommand, and the playlist step of a folder upload.
+"""
+import argparse
+import os
+import sys
+from typing import List, Optional
+
+from ..client import PeerTubeClient
+from ..ledger import DEFAULT_LEDGER_PATH, UploadLedger
+from ..playlists import DEFAULT_TITLE_FORMAT, PlaylistBuilder, group_by_course
+from .common import add_channel_arguments, build_client, load_config, resolve_channel
+
+
+# PeerTube playlist privacy IDs
+PLAYLIST_PRIVACY = {"public": 1, "unlisted": 2, "private": 3}
+
+
+def add_playlist_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--playlist-title",
+        default=DEFAULT_TITLE_FORMAT,
+        help="Playlist name per course and language; {course} and {lang} are replaced "
+             "(default: '%(default)s')"
+    )
+    parser.add_argument(
+        "--playlist-privacy",
+        choices=PLAYLIST_PRIVACY,
+        default="public",
+        help="Privacy of newly created playlists (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--playlist-jobs",
+        type=int,
+        default=4,
+        help="Number of playlists to update in parallel (default: %(default)s)"
+    )
+
+
+def ledger_videos(ledger: UploadLedger, instance: str, root: Optional[str] = None) -> List:
+    """
+    Return (path, uuid) of the videos the ledger records for an instance,
+    optionally only those under ``root``.
+    """
+    prefix = os.path.join(os.path.abspath(root), "") if root else ""
+    return [
+        (entry["path"], entry.get("uuid"))
+        for entry in ledger.entries(instance)
+        if entry["path"].startswith(prefix)
+    ]
+
+
+def build_playlists(args: argparse.Namespace, client: PeerTubeClient, channel_id, videos: List) -> List:
+    groups = group_by_course(videos)
+    if not groups:
+        print("No uploaded videos with a course, part.chapter and language in their name.")
+        return []
+    builder = PlaylistBuilder(
+        client,
+        channel_id,
+        jobs=args.playlist_jobs,
+        privacy=PLAYLIST_PRIVACY[args.playlist_privacy],
+        title_format=args.playlist_title,
+    )
+    print(f"Updating {len(groups)} playlist(s)...")
+
+    def report(result) -> None:
+        title = builder.title(result.course, result.lang)
+        with builder.output_lock:
+            for path, error in result.failed:
+                print(f"Could not add '{path}' to '{title}': {error}", file=sys.stderr)
+            if result.error is not None:
+                print(f"Playlist '{title}' failed: {result.error}", file=sys.stderr)
+            elif result.added or result.created:
+                action = "Created" if result.created else "Updated"
+                print(f"{action} playlist '{title}': {result.added} video(s) added, {result.moved} moved.")
+
+    results = builder.sync(groups, on_result=report)
+    added = sum(r.added for r in results)
+    failed = sum(1 for r in results if not r.ok)
+    print(f"Playlists: {len(results)} checked, {added} video(s) added, {failed} with errors.")
+    return results
+
+
+def playlists(argv: List[str]) -> None:
+    """
+    Build course playlists from the videos recorded in the ledger.
+    """
+    parser = argparse.ArgumentParser(
+        prog="upload-folder-peertube playlists",
+        description="Create or update one playlist per course and language from the videos "
+                    "the ledger records for this instance, in part.chapter order. Only "
+                    "videos missing from a playlist are added, so it is safe to rerun."
+    )
+    parser.add_argument(
+        "path",
+        nargs="?",
+        default=None,
+        help="Only use videos uploaded from this folder (default: all ledger entries)"
+    )
+    add_channel_arguments(parser)
+    add_playlist_arguments(parser)
+    parser.add_argument(
+        "--token-cache",
+        action="store_true",
+        help="Share OAuth tokens on disk between runs and parallel processes"
+    )
+    parser.add_argument(
+        "--ledger",
+        default=DEFAULT_LEDGER_PATH,
+        help="Ledger of completed uploads (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="List the playlists and their videos in order and exit"
+    )
+    args = parser.parse_args(argv)
+    if args.playlist_jobs < 1:
+        parser.error("--playlist-jobs must be at least 1")
+
+    config = load_config()
+    videos = ledger_videos(UploadLedger(args.ledger), config.upload_url, args.path)
+    if args.dry_run:
+        for (course, lang), items in group_by_course(videos).items():
+            print(f"{args.playlist_title.format(course=course.upper(), lang=lang)}:")
+            for item in items:
+                print(f"  {item.part}.{item.chapter} {item.path}")
+        sys.exit(0)
+
+    client = build_client(args, config)
+    channel_id = resolve_channel(client, args.channel)
+    results = build_playlists(args, client, channel_id, videos)
+    if any(not r.ok for r in results):
+        sys.exit(1)
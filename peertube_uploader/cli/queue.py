@@ -0,0 +1,226 @@
+"""
+The ``queue`` and ``worker`` subcommands: split a batch between workers on
+several hosts through a shared job queue.
+"""
+import argparse
+import os
+import sys
+from typing import Dict, List
+
+from ..finder import ScanIndex, scan_mp4_files
+from ..fingerprint import file_fingerprint
+from ..jobqueue import DEFAULT_LEASE, Job, QueueWorker, SQLiteJobQueue, open_job_queue
+from ..ledger import UploadLedger
+from ..metrics import MetricsRecorder
+from ..ordering import order_entries
+from ..utils import generate_description, generate_title
+from .common import (
+    add_channel_arguments,
+    add_ledger_arguments,
+    add_queue_token_argument,
+    add_scan_arguments,
+    add_send_arguments,
+    build_client,
+    load_config,
+    print_totals,
+    resolve_channel,
+    resolve_queue_token,
+    send_video,
+)
+
+
+def queue_command(argv: List[str]) -> None:
+    """
+    Fill, inspect or serve a job queue shared by several workers.
+    """
+    parser = argparse.ArgumentParser(
+        prog="upload-folder-peertube queue",
+        description="Manage a job queue that several 'worker' processes, on one or more "
+                    "hosts, take files from. QUEUE is an SQLite file (e.g. on a shared "
+                    "filesystem) or the URL of a coordinator started with 'queue serve'."
+    )
+    actions = parser.add_subparsers(dest="action", required=True)
+    add = actions.add_parser("add", help="Scan a folder and queue its .mp4 files")
+    add.add_argument("queue", help="SQLite file or coordinator URL")
+    add.add_argument("path", help="Path to the folder to scan for .mp4 files")
+    add_scan_arguments(add)
+    add_queue_token_argument(add)
+    status = actions.add_parser("status", help="Show how many jobs are in each state")
+    status.add_argument("queue", help="SQLite file or coordinator URL")
+    add_queue_token_argument(status)
+    serve = actions.add_parser("serve", help="Serve an SQLite queue to workers over HTTP")
+    serve.add_argument("queue", help="SQLite file to serve")
+    serve.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: %(default)s)")
+    serve.add_argument("--port", type=int, default=8765, help="Port to listen on (default: %(default)s)")
+    add_queue_token_argument(serve)
+    args = parser.parse_args(argv)
+    token = resolve_queue_token(args)
+
+    if args.action == "serve":
+        # http.server is slow to import; only the coordinator needs it
+        from ..coordinator import JobServer
+
+        server = JobServer(SQLiteJobQueue(args.queue), args.host, args.port, token)
+        print(f"Serving '{args.queue}' at {server.url}. Press Ctrl+C to stop.")
+        if token is None:
+            print(f"Workers must pass --token {server.token} (or set QUEUE_TOKEN).")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        return
+
+    queue = open_job_queue(args.queue, token)
+    if args.action == "add":
+        index = None if args.no_scan_index else ScanIndex(args.scan_index)
+        course_priority = args.course_priority.split(",") if args.course_priority else None
+        entries = order_entries(scan_mp4_files(args.path, index), args.order, course_priority)
+        found = added = 0
+        batch = []
+        for entry in entries:
+            found += 1
+            batch.append((entry.path, entry.size))
+            if len(batch) >= 1000:
+                added += queue.add(args.path, batch)
+                batch = []
+        added += queue.add(args.path, batch)
+        if index is not None:
+            index.save()
+        print(f"Queued {added} new file(s) of {found} found in '{args.path}'.")
+    counts = queue.counts()
+    print(
+        f"Queue: {counts['pending']} pending, {counts['claimed']} in progress, "
+        f"{counts['done']} done, {counts['failed']} failed."
+    )
+
+
+def worker(argv: List[str]) -> None:
+    """
+    Upload files claimed from a shared job queue until it is drained.
+    """
+    parser = argparse.ArgumentParser(
+        prog="upload-folder-peertube worker",
+        description="Take files from a job queue filled with 'queue add' and upload them. "
+                    "Run one worker per host (or several); each claims files under a lease "
+                    "that it renews while uploading, so files held by a crashed worker are "
+                    "picked up by the others. Exits once every file is done or failed."
+    )
+    parser.add_argument("queue", help="SQLite file or coordinator URL")
+    parser.add_argument(
+        "--root",
+        default=None,
+        help="Local path of the queued folder, if it is mounted elsewhere on this host "
+             "(default: the path given to 'queue add')"
+    )
+    add_channel_arguments(parser)
+    add_send_arguments(parser)
+    add_ledger_arguments(parser)
+    parser.add_argument(
+        "--lease",
+        type=float,
+        default=DEFAULT_LEASE,
+        help="Seconds a claim lasts without a heartbeat; a crashed worker's files are "
+             "reclaimed after this long (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--max-attempts",
+        type=int,
+        default=3,
+        help="Mark a file failed after it has been tried this many times (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=5.0,
+        help="Seconds between checks for abandoned files while other workers finish "
+             "(default: %(default)s)"
+    )
+    parser.add_argument(
+        "--worker-id",
+        default=None,
+        help="Name recorded with claimed files (default: hostname:pid)"
+    )
+    add_queue_token_argument(parser)
+    args = parser.parse_args(argv)
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+
+    queue = open_job_queue(args.queue, resolve_queue_token(args))
+    if args.dry_run:
+        counts = queue.counts()
+        print(f"Would upload up to {counts['pending']} pending file(s) from '{args.queue}'.")
+        sys.exit(0)
+    root = args.root or queue.root()
+    if root is None:
+        print(f"The queue '{args.queue}' is empty; fill it with 'queue add'.", file=sys.stderr)
+        sys.exit(1)
+
+    config = load_config()
+    metrics = MetricsRecorder()
+    client = build_client(args, config, metrics)
+    ledger = UploadLedger(args.ledger)
+    channel_id = resolve_channel(client, args.channel)
+
+    def upload(job: Job) -> Dict:
+        video_path = os.path.join(root, job.path)
+        fingerprint = file_fingerprint(video_path)
+        uploaded = None if args.force else ledger.get(config.upload_url, fingerprint)
+        if uploaded is not None:
+            return {"uuid": uploaded.get("uuid"), "url": uploaded.get("url"), "skipped": True}
+        title = generate_title(video_path)
+        with queue_worker.output_lock:
+            print(f"[{job.id}] Uploading '{title}'...")
+        with metrics.track(video_path, job.size):
+            response = send_video(client, args, video_path, title, generate_description(video_path), channel_id)
+        video = response.get("video") or {}
+        url = client.video_url(response)
+        ledger.record(config.upload_url, fingerprint, video_path, video.get("uuid"), url)
+        return {"uuid": video.get("uuid"), "url": url}
+
+    def report(result) -> None:
+        job = result.job
+        if result.queue_error is not None:
+            print(
+                f"[{job.id}] Could not save the result of '{job.path}' to the queue, it will be "
+                f"claimed again once the lease runs out: {result.queue_error}", file=sys.stderr,
+            )
+        if result.ok and not result.recorded and result.queue_error is None:
+            print(
+                f"[{job.id}] Uploaded, but the claim had expired and another worker took "
+                f"'{job.path}' over: {result.response['url']}", file=sys.stderr,
+            )
+        elif result.ok and result.response.get("skipped"):
+            print(f"[{job.id}] Already uploaded, skipped: {result.response['url']}")
+        elif result.ok:
+            print(f"[{job.id}] Upload successful: {result.response['url']}")
+        else:
+            outcome = "will retry" if job.attempts < args.max_attempts else "giving up"
+            print(
+                f"[{job.id}] Upload of '{job.path}' failed (attempt {job.attempts}, {outcome}): "
+                f"{result.error}", file=sys.stderr,
+            )
+
+    queue_worker = QueueWorker(
+        queue,
+        upload,
+        worker_id=args.worker_id,
+        jobs=args.jobs,
+        lease=args.lease,
+        max_attempts=args.max_attempts,
+        poll_interval=args.poll_interval,
+        on_result=report,
+        on_queue_error=lambda exc: print(f"Job queue error, retrying: {exc}", file=sys.stderr),
+    )
+    print(f"Worker {queue_worker.worker_id} taking files from '{args.queue}'...")
+    try:
+        results = queue_worker.run()
+    except KeyboardInterrupt:
+        # Claims still held run out and are picked up by other workers
+        print("Stopped; files in progress will be reclaimed after their lease.", file=sys.stderr)
+        sys.exit(130)
+    print_totals(results, metrics)
+    counts = queue.counts()
+    print(f"Queue: {counts['done']} done, {counts['failed']} failed, {counts['pending']} pending.")
+    print("Upload process completed.")
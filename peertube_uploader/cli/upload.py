@@ -0,0 +1,307 @@
+"""
+The default command: scan a folder and upload its .mp4 files as they are found.
+"""
+import argparse
+import json
+import sys
+import threading
+from typing import Dict, List
+
+from ..captions import CaptionFolder, CaptionUploader
+from ..client import PeerTubeClient
+from ..dedup import Deduplicator
+from ..finder import ScanIndex, scan_mp4_files
+from ..fingerprint import file_fingerprint
+from ..ledger import UploadLedger
+from ..metrics import MetricsRecorder
+from ..ordering import order_entries
+from ..probe import MediaValidator
+from ..scheduler import UploadScheduler
+from ..utils import generate_description, generate_title
+from .common import (
+    add_channel_arguments,
+    add_scan_arguments,
+    add_transfer_arguments,
+    build_client,
+    finish_run,
+    load_config,
+    print_totals,
+    resolve_channel,
+    run_scheduler,
+    send_video,
+    start_publish_watcher,
+    wait_published,
+)
+from .playlists import add_playlist_arguments, build_playlists, ledger_videos
+
+
+def _attach_captions(args: argparse.Namespace, client: PeerTubeClient,
+                     folder: CaptionFolder, video_uuids: Dict[str, str]) -> List:
+    tracks = [
+        (uuid, track)
+        for path, uuid in video_uuids.items()
+        if uuid and path in folder.groups
+        for track in folder.groups[path].captions
+    ]
+    if not tracks:
+        return []
+    print(f"Attaching {len(tracks)} caption track(s)...")
+    lock = threading.Lock()
+
+    def report(result) -> None:
+        if not result.ok:
+            with lock:
+                print(f"Caption '{result.track.path}' failed: {result.error}", file=sys.stderr)
+
+    results = CaptionUploader(client, jobs=args.caption_jobs).sync(tracks, on_result=report)
+    uploaded = sum(1 for r in results if r.uploaded)
+    failed = sum(1 for r in results if not r.ok)
+    print(
+        f"Captions: {uploaded} uploaded, {len(results) - uploaded - failed} already present, "
+        f"{failed} failed."
+    )
+    return results
+
+
+def upload(argv: List[str]) -> None:
+    """
+    Upload all .mp4 files in a folder, streaming them from the scan.
+    """
+    parser = argparse.ArgumentParser(
+        prog="upload-folder-peertube",
+        description="Upload all .mp4 files in a folder to PeerTube. "
+                    "See also the 'plan', 'execute', 'fanout', 'watch', 'queue', 'worker' and "
+                    "'playlists' subcommands."
+    )
+    parser.add_argument(
+        "path",
+        help="Path to the folder to scan for .mp4 files"
+    )
+    add_transfer_arguments(parser)
+    add_channel_arguments(parser)
+    add_scan_arguments(parser)
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help="Upload files with identical content only once (waits for the scan to finish)"
+    )
+    parser.add_argument(
+        "--hash-workers",
+        type=int,
+        default=None,
+        help="Processes used to hash possible duplicates (default: one per CPU)"
+    )
+    parser.add_argument(
+        "--dedup-report",
+        default=None,
+        help="With --dedup, write a JSON report mapping duplicate paths to the uploaded video"
+    )
+    parser.add_argument(
+        "--validate",
+        choices=("skip", "warn"),
+        default=None,
+        help="Probe files before uploading (ffprobe, or a built-in MP4 check) and "
+             "skip or only warn about broken ones"
+    )
+    parser.add_argument(
+        "--probe-workers",
+        type=int,
+        default=None,
+        help="Processes used to probe files with --validate (default: one per CPU)"
+    )
+    parser.add_argument(
+        "--captions",
+        action="store_true",
+        help="Upload one video per course chapter and attach the other languages' "
+             ".vtt/.srt sidecar files as caption tracks, instead of uploading every "
+             "language variant"
+    )
+    parser.add_argument(
+        "--caption-base-lang",
+        default=None,
+        help="With --captions, the language variant to upload when every variant has a "
+             "language code (default: the first alphabetically)"
+    )
+    parser.add_argument(
+        "--caption-jobs",
+        type=int,
+        default=4,
+        help="Number of caption tracks to upload in parallel (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--playlists",
+        action="store_true",
+        help="After uploading, add the folder's videos to one playlist per course and "
+             "language, in part.chapter order"
+    )
+    add_playlist_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.playlist_jobs < 1:
+        parser.error("--playlist-jobs must be at least 1")
+    if args.caption_jobs < 1:
+        parser.error("--caption-jobs must be at least 1")
+
+    config = load_config()
+    metrics = MetricsRecorder()
+    client = build_client(args, config, metrics)
+    ledger = UploadLedger(args.ledger)
+    index = None if args.no_scan_index else ScanIndex(args.scan_index)
+    counts = {"found": 0, "skipped": 0, "invalid": 0}
+    course_priority = args.course_priority.split(",") if args.course_priority else None
+    fingerprints = {}
+    sizes = {}
+    dedup = Deduplicator(workers=args.hash_workers) if args.dedup else None
+    validator = None
+    if args.validate:
+        validator = MediaValidator(args.probe_workers, cache=MediaValidator.default_cache())
+    folder = CaptionFolder(args.caption_base_lang) if args.captions else None
+    media = {}
+    # Watch URL of each uploaded (or previously uploaded) file, for the dedup report
+    video_urls = {}
+    # UUID of each uploaded (or previously uploaded) file, for its caption tracks
+    video_uuids = {}
+
+    def record_duplicates(video_path: str, uuid, url) -> None:
+        """Ledger the copies and folded language variants of an uploaded file so reruns skip them too."""
+        video_urls[video_path] = url
+        video_uuids[video_path] = uuid
+        copies = list(dedup.duplicates.get(video_path, ())) if dedup is not None else []
+        if folder is not None and video_path in folder.groups:
+            copies += folder.groups[video_path].folded
+        for copy in copies:
+            ledger.record(config.upload_url, file_fingerprint(copy), copy, uuid, url)
+
+    def candidates():
+        """Yield (path, fingerprint) of scanned files not uploaded yet."""
+        entries = scan_mp4_files(args.path, index)
+        if folder is not None:
+            # Before dedup, so a folded variant never stands in for its base
+            entries = folder.fold(entries)
+        if dedup is not None:
+            entries = dedup.unique(entries)
+        for entry in order_entries(entries, args.order, course_priority):
+            counts["found"] += 1
+            fingerprint = file_fingerprint(entry.path)
+            # Skip files the ledger already records as uploaded to this instance
+            uploaded = None if args.force else ledger.get(config.upload_url, fingerprint)
+            if uploaded is not None:
+                counts["skipped"] += 1
+                if not args.dry_run:
+                    record_duplicates(entry.path, uploaded.get("uuid"), uploaded.get("url"))
+                continue
+            fingerprints[entry.path] = fingerprint
+            sizes[entry.path] = entry.size
+            yield entry.path, fingerprint
+        if index is not None:
+            index.save()
+
+    def pending():
+        """Stream files to upload while the scan is still running."""
+        if validator is None:
+            checked = ((path, None) for path, _ in candidates())
+        else:
+            checked = validator.check(candidates())
+        for video_path, info in checked:
+            if info is not None:
+                media[video_path] = info
+                if not info.valid:
+                    counts["invalid"] += 1
+                    action = "skipping" if args.validate == "skip" else "uploading anyway"
+                    print(f"Invalid video '{video_path}': {info.reason} ({action})", file=sys.stderr)
+                    if args.validate == "skip":
+                        continue
+            metrics.queued(sizes[video_path])
+            yield video_path
+
+    def scan_summary() -> str:
+        duplicates = dedup.duplicate_count if dedup is not None else 0
+        folded = folder.folded_count if folder is not None else 0
+        summary = f"Found {counts['found'] + duplicates + folded} .mp4 file(s) in '{args.path}'"
+        if counts["skipped"]:
+            summary += f", {counts['skipped']} already uploaded"
+        if duplicates:
+            summary += f", {duplicates} duplicate(s) of other files"
+        if folded:
+            summary += f", {folded} language variant(s) sent as captions"
+        if counts["invalid"]:
+            summary += f", {counts['invalid']} invalid"
+        return summary + "."
+
+    if args.dry_run:
+        for idx, video_path in enumerate(pending(), start=1):
+            print(f"[{idx}] Would upload '{video_path}'")
+        if dedup is not None:
+            for original, copies in dedup.duplicates.items():
+                for copy in copies:
+                    print(f"Would skip '{copy}' (same content as '{original}')")
+        if folder is not None:
+            for base, group in folder.groups.items():
+                for variant in group.folded:
+                    print(f"Would skip '{variant}' (captions on '{base}')")
+                if group.captions:
+                    langs = ", ".join(track.lang for track in group.captions)
+                    print(f"Would attach {langs} captions to '{base}'")
+        print(scan_summary())
+        sys.exit(0)
+
+    channel_id = resolve_channel(client, args.channel)
+
+    print(f"Scanning '{args.path}' and uploading as files are found...")
+    # Poll processing states in the background while later files upload
+    watcher = start_publish_watcher(client) if args.wait_published else None
+    uploaded_paths = {}
+
+    def upload(idx: int, video_path: str):
+        title = generate_title(video_path)
+        description = generate_description(video_path)
+        with scheduler.output_lock:
+            print(f"[{idx}] Uploading '{title}'...")
+        with metrics.track(video_path, sizes[video_path]) as record:
+            info = media.get(video_path)
+            if info is not None:
+                record.extra.update(
+                    media_duration_s=info.duration, width=info.width, height=info.height, codec=info.codec
+                )
+            response = send_video(client, args, video_path, title, description, channel_id)
+        video = response.get("video") or {}
+        url = client.video_url(response)
+        ledger.record(config.upload_url, fingerprints[video_path], video_path, video.get("uuid"), url)
+        record_duplicates(video_path, video.get("uuid"), url)
+        if watcher is not None and video.get("uuid"):
+            uploaded_paths[video["uuid"]] = video_path
+            watcher.track(video["uuid"])
+        return response
+
+    def report(result) -> None:
+        if result.ok:
+            url = client.video_url(result.response)
+            print(f"[{result.index}] Upload successful: {url}")
+        else:
+            print(f"[{result.index}] Upload failed: {result.error}", file=sys.stderr)
+
+    scheduler = UploadScheduler(upload, jobs=args.jobs, on_result=report)
+    results = run_scheduler(args, scheduler, metrics, pending())
+    print(scan_summary())
+    if counts["found"] == 0:
+        print(f"No .mp4 files found in '{args.path}'.")
+        sys.exit(0)
+    print_totals(results, metrics)
+    if watcher is not None:
+        wait_published(watcher, args.publish_timeout, uploaded_paths)
+    if dedup is not None and args.dedup_report:
+        report_rows = [
+            {"path": copy, "duplicate_of": original, "url": video_urls.get(original)}
+            for original, copies in dedup.duplicates.items()
+            for copy in copies
+        ]
+        with open(args.dedup_report, "w", encoding="utf-8") as f:
+            json.dump(report_rows, f, indent=2)
+        print(f"Duplicate report written to '{args.dedup_report}'.")
+    if folder is not None:
+        _attach_captions(args, client, folder, video_uuids)
+    if args.playlists:
+        # Previously uploaded files count too, so reruns fill gaps in playlists
+        build_playlists(args, client, channel_id, ledger_videos(ledger, config.upload_url, args.path))
+    finish_run(args, client, metrics)
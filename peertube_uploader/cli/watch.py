@@ -0,0 +1,183 @@
+"""
+The ``watch`` subcommand: upload files as soon as they are completely written.
+"""
+import argparse
+import os
+import signal
+import sys
+import threading
+import time
+from typing import List
+
+from ..finder import ScanIndex
+from ..fingerprint import file_fingerprint
+from ..ledger import UploadLedger
+from ..scheduler import UploadScheduler
+from ..utils import generate_description, generate_title
+from ..watch import DEFAULT_QUEUE_PATH, FolderWatcher, UploadQueue
+from .common import (
+    add_channel_arguments,
+    add_index_arguments,
+    add_ledger_arguments,
+    add_send_arguments,
+    build_client,
+    load_config,
+    resolve_channel,
+    send_video,
+)
+
+
+def watch(argv: List[str]) -> None:
+    """
+    Watch a folder and upload .mp4 files as soon as they are complete.
+    """
+    parser = argparse.ArgumentParser(
+        prog="upload-folder-peertube watch",
+        description="Watch a folder (inotify, or polling where unavailable) and upload each "
+                    ".mp4 file once it has been completely written. Found files are kept in "
+                    "a persistent queue, so a restart picks up where the last run stopped."
+    )
+    parser.add_argument("path", help="Path to the folder to watch for .mp4 files")
+    add_channel_arguments(parser)
+    add_index_arguments(parser)
+    add_send_arguments(parser)
+    add_ledger_arguments(parser)
+    parser.add_argument(
+        "--queue",
+        default=DEFAULT_QUEUE_PATH,
+        help="Persistent queue of files waiting to be uploaded (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="Rescan the folder periodically instead of using inotify"
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=2.0,
+        help="Seconds between rescans when polling (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--settle",
+        type=float,
+        default=1.0,
+        help="Seconds a file must be left alone after it was closed or renamed into "
+             "place before it is uploaded (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--stable-seconds",
+        type=float,
+        default=5.0,
+        help="Without a close event (polling, or files present at start), seconds a "
+             "file's size and mtime must stay unchanged (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--max-attempts",
+        type=int,
+        default=3,
+        help="Give up on a file after this many failed uploads (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--retry-delay",
+        type=float,
+        default=60.0,
+        help="Seconds before retrying a failed upload, doubled on each failure "
+             "(default: %(default)s)"
+    )
+    args = parser.parse_args(argv)
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+
+    config = load_config()
+    # One client for the whole run keeps its connections and token warm. No
+    # metrics recorder: it keeps a record per file and watch has no report
+    client = build_client(args, config)
+    ledger = UploadLedger(args.ledger)
+    queue = UploadQueue(args.queue)
+    channel_id = None if args.dry_run else resolve_channel(client, args.channel)
+    output_lock = threading.Lock()
+
+    def on_ready(video_path: str) -> None:
+        with output_lock:
+            if args.dry_run:
+                print(f"Would upload '{video_path}'")
+            elif queue.put(video_path):
+                print(f"Queued '{video_path}'")
+
+    watcher = FolderWatcher(
+        args.path,
+        on_ready,
+        settle=args.settle,
+        stable_seconds=args.stable_seconds,
+        poll_interval=args.poll_interval,
+        use_inotify=False if args.poll else None,
+        index=None if args.no_scan_index else ScanIndex(args.scan_index),
+    )
+
+    def queued():
+        while True:
+            video_path = queue.get()
+            if video_path is None:
+                return
+            yield video_path
+
+    def upload(idx: int, video_path: str):
+        if not os.path.isfile(video_path):
+            queue.done(video_path)
+            raise FileNotFoundError(f"File disappeared before upload: {video_path}")
+        fingerprint = file_fingerprint(video_path)
+        if not args.force and ledger.get(config.upload_url, fingerprint) is not None:
+            queue.done(video_path)
+            return None
+        title = generate_title(video_path)
+        with output_lock:
+            print(f"[{idx}] Uploading '{title}'...")
+        response = send_video(client, args, video_path, title, generate_description(video_path), channel_id)
+        video = response.get("video") or {}
+        ledger.record(config.upload_url, fingerprint, video_path, video.get("uuid"), client.video_url(response))
+        queue.done(video_path)
+        return response
+
+    def report(result) -> None:
+        with output_lock:
+            if result.ok and result.response is None:
+                print(f"[{result.index}] Already uploaded, skipped: '{result.path}'")
+            elif result.ok:
+                print(f"[{result.index}] Upload successful: {client.video_url(result.response)}")
+            elif isinstance(result.error, FileNotFoundError):
+                print(f"[{result.index}] Upload failed: {result.error}", file=sys.stderr)
+            else:
+                attempts = queue.retry(result.path, args.retry_delay)
+                if attempts >= args.max_attempts:
+                    queue.done(result.path)
+                    print(
+                        f"[{result.index}] Upload failed, giving up after {attempts} attempts: "
+                        f"{result.error}", file=sys.stderr,
+                    )
+                else:
+                    print(
+                        f"[{result.index}] Upload failed (attempt {attempts} of {args.max_attempts}), "
+                        f"will retry: {result.error}", file=sys.stderr,
+                    )
+
+    # Stop cleanly under a service manager too
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    watcher.start()
+    print(
+        f"Watching '{args.path}' ({watcher.mode}); {len(queue)} file(s) queued from an "
+        f"earlier run. Press Ctrl+C to stop."
+    )
+    try:
+        if args.dry_run:
+            while True:
+                time.sleep(3600)
+        scheduler = UploadScheduler(upload, jobs=args.jobs, on_result=report)
+        # Runs until stopped: keep no per-file results
+        scheduler.run(queued(), keep_results=False)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        queue.close()
+        watcher.close()
+    print(f"Stopped watching; {len(queue)} file(s) left in the queue.")
@@ -1,44 +1,346 @@
 """
 Client for uploading videos to PeerTube.
 """
+import contextlib
 import os
-import requests
-import urllib3
-import warnings
-from typing import Optional, Union, Dict, Any
+import threading
+import time
+from typing import Optional, Union, Dict, Any, List, Callable, ContextManager, Iterable
+from urllib.parse import urljoin
 from .config import Config
 
+from .cache import DiskCache, TTLCache
+from .metrics import MetricsRecorder
+from .multipart import MultipartEncoder
+from .publish import DEFAULT_PUBLISH_TIMEOUT, PublishStatus, wait_until_published
+from .resumable import DEFAULT_CHUNK_SIZE, AdaptiveChunkSizer, ResumableStateStore, parse_range_offset
+from .session import HttpSession
+from .throttle import BandwidthLimiter, ThrottledBody
 from .token_manager import TokenManager
+from .token_store import TokenStore
+
+# How long the users/me profile (and its channel list) is reused
+PROFILE_TTL = 3600.0
+
+
+def find_channel(channels: List[Dict[str, Any]], selector: str) -> Dict[str, Any]:
+    """
+    Pick a channel by ID, name, display name or handle ('name@host').
+    Name and handle matching is case-insensitive; a leading '@' is ignored.
+    """
+    wanted = selector.strip().lstrip("@").lower()
+    for channel in channels:
+        name = str(channel.get("name", "")).lower()
+        candidates = {str(channel.get("id")), name, str(channel.get("displayName", "")).lower()}
+        if channel.get("host"):
+            candidates.add(f"{name}@{str(channel['host']).lower()}")
+        if wanted in candidates:
+            return channel
+    available = ", ".join(str(c.get("name")) for c in channels)
+    raise ValueError(f"Channel '{selector}' not found; available channels: {available}")
 
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-warnings.filterwarnings('ignore', message='Unverified HTTPS request')
 
 class PeerTubeClient:
     """
     Upload videos to a PeerTube instance using OAuth authentication.
+
+    A client may be shared by several upload threads. An optional
+    ``limiter`` caps the combined upload bandwidth of all of them. All API
+    calls, including token requests, go through one pooled ``session``.
+    The users/me profile is memoized for ``PROFILE_TTL`` seconds and, if a
+    ``profile_cache`` is given, also kept on disk between runs. A
+    ``token_store`` lets several processes and runs share OAuth tokens.
+    With a ``metrics`` recorder, bytes sent and the time spent per phase
+    (token, channel lookup, connect, body send, response wait) are reported
+    to it for the file being uploaded by the calling thread.
     """
-    def __init__(self, config: Config) -> None:
+    def __init__(
+        self,
+        config: Config,
+        limiter: Optional[BandwidthLimiter] = None,
+        session: Optional[HttpSession] = None,
+        profile_cache: Optional[DiskCache] = None,
+        token_store: Optional[TokenStore] = None,
+        metrics: Optional[MetricsRecorder] = None,
+    ) -> None:
         self.config: Config = config
-        self.token_manager: TokenManager = TokenManager(config)
+        self.session: HttpSession = session or HttpSession()
+        self.metrics: Optional[MetricsRecorder] = metrics
+        self.token_manager: TokenManager = TokenManager(
+            config, session=self.session, store=token_store, metrics=metrics
+        )
+        self.limiter: Optional[BandwidthLimiter] = limiter
+        self.profile_cache: Optional[DiskCache] = profile_cache
+        self._profile_memo: TTLCache = TTLCache(PROFILE_TTL)
+        self._profile_lock = threading.Lock()
 
-    def get_channel_id(self) -> int:
+    def _phase(self, name: str) -> ContextManager[None]:
+        if self.metrics is None:
+            return contextlib.nullcontext()
+        return self.metrics.phase(name)
+
+    def get_user_info(self, refresh: bool = False) -> Dict[str, Any]:
+        """
+        Return the authenticated user's profile (users/me), using the cache
+        unless ``refresh`` is set. Concurrent callers share one lookup.
+        """
+        key = f"{self.config.instance_url}|{self.config.username}"
+        with self._profile_lock:
+            if not refresh:
+                info = self._profile_memo.get(key)
+                if info is None and self.profile_cache:
+                    info = self.profile_cache.get(key)
+                    if info is not None:
+                        self._profile_memo.set(key, info)
+                if info is not None:
+                    return info
+            info = self._fetch_user_info()
+            self._profile_memo.set(key, info)
+            if self.profile_cache:
+                self.profile_cache.set(key, info)
+            return info
+
+    def get_channel_id(self, channel: Optional[str] = None) -> int:
         """
-        Fetch the user's first video channel ID.
+        Return a video channel ID of the user from the cached profile.
+
+        Args:
+            channel (str): Optional channel ID, name, display name or handle;
+                the user's first channel is used if not provided.
         """
+        channels = self.get_user_info().get("videoChannels")
+        if not channels:
+            raise Exception("No video channels available for user")
+        if channel is None:
+            return channels[0].get("id")
+        return find_channel(channels, channel).get("id")
+
+    def video_url(self, response: Dict[str, Any]) -> Optional[str]:
+        """
+        Build the watch URL of an uploaded video from an upload response.
+        """
+        video = response.get("video") or {}
+        short_id = video.get("shortUUID") or video.get("uuid")
+        if short_id:
+            return f"{self.config.instance_url}/w/{short_id}"
+        return response.get("url")
+
+    def _fetch_user_info(self) -> Dict[str, Any]:
         token = self.token_manager.get_valid_token()
         url = f"{self.config.instance_url}/api/v1/users/me"
         headers = {
             "Authorization": f"Bearer {token}",
             "Accept": "application/json",
         }
-        # Disable SSL verification to avoid certificate errors
-        resp = requests.get(url, headers=headers, verify=False)
+        resp = self.session.get(url, headers=headers)
         resp.raise_for_status()
-        data = resp.json()
-        channels = data.get("videoChannels")
-        if not channels:
-            raise Exception("No video channels available for user")
-        return channels[0].get("id")
+        return resp.json()
+
+    def list_my_videos(self, start: int = 0, count: int = 100) -> Dict[str, Any]:
+        """
+        Return one page of the user's videos, newest first, including ones
+        still being processed: {"total": int, "data": [video, ...]}.
+        """
+        token = self.token_manager.get_valid_token()
+        url = f"{self.config.instance_url}/api/v1/users/me/videos"
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/json",
+        }
+        params = {"start": start, "count": count, "sort": "-createdAt"}
+        resp = self.session.get(url, headers=headers, params=params)
+        resp.raise_for_status()
+        return resp.json()
+
+    def get_video(self, video_id: Union[int, str]) -> Optional[Dict[str, Any]]:
+        """
+        Return a video's details by ID or UUID, or None if it does not exist.
+        """
+        token = self.token_manager.get_valid_token()
+        url = f"{self.config.instance_url}/api/v1/videos/{video_id}"
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/json",
+        }
+        resp = self.session.get(url, headers=headers)
+        if resp.status_code == 404:
+            return None
+        resp.raise_for_status()
+        return resp.json()
+
+    def list_playlists(self, start: int = 0, count: int = 100) -> Dict[str, Any]:
+        """
+        Return one page of the user's playlists, private ones included:
+        {"total": int, "data": [playlist, ...]}.
+        """
+        token = self.token_manager.get_valid_token()
+        username = self.get_user_info().get("username") or self.config.username
+        url = f"{self.config.instance_url}/api/v1/accounts/{username}/video-playlists"
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/json",
+        }
+        params = {"start": start, "count": count, "sort": "createdAt"}
+        resp = self.session.get(url, headers=headers, params=params)
+        resp.raise_for_status()
+        return resp.json()
+
+    def create_playlist(
+        self,
+        display_name: str,
+        channel_id: Union[int, str],
+        privacy: int = 1,
+        description: str = "",
+    ) -> Dict[str, Any]:
+        """
+        Create a playlist in a channel and return it: {"id", "uuid", "shortUUID"}.
+
+        ``privacy`` is 1 (public), 2 (unlisted) or 3 (private).
+        """
+        token = self.token_manager.get_valid_token()
+        url = f"{self.config.instance_url}/api/v1/video-playlists"
+        headers = {"Authorization": f"Bearer {token}"}
+        fields = {
+            "displayName": display_name,
+            "privacy": str(privacy),
+            "videoChannelId": str(channel_id),
+        }
+        if description:
+            fields["description"] = description
+        # The endpoint only accepts multipart/form-data
+        files = {name: (None, value) for name, value in fields.items()}
+        resp = self.session.post(url, headers=headers, files=files, retry=True)
+        if resp.status_code not in (200, 201):
+            try:
+                detail = resp.json()
+            except Exception:
+                detail = resp.text
+            raise Exception(f"Playlist creation failed: HTTP {resp.status_code} - {detail}")
+        return resp.json()["videoPlaylist"]
+
+    def list_playlist_elements(
+        self, playlist_id: Union[int, str], start: int = 0, count: int = 100
+    ) -> Dict[str, Any]:
+        """
+        Return one page of a playlist's elements in position order:
+        {"total": int, "data": [{"id", "position", "video": {...}}, ...]}.
+        """
+        token = self.token_manager.get_valid_token()
+        url = f"{self.config.instance_url}/api/v1/video-playlists/{playlist_id}/videos"
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/json",
+        }
+        params = {"start": start, "count": count}
+        resp = self.session.get(url, headers=headers, params=params)
+        resp.raise_for_status()
+        return resp.json()
+
+    def add_playlist_element(
+        self, playlist_id: Union[int, str], video_id: Union[int, str]
+    ) -> Dict[str, Any]:
+        """
+        Append a video (by ID or UUID) to a playlist and return the new
+        element: {"id": int}.
+        """
+        token = self.token_manager.get_valid_token()
+        url = f"{self.config.instance_url}/api/v1/video-playlists/{playlist_id}/videos"
+        headers = {"Authorization": f"Bearer {token}"}
+        resp = self.session.post(url, headers=headers, json={"videoId": video_id}, retry=True)
+        if resp.status_code not in (200, 201):
+            try:
+                detail = resp.json()
+            except Exception:
+                detail = resp.text
+            raise Exception(f"Adding to playlist failed: HTTP {resp.status_code} - {detail}")
+        return resp.json()["videoPlaylistElement"]
+
+    def reorder_playlist(
+        self,
+        playlist_id: Union[int, str],
+        start_position: int,
+        insert_after_position: int,
+        length: int = 1,
+    ) -> None:
+        """
+        Move ``length`` elements starting at ``start_position`` to just after
+        ``insert_after_position``. Positions start at 1; 0 moves them to the
+        front.
+        """
+        token = self.token_manager.get_valid_token()
+        url = f"{self.config.instance_url}/api/v1/video-playlists/{playlist_id}/videos/reorder"
+        headers = {"Authorization": f"Bearer {token}"}
+        body = {
+            "startPosition": start_position,
+            "insertAfterPosition": insert_after_position,
+            "reorderLength": length,
+        }
+        resp = self.session.post(url, headers=headers, json=body, retry=True)
+        if resp.status_code not in (200, 204):
+            try:
+                detail = resp.json()
+            except Exception:
+                detail = resp.text
+            raise Exception(f"Playlist reorder failed: HTTP {resp.status_code} - {detail}")
+
+    def list_captions(self, video_id: Union[int, str]) -> Dict[str, Any]:
+        """
+        Return a video's caption tracks:
+        {"total": int, "data": [{"language": {"id", "label"}, "captionPath"}, ...]}.
+        """
+        token = self.token_manager.get_valid_token()
+        url = f"{self.config.instance_url}/api/v1/videos/{video_id}/captions"
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/json",
+        }
+        resp = self.session.get(url, headers=headers)
+        resp.raise_for_status()
+        return resp.json()
+
+    def upload_caption(self, video_id: Union[int, str], language: str, caption_path: str) -> None:
+        """
+        Add or replace a video's caption track in ``language`` (e.g. "fr")
+        from a .vtt or .srt file.
+
+        Raises:
+            FileNotFoundError: If the caption file does not exist.
+            Exception: For HTTP or API errors.
+        """
+        if not os.path.isfile(caption_path):
+            raise FileNotFoundError(f"Caption file not found: {caption_path}")
+        token = self.token_manager.get_valid_token()
+        url = f"{self.config.instance_url}/api/v1/videos/{video_id}/captions/{language}"
+        content_type = "text/vtt" if caption_path.lower().endswith(".vtt") else "application/x-subrip"
+        body = MultipartEncoder({}, "captionfile", caption_path, file_content_type=content_type)
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": body.content_type,
+            "Content-Length": str(len(body)),
+        }
+        resp = self.session.put(url, headers=headers, data=body)
+        if resp.status_code not in (200, 204):
+            try:
+                detail = resp.json()
+            except Exception:
+                detail = resp.text
+            raise Exception(f"Caption upload failed: HTTP {resp.status_code} - {detail}")
+
+    def wait_until_published(
+        self,
+        uuids: Iterable[str],
+        timeout: Optional[float] = DEFAULT_PUBLISH_TIMEOUT,
+        **kwargs: Any,
+    ) -> Dict[str, PublishStatus]:
+        """
+        Wait until PeerTube has finished processing the given videos, for at
+        most ``timeout`` seconds (None waits without limit).
+
+        Returns the last known status of each UUID; see ``PublishWatcher``
+        for the polling options. To keep uploading while waiting, use a
+        ``PublishWatcher`` directly.
+        """
+        return wait_until_published(self, uuids, timeout=timeout, **kwargs)
 
     def upload_video(
         self,
@@ -67,34 +369,37 @@ z
             raise FileNotFoundError(f"Video file not found: {video_path}")
 
         if channel_id is None:
-            channel_id = self.get_channel_id()
+            with self._phase("channel_lookup"):
+                channel_id = self.get_channel_id()
 
-        token = self.token_manager.get_valid_token()
-        # Single-request upload: build multipart/form-data
+        with self._phase("token"):
+            token = self.token_manager.get_valid_token()
+        # Single-request upload: stream a multipart/form-data body
         url = f"{self.config.upload_url}/api/v1/videos/upload"
-        headers = {"Authorization": f"Bearer {token}"}
-        # Prepare form fields as multipart entries
         fields = {
             "name": title,
             "description": description,
             "privacy": 1,
             "channelId": channel_id,
         }
-        multipart = {}
-        # Add form fields (None filename to signal form field)
-        for key, val in fields.items():
-            multipart[key] = (None, str(val))
-        # Add the video file
-        filename = os.path.basename(video_path)
-        with open(video_path, "rb") as f:
-            multipart["videofile"] = (filename, f, "video/mp4")
-            # Execute request (SSL verification disabled)
-            resp = requests.post(
-                url,
-                headers=headers,
-                files=multipart,
-                verify=False,
-            )
+        body = MultipartEncoder(
+            fields,
+            "videofile",
+            video_path,
+            limiter=self.limiter,
+            on_sent=self.metrics.bytes_sent if self.metrics else None,
+        )
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": body.content_type,
+            "Content-Length": str(len(body)),
+        }
+        # Execute request (retried only on 429, or 503 with Retry-After; the body is re-iterable)
+        if self.metrics:
+            self.metrics.request_started()
+        resp = self.session.post(url, headers=headers, data=body, retry=True)
+        if self.metrics:
+            self.metrics.request_finished()
         # Handle response: if success, return JSON, else raise with payload
         if resp.status_code not in (200, 201):
             # Attempt to extract JSON error, fallback to text
@@ -104,3 +409,243 @@ z
                 detail = resp.text
             raise Exception(f"Upload failed: HTTP {resp.status_code} - {detail}")
         return resp.json()
+
+    def upload_video_resumable(
+        self,
+        video_path: str,
+        title: str,
+        description: str = "",
+        channel_id: Optional[Union[int, str]] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        state_store: Optional[ResumableStateStore] = None,
+        max_retries: int = 5,
+        chunk_sizer: Optional[AdaptiveChunkSizer] = None,
+        reader: Optional[Callable[[int, int], bytes]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Upload a video using PeerTube's resumable upload protocol.
+
+        The file is sent in chunks of ``chunk_size`` bytes with PUT and
+        Content-Range. The session URL and last acknowledged offset are saved
+        in ``state_store`` after each chunk, so a rerun after a crash resumes
+        from where the server stopped instead of starting over. With a
+        ``chunk_sizer``, ``chunk_size`` is ignored: chunk sizes start at the
+        sizer's and follow the measured round-trip time and throughput.
+
+        Args:
+            video_path (str): Path to the .mp4 file.
+            title (str): Title of the video.
+            description (str): Description of the video.
+            channel_id (str|int): Optional channel ID; fetched if not provided.
+            chunk_size (int): Number of bytes sent per PUT request.
+            state_store (ResumableStateStore): Where session state is kept.
+            max_retries (int): Consecutive connection failures, or chunks
+                the server answered without keeping any of, tolerated
+                before giving up (state is kept for a later rerun).
+            chunk_sizer (AdaptiveChunkSizer): Optional adaptive chunk sizing.
+            reader (callable): ``reader(offset, size)`` returning up to
+                ``size`` bytes of the file at ``offset``, used instead of
+                reading the file directly (e.g. a shared ``RingReader``).
+
+        Returns:
+            dict: JSON response from PeerTube with upload details.
+
+        Raises:
+            FileNotFoundError: If the video file does not exist.
+            ValueError: If the video file is empty.
+            Exception: For HTTP or API errors.
+        """
+        if not os.path.isfile(video_path):
+            raise FileNotFoundError(f"Video file not found: {video_path}")
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be a positive number of bytes")
+        import requests
+
+        size = os.path.getsize(video_path)
+        if not size:
+            # There is no valid Content-Range for an empty chunk
+            raise ValueError(f"Video file is empty: {video_path}")
+        store = state_store or ResumableStateStore()
+
+        upload_url = None
+        offset = 0
+        state = store.load(video_path)
+        if state and state.get("size") == size:
+            upload_url = state.get("upload_url")
+            status = self._query_resumable_offset(upload_url, size)
+            if status is None:
+                # Session expired or unknown to the server: start over
+                upload_url = None
+            elif isinstance(status, dict):
+                store.clear(video_path)
+                return status
+            else:
+                offset = status
+
+        if not upload_url:
+            if channel_id is None:
+                with self._phase("channel_lookup"):
+                    channel_id = self.get_channel_id()
+            if chunk_sizer is not None:
+                # Fetch the token first so it is not counted as round-trip time
+                with self._phase("token"):
+                    self.token_manager.get_valid_token()
+            started = time.monotonic()
+            upload_url = self._init_resumable_upload(
+                video_path, size, title, description, channel_id
+            )
+            if chunk_sizer is not None:
+                chunk_sizer.observe_rtt(time.monotonic() - started)
+            offset = 0
+            store.save(video_path, {"upload_url": upload_url, "offset": 0, "size": size})
+
+        failures = 0
+        # offset is None while the server's position is unknown (after a drop)
+        resume_offset: Optional[int] = offset
+        with contextlib.ExitStack() as stack:
+            if reader is None:
+                f = stack.enter_context(open(video_path, "rb"))
+
+                def reader(offset: int, length: int) -> bytes:
+                    f.seek(offset)
+                    return f.read(length)
+
+            while True:
+                try:
+                    if resume_offset is None:
+                        started = time.monotonic()
+                        status = self._query_resumable_offset(upload_url, size)
+                        if chunk_sizer is not None:
+                            chunk_sizer.observe_rtt(time.monotonic() - started)
+                        if status is None:
+                            store.clear(video_path)
+                            raise Exception("Resumable upload session was lost by the server")
+                        if isinstance(status, dict):
+                            store.clear(video_path)
+                            return status
+                        resume_offset = status
+                        store.save(
+                            video_path,
+                            {"upload_url": upload_url, "offset": resume_offset, "size": size},
+                        )
+                    if chunk_sizer is not None:
+                        chunk_size = chunk_sizer.size
+                    chunk = reader(resume_offset, min(chunk_size, size - resume_offset))
+                    with self._phase("token"):
+                        token = self.token_manager.get_valid_token()
+                    headers = {
+                        "Authorization": f"Bearer {token}",
+                        "Content-Type": "application/octet-stream",
+                        "Content-Range": (
+                            f"bytes {resume_offset}-{resume_offset + len(chunk) - 1}/{size}"
+                        ),
+                    }
+                    # Dropped chunks are recovered below from the server's offset
+                    # Paced in small pieces instead of paying for the chunk up front
+                    body = ThrottledBody(chunk, self.limiter) if self.limiter else chunk
+                    started = time.monotonic()
+                    with self._phase("body_send"):
+                        resp = self.session.put(
+                            upload_url, headers=headers, data=body, retry=False
+                        )
+                except requests.exceptions.ConnectionError:
+                    if chunk_sizer is not None:
+                        chunk_sizer.failed()
+                    failures += 1
+                    if failures > max_retries:
+                        raise
+                    # Ask the server how much of the interrupted chunk it kept
+                    resume_offset = None
+                    continue
+
+                if resp.status_code in (200, 201, 308):
+                    if chunk_sizer is not None:
+                        chunk_sizer.record(len(chunk), time.monotonic() - started)
+                    # Count only what the server acknowledged; a 308 may keep
+                    # part of the chunk, which is then sent again
+                    if resp.status_code == 308:
+                        new_offset = parse_range_offset(resp.headers.get("Range"))
+                        acked = max(new_offset - resume_offset, 0)
+                    else:
+                        acked = size - resume_offset
+                    if self.metrics:
+                        self.metrics.bytes_sent(acked)
+                if resp.status_code == 308:
+                    if new_offset > resume_offset:
+                        failures = 0
+                    else:
+                        # The server kept none of the chunk; do not resend it forever
+                        failures += 1
+                        if failures > max_retries:
+                            raise Exception(
+                                f"Upload failed: server stopped accepting data at byte {new_offset}"
+                            )
+                    resume_offset = new_offset
+                    store.save(
+                        video_path,
+                        {"upload_url": upload_url, "offset": resume_offset, "size": size},
+                    )
+                    continue
+                if resp.status_code in (200, 201):
+                    store.clear(video_path)
+                    return resp.json()
+                try:
+                    detail = resp.json()
+                except Exception:
+                    detail = resp.text
+                raise Exception(f"Upload failed: HTTP {resp.status_code} - {detail}")
+
+    def _init_resumable_upload(
+        self,
+        video_path: str,
+        size: int,
+        title: str,
+        description: str,
+        channel_id: Union[int, str],
+    ) -> str:
+        """
+        Open a resumable upload session and return its absolute upload URL.
+        """
+        token = self.token_manager.get_valid_token()
+        url = f"{self.config.upload_url}/api/v1/videos/upload-resumable"
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "X-Upload-Content-Length": str(size),
+            "X-Upload-Content-Type": "video/mp4",
+        }
+        body = {
+            "name": title,
+            "description": description,
+            "privacy": 1,
+            "channelId": channel_id,
+            "filename": os.path.basename(video_path),
+        }
+        resp = self.session.post(url, headers=headers, json=body, retry=True)
+        if resp.status_code not in (200, 201) or not resp.headers.get("Location"):
+            raise Exception(
+                f"Resumable upload init failed: HTTP {resp.status_code} - {resp.text}"
+            )
+        # PeerTube answers with a protocol-relative Location ("//host/...")
+        return urljoin(url, resp.headers["Location"])
+
+    def _query_resumable_offset(
+        self, upload_url: str, size: int
+    ) -> Optional[Union[int, Dict[str, Any]]]:
+        """
+        Ask the server how many bytes of a session it has stored.
+
+        Returns the next offset to send, the upload JSON if the server already
+        has the whole file, or None if the session no longer exists.
+        """
+        token = self.token_manager.get_valid_token()
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Content-Length": "0",
+            "Content-Range": f"bytes */{size}",
+        }
+        resp = self.session.put(upload_url, headers=headers)
+        if resp.status_code == 308:
+            return parse_range_offset(resp.headers.get("Range"))
+        if resp.status_code in (200, 201):
+            return resp.json()
+        return None
@@ -1,47 +1,95 @@
-# Disable SSL warnings for unverified HTTPS requests
-import warnings
-import urllib3
-from urllib3.exceptions import InsecureRequestWarning
-
-urllib3.disable_warnings(InsecureRequestWarning)
-warnings.filterwarnings('ignore', message='Unverified HTTPS request')
 """
 Configuration loader for PeerTube uploader.
 """
 import os
-# Optionally load environment variables from a .env file in the current working directory
-# Optionally load .env via python-dotenv if available
-try:
-    from dotenv import load_dotenv
-    env_path = os.path.join(os.getcwd(), '.env')
-    if os.path.isfile(env_path):
+from functools import lru_cache
+from typing import Dict, Mapping, Optional
+
+from .throttle import parse_rate
+
+
+@lru_cache(maxsize=None)
+def load_env(path: Optional[str] = None) -> bool:
+    """
+    Load variables from a .env file (default: ``.env`` in the current
+    working directory) into ``os.environ``. Returns whether a file was found.
+
+    Nothing is read at import time; ``Config()`` calls this on first use and
+    the result is memoized per path, so the file is parsed at most once per
+    process. python-dotenv is used when installed (its values override the
+    environment); otherwise key=value lines are parsed by hand and only fill
+    variables that are not already set.
+    """
+    env_path = path or os.path.join(os.getcwd(), '.env')
+    if not os.path.isfile(env_path):
+        return False
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        # python-dotenv not available: manual parsing of key=value lines
+        for key, val in _parse_env_file(env_path).items():
+            os.environ.setdefault(key, val)
+    else:
         load_dotenv(env_path, override=True)
-except ImportError:
-    # python-dotenv not available
-    pass
-
-# Fallback: manual parsing of .env key=value lines
-_env_path = os.path.join(os.getcwd(), '.env')
-if os.path.isfile(_env_path):
-    with open(_env_path, 'r', encoding='utf-8') as _f:
-        for _line in _f:
-            _line = _line.strip()
-            if not _line or _line.startswith('#') or '=' not in _line:
+    return True
+
+
+def _parse_env_file(path: str) -> Dict[str, str]:
+    values = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#') or '=' not in line:
                 continue
-            _key, _val = _line.split('=', 1)
-            _key = _key.strip()
-            _val = _val.strip()
+            key, val = line.split('=', 1)
+            key = key.strip()
+            val = val.strip()
             # Strip surrounding quotes
-            if (_val.startswith('"') and _val.endswith('"')) or (_val.startswith("'") and _val.endswith("'")):
-                _val = _val[1:-1].strip()
-            os.environ.setdefault(_key, _val)
+            if (val.startswith('"') and val.endswith('"')) or (val.startswith("'") and val.endswith("'")):
+                val = val[1:-1].strip()
+            values[key] = val
+    return values
+
+
+def read_env_file(path: str) -> Dict[str, str]:
+    """
+    Return the variables defined in a .env file without touching os.environ.
+    """
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"Environment file not found: {path}")
+    try:
+        from dotenv import dotenv_values
+    except ImportError:
+        return _parse_env_file(path)
+    return {key: val for key, val in dotenv_values(path).items() if val is not None}
+
+
+def queue_token() -> Optional[str]:
+    """
+    Return the job queue coordinator's shared token: QUEUE_TOKEN from the
+    environment or the working directory's .env, if set.
+    """
+    load_env()
+    token = os.environ.get("QUEUE_TOKEN", "").strip()
+    return token or None
+
+
+# Variables an instance profile takes from the environment when it does not
+# set them: local paths, not anything that belongs to an instance
+PROFILE_SHARED_KEYS = ("PATH_TO_COURSES",)
+
 
 class Config:
     """
     Load and store PeerTube configuration from environment variables.
     Required variables: UPLOAD_URL, PEERTUBE_INSTANCE, CLIENT_ID,
-    CLIENT_SECRET, USERNAME, PASSWORD. Optional VERIFY_SSL.
+    CLIENT_SECRET, USERNAME, PASSWORD. Optional VERIFY_SSL and
+    MAX_UPLOAD_RATE (bytes/s, e.g. 500K or 20M) and PEERTUBE_CHANNEL (the
+    channel to upload to, for instance profiles).
     Surrounding whitespace and quotes are stripped from values.
+
+    ``env`` replaces the process environment as the source of variables;
+    see ``from_env_file`` for per-instance profiles.
     """
     client_id: str
     client_secret: str
@@ -51,12 +99,17 @@ class Config:
     upload_url: str
     instance_url: str
     course_path: str
+    max_bandwidth: Optional[int]
+    channel: Optional[str]
 
-    def __init__(self) -> None:
+    def __init__(self, env: Optional[Mapping[str, str]] = None) -> None:
+        if env is None:
+            load_env()
+            env = os.environ
         missing = []
         # Helper to read and clean env vars
         def _get_env(name, required=True, default=None):
-            raw = os.getenv(name)
+            raw = env.get(name)
             if raw is None:
                 if required:
                     missing.append(name)
@@ -77,6 +130,10 @@ class Config:
         # SSL verification flag
         verify_raw = _get_env("VERIFY_SSL", required=False, default="true")
         self.verify_ssl = str(verify_raw).lower() in ("true", "1", "yes")
+        # Upload bandwidth cap shared by all uploads
+        rate_raw = _get_env("MAX_UPLOAD_RATE", required=False)
+        self.max_bandwidth = parse_rate(rate_raw) if rate_raw else None
+        self.channel = _get_env("PEERTUBE_CHANNEL", required=False)
         # Courses directory path
         courses_path = _get_env("PATH_TO_COURSES")
         self.course_path = (
@@ -90,4 +147,18 @@ class Config:
 
         # Normalize URLs
         self.upload_url = upload.rstrip('/') if upload else upload
-        self.instance_url = instance.rstrip('/') if instance else instance
\ No newline at end of file
+        self.instance_url = instance.rstrip('/') if instance else instance
+
+    @classmethod
+    def from_env_file(cls, path: str) -> "Config":
+        """
+        Load an instance profile: a .env file with the same variables.
+        Only the variables in PROFILE_SHARED_KEYS are taken from the
+        environment (including the working directory's .env) when the file
+        does not set them; credentials, channel and MAX_UPLOAD_RATE must come
+        from the profile itself.
+        """
+        values = read_env_file(path)
+        load_env()
+        shared = {key: os.environ[key] for key in PROFILE_SHARED_KEYS if key in os.environ}
+        return cls({**shared, **values})
@@ -0,0 +1,106 @@
+"""
+HTTP coordinator serving an SQLite job queue to workers on other hosts.
+"""
+import hmac
+import json
+import secrets
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+from .jobqueue import SQLiteJobQueue
+
+# Queue methods workers may call, with the parameters each accepts
+_METHODS = {
+    "root": (),
+    "add": ("root", "entries"),
+    "claim": ("worker", "lease", "max_attempts"),
+    "heartbeat": ("token", "lease"),
+    "complete": ("token", "result"),
+    "fail": ("token", "error", "retry"),
+    "counts": (),
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "JobServer"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        method = self.path.strip("/")
+        expected = f"Bearer {self.server.token}".encode("utf-8")
+        given = (self.headers.get("Authorization") or "").encode("utf-8")
+        if not hmac.compare_digest(given, expected):
+            self.rfile.read(length)
+            self._send_json(401, {"error": "missing or wrong queue token"})
+            return
+        if method not in _METHODS:
+            self.rfile.read(length)
+            self._send_json(404, {"error": f"unknown method '{method}'"})
+            return
+        try:
+            params = json.loads(self.rfile.read(length) or b"{}")
+            kwargs = {name: params[name] for name in _METHODS[method] if name in params}
+            result = getattr(self.server.queue, method)(**kwargs)
+        except (ValueError, TypeError) as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        if method == "claim" and result is not None:
+            result = result._asdict()
+        self._send_json(200, {"result": result})
+
+
+class JobServer(ThreadingHTTPServer):
+    """
+    Serve ``queue`` over HTTP for ``HttpJobQueue`` clients.
+
+    Each queue method is a ``POST /<method>`` with JSON parameters and a
+    ``{"result": ...}`` reply. Leases are timed by this host's clock, so the
+    workers' clocks do not matter. Use as a context manager to serve on a
+    background thread, or call ``serve_forever()``.
+
+    Every request must carry ``Authorization: Bearer <token>``; requests
+    without it are refused with 401. When no ``token`` is given a random one
+    is generated (see ``token``).
+    """
+    daemon_threads = True
+
+    def __init__(
+        self,
+        queue: SQLiteJobQueue,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        token: Optional[str] = None,
+    ) -> None:
+        super().__init__((host, port), _Handler)
+        self.queue: SQLiteJobQueue = queue
+        self.token: str = token or secrets.token_urlsafe(32)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "JobServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
@@ -0,0 +1,160 @@
+"""
+Chapter title lookup from course markdown files, parsed once per file.
+"""
+import json
+import os
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+from .utils import parse_filenames
+
+Chapters = Dict[Tuple[int, int], str]
+
+
+def parse_course_markdown(md_path: str) -> Chapters:
+    """
+    Parse a course markdown file into a {(part, chapter): title} table.
+
+    A '+++' line demarcates front matter; parsing starts after the closing
+    one. Level-1 headings (#) count parts and level-2 headings (##) count
+    chapters within the current part, both starting at 1.
+    """
+    chapters: Chapters = {}
+    with open(md_path, 'r', encoding='utf-8') as f:
+        # Skip until first '+++'
+        for line in f:
+            if line.strip().startswith('+++'):
+                break
+        # Skip until closing '+++'
+        for line in f:
+            if line.strip().startswith('+++'):
+                break
+
+        part = 0
+        chapter = 0
+        for line in f:
+            if line.startswith('# '):
+                part += 1
+                chapter = 0
+            elif line.startswith('## ') and part:
+                chapter += 1
+                chapters[(part, chapter)] = line.lstrip('#').strip()
+    return chapters
+
+
+class CourseIndex:
+    """
+    Cache of parsed course markdown files under ``course_path``.
+
+    Each ``{course_path}/{course}/{lang}.md`` is parsed once and reused until
+    its mtime changes. With a ``cache_path``, parsed tables are loaded from and
+    written to a JSON file by ``save()``, so later runs skip parsing too.
+    Safe to share between threads.
+    """
+    def __init__(self, course_path: str, cache_path: Optional[str] = None) -> None:
+        self.course_path: str = course_path
+        self.cache_path: Optional[str] = cache_path
+        self._files: Dict[str, Tuple[int, Chapters]] = {}
+        self._lock = threading.Lock()
+        if cache_path:
+            self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        for md_path, entry in data.items():
+            table = {(part, chapter): title for part, chapter, title in entry["chapters"]}
+            self._files[md_path] = (entry["mtime_ns"], table)
+
+    def save(self) -> None:
+        """
+        Write parsed tables to ``cache_path`` (no-op without one).
+        """
+        if not self.cache_path:
+            return
+        with self._lock:
+            data = {
+                md_path: {
+                    "mtime_ns": mtime_ns,
+                    "chapters": [[p, c, title] for (p, c), title in table.items()],
+                }
+                for md_path, (mtime_ns, table) in self._files.items()
+            }
+        directory = os.path.dirname(self.cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.cache_path)
+
+    def markdown_path(self, course_index: str, code_language: str) -> str:
+        return os.path.join(self.course_path, course_index, f"{code_language}.md")
+
+    def chapters(self, course_index: str, code_language: str) -> Chapters:
+        """
+        Return the (part, chapter) -> title table of a course language.
+
+        Raises:
+            FileNotFoundError: If the course markdown file does not exist.
+        """
+        md_path = self.markdown_path(course_index, code_language)
+        try:
+            mtime_ns = os.stat(md_path).st_mtime_ns
+        except OSError:
+            raise FileNotFoundError(f"Course markdown not found: {md_path}")
+        with self._lock:
+            cached = self._files.get(md_path)
+            if cached and cached[0] == mtime_ns:
+                return cached[1]
+        table = parse_course_markdown(md_path)
+        with self._lock:
+            self._files[md_path] = (mtime_ns, table)
+        return table
+
+    def get_chapter_name(
+        self,
+        course_index: str,
+        part_chapter: Tuple[int, int],
+        code_language: str,
+    ) -> str:
+        """
+        Return the title of one chapter.
+
+        Raises:
+            FileNotFoundError: If the course markdown file does not exist.
+            ValueError: If the chapter is not in the file.
+        """
+        title = self.chapters(course_index, code_language).get(tuple(part_chapter))
+        if title is None:
+            part, chapter = part_chapter
+            raise ValueError(
+                f"Chapter {chapter} of part {part} not found in "
+                f"{self.markdown_path(course_index, code_language)}"
+            )
+        return title
+
+    def resolve_titles(self, file_paths: Iterable[str]) -> Dict[str, Optional[str]]:
+        """
+        Resolve chapter titles for many video files in one pass.
+
+        Filenames are parsed for course, part.chapter and language; each
+        markdown file is read at most once. Files whose metadata or chapter
+        cannot be resolved map to None.
+        """
+        paths = list(file_paths)
+        titles: Dict[str, Optional[str]] = {}
+        for path, info in zip(paths, parse_filenames(paths)):
+            if info.course is None or info.part is None or info.lang is None:
+                titles[path] = None
+                continue
+            try:
+                table = self.chapters(info.course, info.lang)
+            except FileNotFoundError:
+                titles[path] = None
+                continue
+            titles[path] = table.get((info.part, info.chapter))
+        return titles
@@ -0,0 +1,89 @@
+"""
+Find files with identical content so each video is uploaded once.
+"""
+from concurrent.futures import Executor, Future
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .finder import ScanEntry
+from .fingerprint import full_hash, partial_hash
+
+
+class Deduplicator:
+    """
+    Drop scanned files whose content duplicates an earlier file.
+
+    Candidates are narrowed in stages, so most files are never read:
+    files of a unique size are kept without hashing, same-size files are
+    compared by a head/tail ``partial_hash``, and only files that still
+    collide are hashed in full. Hashes run in a process pool (or the given
+    ``executor``); partial hashes are submitted as soon as a size collides,
+    while the scan is still running.
+
+    The first file found with some content is kept. After ``unique()`` is
+    exhausted, ``duplicates`` maps each kept path to the paths of its copies.
+    """
+    def __init__(self, workers: Optional[int] = None, executor: Optional[Executor] = None) -> None:
+        self.workers: Optional[int] = workers
+        self.duplicates: Dict[str, List[str]] = {}
+        self._executor: Optional[Executor] = executor
+        self._owns_executor: bool = executor is None
+
+    @property
+    def duplicate_count(self) -> int:
+        return sum(len(paths) for paths in self.duplicates.values())
+
+    def _submit(self, fn: Callable[[str], str], path: str) -> "Future[str]":
+        if self._executor is None:
+            # Started on the first collision; runs with no duplicates never spawn workers
+            from concurrent.futures import ProcessPoolExecutor
+
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor.submit(fn, path)
+
+    def unique(self, entries: Iterable[ScanEntry]) -> Iterator[ScanEntry]:
+        """
+        Yield the entries that are not copies of an earlier entry, in scan
+        order, once the scan has finished.
+        """
+        order: List[ScanEntry] = []
+        by_size: Dict[int, List[ScanEntry]] = {}
+        partials: Dict[str, "Future[str]"] = {}
+        try:
+            for entry in entries:
+                order.append(entry)
+                group = by_size.setdefault(entry.size, [])
+                group.append(entry)
+                if len(group) == 2:
+                    partials[group[0].path] = self._submit(partial_hash, group[0].path)
+                if len(group) >= 2:
+                    partials[entry.path] = self._submit(partial_hash, entry.path)
+
+            candidates: Dict[Tuple[int, str], List[ScanEntry]] = {}
+            for size, group in by_size.items():
+                if len(group) > 1:
+                    for entry in group:
+                        key = (size, partials[entry.path].result())
+                        candidates.setdefault(key, []).append(entry)
+
+            colliding = [group for group in candidates.values() if len(group) > 1]
+            fulls = {
+                entry.path: self._submit(full_hash, entry.path)
+                for group in colliding
+                for entry in group
+            }
+            copies = set()
+            for group in colliding:
+                kept: Dict[str, str] = {}
+                for entry in group:
+                    original = kept.setdefault(fulls[entry.path].result(), entry.path)
+                    if original != entry.path:
+                        self.duplicates.setdefault(original, []).append(entry.path)
+                        copies.add(entry.path)
+        finally:
+            if self._owns_executor and self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+        for entry in order:
+            if entry.path not in copies:
+                yield entry
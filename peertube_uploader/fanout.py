@@ -0,0 +1,281 @@
+"""
+Upload each file to several PeerTube instances while reading it only once.
+"""
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, NamedTuple, Optional, Union
+
+from .resumable import DEFAULT_CHUNK_SIZE, DEFAULT_STATE_DIR, ResumableStateStore
+
+if TYPE_CHECKING:
+    from .client import PeerTubeClient
+
+# Chunks kept in memory per file: how far the fastest instance may get
+# ahead of the slowest before the slowest falls back to reading from disk
+DEFAULT_RING_SLOTS = 8
+
+# How long the reader waits for a lagging instance before detaching it: long
+# enough to ride out a slow chunk request, so detaching (and the extra disk
+# reads it costs) only happens to an instance that is really behind
+DEFAULT_STALL_TIMEOUT = 30.0
+
+
+class BufferRing:
+    """
+    Read a file once into a ring of ``slots`` chunks shared by ``consumers``.
+
+    A background thread reads the file sequentially. Each consumer gets a
+    ``RingReader`` and reads forward through the ring; a slot is reused only
+    once every attached consumer has moved past it. If a consumer holds up
+    the reader for more than ``stall_timeout`` seconds with the ring full, it
+    is detached and reads the rest of the file from disk itself, so a slow
+    instance delays the others by at most that long and at most ``slots``
+    chunks of memory are used per file.
+    """
+    def __init__(
+        self,
+        path: str,
+        consumers: int,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        slots: int = DEFAULT_RING_SLOTS,
+        stall_timeout: float = DEFAULT_STALL_TIMEOUT,
+    ) -> None:
+        if slots < 1 or chunk_size <= 0:
+            raise ValueError("slots and chunk_size must be positive")
+        self.path: str = path
+        self.size: int = os.path.getsize(path)
+        self.chunk_size: int = chunk_size
+        self.slots: int = slots
+        self.stall_timeout: float = stall_timeout
+        self.bytes_read: int = 0
+        self._ring: List[Optional[bytes]] = [None] * slots
+        # Chunks [_first, _next) are held in the ring
+        self._first: int = 0
+        self._next: int = 0
+        self._error: Optional[BaseException] = None
+        # Set once the producer has stopped, whether or not it read everything
+        self._eof: bool = False
+        self._cond = threading.Condition()
+        self.readers: List[RingReader] = [RingReader(self, i) for i in range(consumers)]
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "BufferRing":
+        self._thread = threading.Thread(target=self._produce, name="buffer-ring", daemon=True)
+        self._thread.start()
+        return self
+
+    def _produce(self) -> None:
+        try:
+            with open(self.path, "rb", buffering=0) as f:
+                while self._next * self.chunk_size < self.size:
+                    with self._cond:
+                        if not self._attached():
+                            # Every upload finished or failed early
+                            return
+                        if self._next - self._first >= self.slots:
+                            self._free_oldest()
+                    data = f.read(self.chunk_size)
+                    if not data:
+                        raise IOError(f"File shrank during upload: {self.path}")
+                    with self._cond:
+                        self._ring[self._next % self.slots] = data
+                        self._next += 1
+                        self.bytes_read += len(data)
+                        self._cond.notify_all()
+        except BaseException as exc:
+            with self._cond:
+                self._error = exc
+        finally:
+            with self._cond:
+                self._eof = True
+                self._cond.notify_all()
+
+    def _attached(self) -> List["RingReader"]:
+        return [r for r in self.readers if not r.detached and not r.closed]
+
+    def _free_oldest(self) -> None:
+        # Called with the lock held and the ring full
+        end = (self._first + 1) * self.chunk_size
+        deadline = time.monotonic() + self.stall_timeout
+        while True:
+            lagging = [r for r in self._attached() if r.position < end]
+            remaining = deadline - time.monotonic()
+            if not lagging or remaining <= 0:
+                break
+            self._cond.wait(remaining)
+        for reader in lagging:
+            reader.detached = True
+        self._ring[self._first % self.slots] = None
+        self._first += 1
+        self._cond.notify_all()
+
+    def _read(self, reader: "RingReader", offset: int, size: int) -> Optional[bytes]:
+        """
+        Serve ``offset`` from the ring, or None if it must come from disk.
+        """
+        if offset >= self.size:
+            return b""
+        index = offset // self.chunk_size
+        with self._cond:
+            if offset > reader.position:
+                reader.position = offset
+                self._cond.notify_all()
+            while True:
+                if reader.detached or index < self._first:
+                    return None
+                if index < self._next:
+                    data = self._ring[index % self.slots]
+                    start = offset - index * self.chunk_size
+                    return data[start:start + size]
+                if self._error is not None:
+                    raise self._error
+                if self._eof:
+                    # Stopped early (every reader had gone); read from disk
+                    return None
+                self._cond.wait()
+
+    def _release(self, reader: "RingReader") -> None:
+        with self._cond:
+            reader.closed = True
+            self._cond.notify_all()
+
+    def close(self) -> None:
+        for reader in self.readers:
+            reader.close()
+
+
+class RingReader:
+    """
+    One consumer's view of a ``BufferRing``; ``read(offset, size)`` returns
+    up to ``size`` bytes at ``offset`` (possibly fewer, up to a chunk end).
+    """
+    def __init__(self, ring: BufferRing, index: int) -> None:
+        self.ring = ring
+        self.index: int = index
+        self.position: int = 0
+        self.detached: bool = False
+        self.closed: bool = False
+        # Bytes this consumer had to read from disk itself
+        self.disk_bytes: int = 0
+        self._file = None
+
+    def read(self, offset: int, size: int) -> bytes:
+        data = self.ring._read(self, offset, size)
+        if data is not None:
+            return data
+        # Detached, or retrying a chunk the ring has already dropped
+        if self._file is None:
+            self._file = open(self.ring.path, "rb", buffering=0)
+        data = os.pread(self._file.fileno(), size, offset)
+        self.disk_bytes += len(data)
+        return data
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.ring._release(self)
+
+
+class FanoutTarget(NamedTuple):
+    """
+    One instance to upload to.
+    """
+    name: str
+    client: "PeerTubeClient"
+    channel_id: Optional[Union[int, str]] = None
+
+
+class FanoutResult(NamedTuple):
+    """
+    Outcome of uploading one file to one instance.
+    """
+    target: str
+    response: Optional[Dict[str, Any]]
+    error: Optional[BaseException]
+    seconds: float
+    disk_bytes: int
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class FanoutUploader:
+    """
+    Upload files to several instances at once, reading each file once.
+
+    Every file gets a ``BufferRing`` feeding one resumable upload per target
+    in parallel; chunk PUTs use the ring's chunk size. Resumable session
+    state is kept per target so reruns resume on each instance separately.
+    """
+    def __init__(
+        self,
+        targets: Iterable[FanoutTarget],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        slots: int = DEFAULT_RING_SLOTS,
+        stall_timeout: float = DEFAULT_STALL_TIMEOUT,
+        state_dir: Optional[str] = None,
+    ) -> None:
+        self.targets: Dict[str, FanoutTarget] = {t.name: t for t in targets}
+        self.chunk_size: int = chunk_size
+        self.slots: int = slots
+        self.stall_timeout: float = stall_timeout
+        base = state_dir or DEFAULT_STATE_DIR
+        self._stores: Dict[str, ResumableStateStore] = {}
+        for target in self.targets.values():
+            key = hashlib.sha1(target.client.config.upload_url.encode("utf-8")).hexdigest()[:16]
+            self._stores[target.name] = ResumableStateStore(os.path.join(base, key))
+        self._lock = threading.Lock()
+        # Bytes read from disk by rings, and re-read by detached readers
+        self.bytes_read: int = 0
+        self.bytes_reread: int = 0
+
+    def upload(
+        self,
+        video_path: str,
+        title: str,
+        description: str = "",
+        only: Optional[Iterable[str]] = None,
+    ) -> Dict[str, FanoutResult]:
+        """
+        Upload ``video_path`` to every target (or those named in ``only``)
+        and return a result per target name. Failures are reported in the
+        results rather than raised.
+        """
+        names = [name for name in self.targets if only is None or name in set(only)]
+        if not names:
+            return {}
+        ring = BufferRing(video_path, len(names), self.chunk_size, self.slots, self.stall_timeout)
+
+        def send(name: str, reader: RingReader) -> FanoutResult:
+            target = self.targets[name]
+            started = time.monotonic()
+            try:
+                response = target.client.upload_video_resumable(
+                    video_path,
+                    title,
+                    description,
+                    channel_id=target.channel_id,
+                    chunk_size=self.chunk_size,
+                    state_store=self._stores[name],
+                    reader=reader.read,
+                )
+                error = None
+            except Exception as exc:
+                response, error = None, exc
+            finally:
+                reader.close()
+            return FanoutResult(name, response, error, time.monotonic() - started, reader.disk_bytes)
+
+        ring.start()
+        with ThreadPoolExecutor(max_workers=len(names)) as pool:
+            futures = {name: pool.submit(send, name, reader) for name, reader in zip(names, ring.readers)}
+            results = {name: future.result() for name, future in futures.items()}
+        with self._lock:
+            self.bytes_read += ring.bytes_read
+            self.bytes_reread += sum(r.disk_bytes for r in results.values())
+        return results
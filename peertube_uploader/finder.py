@@ -1,15 +1,140 @@
 """
 Utilities for finding .mp4 files in directories.
 """
+import json
 import os
-from typing import Iterator
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Set
 
-def find_mp4_files(directory: str) -> Iterator[str]:
+from .cache import DEFAULT_CACHE_DIR
+
+DEFAULT_SCAN_INDEX_PATH = os.path.join(DEFAULT_CACHE_DIR, "scan_index.json")
+
+
+class ScanEntry(NamedTuple):
+    """
+    A video file found by the scanner, with the stat data read while listing.
+    """
+    path: str
+    size: int
+    mtime_ns: int
+
+
+class ScanIndex:
+    """
+    Persisted directory listings keyed by directory path and mtime.
+
+    A directory whose mtime is unchanged since the last scan has the same
+    children, so its cached listing is reused instead of listing it again.
+    Sizes and mtimes of files are those seen when the directory was last
+    listed: a file rewritten in place does not touch the directory mtime, so
+    its entry keeps the old values until the directory changes. Callers that
+    act on a file's content stat or fingerprint it themselves.
+    """
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path: str = path or DEFAULT_SCAN_INDEX_PATH
+        self.dirs: Dict[str, Dict[str, Any]] = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.dirs = json.load(f)
+        except (OSError, ValueError):
+            self.dirs = {}
+
+    def get(self, directory: str, mtime_ns: int) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached listing of a directory if its mtime still matches.
+        """
+        entry = self.dirs.get(directory)
+        if entry and entry["mtime_ns"] == mtime_ns:
+            return entry
+        return None
+
+    def put(self, directory: str, mtime_ns: int, files: List[List[Any]], dirs: List[str]) -> None:
+        self.dirs[directory] = {"mtime_ns": mtime_ns, "files": files, "dirs": dirs}
+
+    def prune(self, root: str, seen: Set[str]) -> None:
+        """
+        Drop cached directories under ``root`` that no longer exist.
+        """
+        prefix = root.rstrip(os.sep) + os.sep
+        for directory in list(self.dirs):
+            if directory not in seen and (directory == root or directory.startswith(prefix)):
+                del self.dirs[directory]
+
+    def save(self) -> None:
+        """
+        Atomically write the index to disk.
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.dirs, f)
+        os.replace(tmp_path, self.path)
+
+
+def _list_directory(directory: str) -> Dict[str, Any]:
+    files: List[List[Any]] = []
+    dirs: List[str] = []
+    with os.scandir(directory) as it:
+        for entry in it:
+            name = entry.name
+            # Like os.walk, do not descend into symlinked directories
+            if entry.is_dir(follow_symlinks=False):
+                dirs.append(name)
+            elif name[-4:].lower() == ".mp4" and entry.is_file():
+                st = entry.stat()
+                files.append([name, st.st_size, st.st_mtime_ns])
+    return {"files": files, "dirs": dirs}
+
+
+def scan_mp4_files(directory: str, index: Optional[ScanIndex] = None) -> Iterator[ScanEntry]:
+    """
+    Recursively yield every .mp4 file under ``directory`` as a ScanEntry.
+
+    Uses ``os.scandir`` so file type checks come from the directory listing.
+    With an ``index``, a warm scan costs one stat per directory: unchanged
+    directories are not listed again, their files are not stat'ed (sizes and
+    mtimes are those of the last listing, see ``ScanIndex``), and the index
+    is updated (but not saved) as the scan goes. Results are yielded
+    as soon as each directory is read, so callers can start work before the
+    scan finishes.
+    """
+    # Walk with the caller's path spelling but key the index by absolute path
+    root_key = os.path.abspath(directory)
+    seen: Set[str] = set()
+    stack = [(directory, root_key)]
+    while stack:
+        current, key = stack.pop()
+        listing = None
+        if index is not None:
+            try:
+                mtime_ns = os.stat(current).st_mtime_ns
+            except OSError:
+                continue
+            seen.add(key)
+            listing = index.get(key, mtime_ns)
+        if listing is None:
+            try:
+                listing = _list_directory(current)
+            except OSError:
+                continue
+            if index is not None:
+                index.put(key, mtime_ns, listing["files"], listing["dirs"])
+        for name, size, file_mtime_ns in listing["files"]:
+            yield ScanEntry(os.path.join(current, name), size, file_mtime_ns)
+        stack.extend(
+            (os.path.join(current, name), os.path.join(key, name))
+            for name in reversed(listing["dirs"])
+        )
+    if index is not None:
+        index.prune(root_key, seen)
+
+
+def find_mp4_files(directory: str, index: Optional[ScanIndex] = None) -> Iterator[str]:
     """
     Recursively find all .mp4 files in the given directory.
     Yields full file paths.
     """
-    for root, dirs, files in os.walk(directory):
-        for name in files:
-            if name.lower().endswith(".mp4"):
-                yield os.path.join(root, name)
\ No newline at end of file
+    for entry in scan_mp4_files(directory, index):
+        yield entry.path
@@ -0,0 +1,61 @@
+"""
+Cheap content fingerprints for video files.
+"""
+import hashlib
+import mmap
+import os
+
+# Bytes hashed from each end of the file
+DEFAULT_BLOCK_SIZE = 64 * 1024
+
+# Bytes fed to the hash per update in full_hash
+DEFAULT_HASH_CHUNK = 8 * 1024 * 1024
+
+
+def partial_hash(path: str, block_size: int = DEFAULT_BLOCK_SIZE) -> str:
+    """
+    BLAKE2b digest of the file size plus its first and last ``block_size``
+    bytes. Reads at most two blocks whatever the file size.
+    """
+    size = os.path.getsize(path)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(str(size).encode("ascii"))
+    with open(path, "rb") as f:
+        h.update(f.read(block_size))
+        if size > block_size:
+            f.seek(max(block_size, size - block_size))
+            h.update(f.read(block_size))
+    return h.hexdigest()
+
+
+def file_fingerprint(path: str, block_size: int = DEFAULT_BLOCK_SIZE) -> str:
+    """
+    Identify a file by size, mtime and a head/tail partial hash.
+
+    Returns a string of the form '{size}-{mtime_ns}-{partial_hash}'.
+    """
+    st = os.stat(path)
+    return f"{st.st_size}-{st.st_mtime_ns}-{partial_hash(path, block_size)}"
+
+
+def full_hash(path: str, chunk_size: int = DEFAULT_HASH_CHUNK) -> str:
+    """
+    BLAKE2b digest of the whole file contents.
+
+    The file is memory-mapped and hashed in ``chunk_size`` slices, so no read
+    buffers are copied and the GIL is released while each slice is hashed.
+    """
+    h = hashlib.blake2b(digest_size=32)
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            # mmap cannot map an empty file
+            return h.hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                for offset in range(0, size, chunk_size):
+                    h.update(view[offset:offset + chunk_size])
+            finally:
+                view.release()
+    return h.hexdigest()
@@ -0,0 +1,504 @@
+"""
+Shared job queue that lets several workers, on one or more hosts, split an upload batch.
+"""
+import json
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+if TYPE_CHECKING:
+    import sqlite3
+
+    from .session import HttpSession
+
+DEFAULT_LEASE = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    size INTEGER NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    token TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    result TEXT,
+    completed_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, lease_expires);
+CREATE UNIQUE INDEX IF NOT EXISTS jobs_token ON jobs (token);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+class Job(NamedTuple):
+    """
+    A claimed file. ``path`` is relative to the queue root; ``token``
+    identifies this claim and is needed to renew or finish it.
+    """
+    id: int
+    path: str
+    size: int
+    token: str
+    attempts: int
+
+
+class JobQueue(ABC):
+    """
+    Interface of the shared queues (``SQLiteJobQueue``, ``HttpJobQueue``).
+
+    Jobs are ``pending``, ``claimed`` (leased to a worker until
+    ``lease_expires``), ``done`` or ``failed``. A claimed job whose lease ran
+    out is handed to the next worker that asks, so files held by a crashed
+    worker are picked up again. ``complete`` and ``fail`` only take effect
+    while the caller's claim is current, so each job is recorded done once.
+    """
+    @abstractmethod
+    def root(self) -> Optional[str]:
+        """
+        Folder the queued paths are relative to.
+        """
+
+    @abstractmethod
+    def add(self, root: str, entries: Iterable[Tuple[str, int]]) -> int:
+        """
+        Queue (path, size) entries found under ``root`` and return how many
+        were new. The first call sets the queue root; later ones must add
+        files under it.
+        """
+
+    @abstractmethod
+    def claim(
+        self, worker: str, lease: float = DEFAULT_LEASE, max_attempts: Optional[int] = None
+    ) -> Optional[Job]:
+        """
+        Lease the next pending (or abandoned) job to ``worker``, if any.
+        An abandoned job already claimed ``max_attempts`` times (e.g. one
+        that crashes its worker) is marked failed instead of claimed again.
+        """
+
+    @abstractmethod
+    def heartbeat(self, token: str, lease: float = DEFAULT_LEASE) -> bool:
+        """
+        Extend a claim by ``lease`` seconds; False if it was lost.
+        """
+
+    @abstractmethod
+    def complete(self, token: str, result: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Record a claimed job as done; False if the claim was lost.
+        """
+
+    @abstractmethod
+    def fail(self, token: str, error: str, retry: bool = True) -> bool:
+        """
+        Give a claimed job back (to be retried) or mark it failed.
+        """
+
+    @abstractmethod
+    def counts(self) -> Dict[str, int]:
+        """
+        Return the number of jobs per state.
+        """
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteJobQueue(JobQueue):
+    """
+    Job queue in an SQLite file, e.g. on a filesystem shared by the workers.
+
+    Every change is one ``BEGIN IMMEDIATE`` transaction, so concurrent
+    claims from different processes never hand out the same job. The
+    default rollback journal is used rather than WAL, which needs shared
+    memory and does not work over network filesystems. Lease times come from
+    each worker's clock; keep hosts in sync (NTP) and leases well above the
+    clock skew. Safe to share between threads.
+    """
+    def __init__(self, path: str, timeout: float = 30.0) -> None:
+        # Only the queue commands need sqlite3; keep it out of CLI startup
+        import sqlite3
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path: str = path
+        self.timeout: float = timeout
+        self._lock = threading.Lock()
+        self._errors = sqlite3.OperationalError
+        # SQLite's own busy handler backs off to long sleeps, and a busy
+        # process keeps winning the lock; _retry polls briefly instead
+        self._db: "sqlite3.Connection" = sqlite3.connect(
+            path, timeout=0, isolation_level=None, check_same_thread=False
+        )
+        with self._transaction() as db:
+            # executescript() would commit; run the statements one by one
+            for statement in _SCHEMA.split(";"):
+                if statement.strip():
+                    db.execute(statement)
+
+    def _retry(self, sql: str, params: Tuple[Any, ...] = ()) -> "sqlite3.Cursor":
+        """
+        Execute ``sql``, retrying while another process holds the lock.
+        """
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                return self._db.execute(sql, params)
+            except self._errors as e:
+                if "locked" not in str(e) or time.monotonic() >= deadline:
+                    raise
+            time.sleep(random.uniform(0.001, 0.01))
+
+    @contextmanager
+    def _transaction(self) -> Iterator["sqlite3.Connection"]:
+        with self._lock:
+            self._retry("BEGIN IMMEDIATE")
+            try:
+                yield self._db
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._retry("COMMIT")
+
+    def _query(self, sql: str, params: Tuple[Any, ...] = ()) -> List[Tuple[Any, ...]]:
+        with self._lock:
+            return self._retry(sql, params).fetchall()
+
+    def root(self) -> Optional[str]:
+        rows = self._query("SELECT value FROM meta WHERE key = 'root'")
+        return rows[0][0] if rows else None
+
+    def add(self, root: str, entries: Iterable[Tuple[str, int]]) -> int:
+        root = os.path.abspath(root)
+        with self._transaction() as db:
+            row = db.execute("SELECT value FROM meta WHERE key = 'root'").fetchone()
+            if row is None:
+                db.execute("INSERT INTO meta (key, value) VALUES ('root', ?)", (root,))
+            else:
+                root = row[0]
+            rows = []
+            for path, size in entries:
+                rel = os.path.relpath(os.path.abspath(path), root)
+                if rel.startswith(os.pardir):
+                    raise ValueError(f"'{path}' is outside the queue root '{root}'")
+                rows.append((rel, size))
+            before = db.total_changes
+            db.executemany("INSERT OR IGNORE INTO jobs (path, size) VALUES (?, ?)", rows)
+            return db.total_changes - before
+
+    def claim(
+        self, worker: str, lease: float = DEFAULT_LEASE, max_attempts: Optional[int] = None
+    ) -> Optional[Job]:
+        query = (
+            "SELECT id, path, size, attempts FROM jobs "
+            "WHERE state = 'pending' OR (state = 'claimed' AND lease_expires < ?) "
+            "ORDER BY id LIMIT 1"
+        )
+        # Idle workers poll; check without the write lock so they do not
+        # hold up the commits of busy ones
+        if not self._query(query, (time.time(),)):
+            return None
+        with self._transaction() as db:
+            now = time.time()
+            if max_attempts is not None:
+                db.execute(
+                    "UPDATE jobs SET state = 'failed', token = NULL, lease_expires = NULL, "
+                    "error = 'lease expired on the last attempt (worker lost)' "
+                    "WHERE state = 'claimed' AND lease_expires < ? AND attempts >= ?",
+                    (now, max_attempts),
+                )
+            row = db.execute(query, (now,)).fetchone()
+            if row is None:
+                return None
+            token = uuid.uuid4().hex
+            db.execute(
+                "UPDATE jobs SET state = 'claimed', worker = ?, token = ?, lease_expires = ?, "
+                "attempts = attempts + 1 WHERE id = ?",
+                (worker, token, now + lease, row[0]),
+            )
+        return Job(row[0], row[1], row[2], token, row[3] + 1)
+
+    def heartbeat(self, token: str, lease: float = DEFAULT_LEASE) -> bool:
+        with self._transaction() as db:
+            cur = db.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE token = ? AND state = 'claimed'",
+                (time.time() + lease, token),
+            )
+            return cur.rowcount == 1
+
+    def complete(self, token: str, result: Optional[Dict[str, Any]] = None) -> bool:
+        with self._transaction() as db:
+            cur = db.execute(
+                "UPDATE jobs SET state = 'done', result = ?, completed_at = ?, error = NULL "
+                "WHERE token = ? AND state = 'claimed'",
+                (json.dumps(result), time.time(), token),
+            )
+            if cur.rowcount == 1:
+                return True
+            # A retried request for a completion that was already recorded
+            row = db.execute("SELECT state FROM jobs WHERE token = ?", (token,)).fetchone()
+            return row is not None and row[0] == "done"
+
+    def fail(self, token: str, error: str, retry: bool = True) -> bool:
+        with self._transaction() as db:
+            cur = db.execute(
+                "UPDATE jobs SET state = ?, error = ?, token = NULL, lease_expires = NULL "
+                "WHERE token = ? AND state = 'claimed'",
+                ("pending" if retry else "failed", error, token),
+            )
+            return cur.rowcount == 1
+
+    def counts(self) -> Dict[str, int]:
+        counts = {"pending": 0, "claimed": 0, "done": 0, "failed": 0}
+        for state, count in self._query("SELECT state, COUNT(*) FROM jobs GROUP BY state"):
+            counts[state] = count
+        return counts
+
+    def jobs(self, state: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Return every job (or those in ``state``) as a dict, for reports.
+        """
+        names = ["id", "path", "size", "state", "worker", "attempts", "error", "result", "completed_at"]
+        query = f"SELECT {', '.join(names)} FROM jobs"
+        params: Tuple[Any, ...] = ()
+        if state is not None:
+            query += " WHERE state = ?"
+            params = (state,)
+        rows = [dict(zip(names, row)) for row in self._query(query + " ORDER BY id", params)]
+        for row in rows:
+            row["result"] = json.loads(row["result"]) if row["result"] else None
+        return rows
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class HttpJobQueue(JobQueue):
+    """
+    Client for a queue served by ``JobServer`` (``upload-folder-peertube
+    queue serve``). Leases are timed by the coordinator's clock. ``token``
+    is the coordinator's shared token, sent as a bearer token.
+    """
+    def __init__(
+        self, url: str, session: Optional["HttpSession"] = None, token: Optional[str] = None
+    ) -> None:
+        from .session import HttpSession
+
+        self.url: str = url.rstrip("/")
+        self.session: "HttpSession" = session or HttpSession(pool_size=4)
+        self.token: Optional[str] = token
+
+    def _call(self, method: str, **params: Any) -> Any:
+        headers = {"Authorization": f"Bearer {self.token}"} if self.token else None
+        resp = self.session.post(f"{self.url}/{method}", json=params, headers=headers, retry=True)
+        try:
+            payload = resp.json()
+        except ValueError:
+            payload = {}
+        if resp.status_code != 200:
+            raise Exception(
+                f"Job queue request '{method}' failed: {resp.status_code} "
+                f"{payload.get('error') or resp.text}"
+            )
+        return payload["result"]
+
+    def root(self) -> Optional[str]:
+        return self._call("root")
+
+    def add(self, root: str, entries: Iterable[Tuple[str, int]]) -> int:
+        return self._call("add", root=os.path.abspath(root), entries=[list(e) for e in entries])
+
+    def claim(
+        self, worker: str, lease: float = DEFAULT_LEASE, max_attempts: Optional[int] = None
+    ) -> Optional[Job]:
+        job = self._call("claim", worker=worker, lease=lease, max_attempts=max_attempts)
+        return Job(**job) if job else None
+
+    def heartbeat(self, token: str, lease: float = DEFAULT_LEASE) -> bool:
+        return self._call("heartbeat", token=token, lease=lease)
+
+    def complete(self, token: str, result: Optional[Dict[str, Any]] = None) -> bool:
+        return self._call("complete", token=token, result=result)
+
+    def fail(self, token: str, error: str, retry: bool = True) -> bool:
+        return self._call("fail", token=token, error=error, retry=retry)
+
+    def counts(self) -> Dict[str, int]:
+        return self._call("counts")
+
+    def close(self) -> None:
+        self.session.close()
+
+
+def open_job_queue(spec: str, token: Optional[str] = None) -> JobQueue:
+    """
+    Open a queue from an ``http(s)://`` coordinator URL (with its shared
+    ``token``) or an SQLite file path.
+    """
+    if spec.startswith(("http://", "https://")):
+        return HttpJobQueue(spec, token=token)
+    return SQLiteJobQueue(spec)
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobResult(NamedTuple):
+    """
+    Outcome of one job run by a ``QueueWorker``. ``recorded`` is False when
+    the claim was lost to another worker before the result was saved, or
+    when saving it failed with ``queue_error``; the claim then runs out and
+    the job is claimed again.
+    """
+    job: Job
+    response: Optional[Dict[str, Any]]
+    error: Optional[BaseException]
+    recorded: bool
+    queue_error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class QueueWorker:
+    """
+    Claim jobs from a ``JobQueue`` and run ``upload(job)`` on ``jobs``
+    threads until no pending or claimed jobs are left.
+
+    Each claim is a lease of ``lease`` seconds that a heartbeat thread renews
+    every third of that while the upload runs; if the worker dies, its leases
+    run out and other workers claim the files again. While other workers
+    still hold claims, idle threads keep polling every ``poll_interval``
+    seconds to take over any that are abandoned. A job that fails is
+    retried, by any worker, until it has been claimed ``max_attempts`` times;
+    that includes claims abandoned by crashed workers. ``upload`` returns a
+    JSON-serializable result saved with the job. Errors from the queue itself
+    (SQLite or HTTP) never stop a worker thread: failed claims are retried
+    after ``poll_interval`` and reported to ``on_queue_error``, and a result
+    that could not be saved is reported in its ``JobResult``.
+    """
+    def __init__(
+        self,
+        queue: JobQueue,
+        upload: Callable[[Job], Optional[Dict[str, Any]]],
+        worker_id: Optional[str] = None,
+        jobs: int = 1,
+        lease: float = DEFAULT_LEASE,
+        max_attempts: int = 3,
+        poll_interval: float = 5.0,
+        on_result: Optional[Callable[[JobResult], None]] = None,
+        on_queue_error: Optional[Callable[[BaseException], None]] = None,
+    ) -> None:
+        if jobs < 1:
+            raise ValueError("jobs must be at least 1")
+        self.queue = queue
+        self.upload = upload
+        self.worker_id: str = worker_id or default_worker_id()
+        self.jobs: int = jobs
+        self.lease: float = lease
+        self.max_attempts: int = max_attempts
+        self.poll_interval: float = poll_interval
+        self.on_result = on_result
+        self.on_queue_error = on_queue_error
+        self.results: List[JobResult] = []
+        self._active: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        # Serializes on_result so per-file output lines never interleave
+        self.output_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def _heartbeat(self) -> None:
+        while not self._stop.wait(self.lease / 3):
+            with self._lock:
+                tokens = list(self._active)
+            for token in tokens:
+                try:
+                    self.queue.heartbeat(token, self.lease)
+                except Exception:
+                    # Try again next beat; the lease outlasts a few misses
+                    pass
+
+    def _run_one(self, job: Job) -> JobResult:
+        with self._lock:
+            self._active[job.token] = job
+        try:
+            try:
+                response = self.upload(job)
+            except Exception as exc:
+                retry = job.attempts < self.max_attempts
+                try:
+                    recorded = self.queue.fail(job.token, str(exc) or type(exc).__name__, retry)
+                except Exception as queue_exc:
+                    return JobResult(job, None, exc, False, queue_exc)
+                return JobResult(job, None, exc, recorded)
+            try:
+                recorded = self.queue.complete(job.token, response)
+            except Exception as queue_exc:
+                return JobResult(job, response, None, False, queue_exc)
+            return JobResult(job, response, None, recorded)
+        finally:
+            with self._lock:
+                del self._active[job.token]
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                job = self.queue.claim(self.worker_id, self.lease, self.max_attempts)
+                counts = self.queue.counts() if job is None else None
+            except Exception as exc:
+                if self.on_queue_error:
+                    with self.output_lock:
+                        self.on_queue_error(exc)
+                self._stop.wait(self.poll_interval)
+                continue
+            if job is None:
+                if not counts.get("pending") and not counts.get("claimed"):
+                    return
+                self._stop.wait(self.poll_interval)
+                continue
+            result = self._run_one(job)
+            with self.output_lock:
+                self.results.append(result)
+                if self.on_result:
+                    self.on_result(result)
+
+    def run(self) -> List[JobResult]:
+        """
+        Work until the queue is drained (or ``stop()``), then return the
+        results of the jobs this worker ran.
+        """
+        beat = threading.Thread(target=self._heartbeat, name="queue-heartbeat", daemon=True)
+        beat.start()
+        threads = [
+            threading.Thread(target=self._loop, name=f"queue-worker-{i}", daemon=True)
+            for i in range(self.jobs)
+        ]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                # Short joins keep the main thread responsive to Ctrl+C
+                while thread.is_alive():
+                    thread.join(0.5)
+        finally:
+            self._stop.set()
+        return self.results
+
+    def stop(self) -> None:
+        """
+        Stop claiming new jobs; uploads in progress still finish.
+        """
+        self._stop.set()
@@ -0,0 +1,94 @@
+"""
+Append-only record of completed uploads, used to skip files on reruns.
+"""
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .cache import DEFAULT_CACHE_DIR
+
+DEFAULT_LEDGER_PATH = os.path.join(DEFAULT_CACHE_DIR, "ledger.jsonl")
+
+
+class UploadLedger:
+    """
+    JSONL ledger of uploaded files keyed by (instance URL, file fingerprint).
+
+    The whole file is loaded into a dict when opened, so lookups are O(1).
+    New entries are appended and flushed immediately, so a crash loses at
+    most the upload that was in flight. A later entry for the same key wins.
+    Safe to share between upload threads.
+    """
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path: str = path or DEFAULT_LEDGER_PATH
+        self._entries: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        # Set when the file ends in a partial line left by a crash
+        self._needs_newline: bool = False
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            f = open(self.path, "r", encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                self._needs_newline = not line.endswith("\n")
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Ignore a line truncated by a crash mid-write
+                    continue
+                self._entries[(entry["instance"], entry["fingerprint"])] = entry
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, instance: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the ledger entry for a file on an instance, if it was uploaded.
+        """
+        return self._entries.get((instance, fingerprint))
+
+    def entries(self, instance: str) -> List[Dict[str, Any]]:
+        """
+        Return the entries recorded for an instance, oldest first.
+        """
+        with self._lock:
+            found = [entry for (inst, _), entry in self._entries.items() if inst == instance]
+        return sorted(found, key=lambda entry: entry.get("uploaded_at") or 0)
+
+    def record(
+        self,
+        instance: str,
+        fingerprint: str,
+        path: str,
+        uuid: Optional[str],
+        url: Optional[str],
+    ) -> Dict[str, Any]:
+        """
+        Append a completed upload to the ledger.
+        """
+        entry = {
+            "instance": instance,
+            "fingerprint": fingerprint,
+            "path": os.path.abspath(path),
+            "uuid": uuid,
+            "url": url,
+            "uploaded_at": time.time(),
+        }
+        line = json.dumps(entry) + "\n"
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                if self._needs_newline:
+                    f.write("\n")
+                    self._needs_newline = False
+                f.write(line)
+            self._entries[(instance, fingerprint)] = entry
+        return entry
@@ -0,0 +1,115 @@
+"""
+Upload manifests: metadata planned up front, one JSON object per line.
+"""
+import json
+import os
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+from .course_index import CourseIndex
+from .finder import ScanEntry
+from .utils import generate_description, generate_title, parse_filenames
+
+# Files are planned and written in batches of this many entries
+PLAN_BATCH_SIZE = 1000
+
+
+def parse_line_range(spec: str) -> Tuple[int, Optional[int]]:
+    """
+    Parse a 1-based inclusive line range: '1-5000', '5001-' or '42'.
+    Returns (first, last) with last None for an open range.
+    """
+    first, sep, last = spec.partition("-")
+    try:
+        start = int(first)
+        end = (int(last) if last else None) if sep else start
+    except ValueError:
+        raise ValueError(f"Invalid line range '{spec}'; expected e.g. 1-5000 or 5001-")
+    if start < 1 or (end is not None and end < start):
+        raise ValueError(f"Invalid line range '{spec}'")
+    return start, end
+
+
+def plan_entries(
+    entries: Iterable[ScanEntry],
+    channel_id: Union[int, str, None] = None,
+    course_index: Optional[CourseIndex] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Build manifest records for scanned files.
+
+    Each record holds the upload metadata (title, description, channel ID),
+    the course, part, chapter and language parsed from the filename, the
+    chapter title when ``course_index`` can resolve it, and the size and
+    mtime seen while scanning so ``execute`` can tell if a file changed.
+    Filenames are parsed and titles resolved in batches of
+    ``PLAN_BATCH_SIZE``; each course markdown file is read once.
+    """
+    batch = []
+    for entry in entries:
+        batch.append(entry)
+        if len(batch) >= PLAN_BATCH_SIZE:
+            yield from _plan_batch(batch, channel_id, course_index)
+            batch = []
+    if batch:
+        yield from _plan_batch(batch, channel_id, course_index)
+
+
+def _plan_batch(
+    batch: Iterable[ScanEntry],
+    channel_id: Union[int, str, None],
+    course_index: Optional[CourseIndex],
+) -> Iterator[Dict[str, Any]]:
+    batch = list(batch)
+    paths = [entry.path for entry in batch]
+    titles = course_index.resolve_titles(paths) if course_index else {}
+    for entry, info in zip(batch, parse_filenames(paths)):
+        yield {
+            "path": os.path.abspath(entry.path),
+            "size": entry.size,
+            "mtime_ns": entry.mtime_ns,
+            "title": generate_title(entry.path),
+            "description": generate_description(entry.path),
+            "channel_id": channel_id,
+            "course": info.course,
+            "part": info.part,
+            "chapter": info.chapter,
+            "lang": info.lang,
+            "chapter_title": titles.get(entry.path),
+        }
+
+
+def write_manifest(path: str, records: Iterable[Dict[str, Any]]) -> int:
+    """
+    Atomically write records as JSONL. Returns the number written.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    count = 0
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+            count += 1
+    os.replace(tmp_path, path)
+    return count
+
+
+def read_manifest(
+    path: str,
+    first: int = 1,
+    last: Optional[int] = None,
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Stream (line number, record) pairs from a manifest, limited to the
+    1-based inclusive line range [first, last]. Blank lines are skipped but
+    still counted, so ranges are stable for a given file.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            if line_no < first:
+                continue
+            if last is not None and line_no > last:
+                break
+            if line.strip():
+                yield line_no, json.loads(line)
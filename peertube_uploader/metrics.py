@@ -0,0 +1,260 @@
+"""
+Per-file upload metrics, phase timing and live progress reporting.
+"""
+import contextlib
+import csv
+import json
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, TextIO
+
+# Phases reported for each file, in the order they happen
+PHASES = ("token", "channel_lookup", "connect", "body_send", "response_wait")
+
+
+class UploadMetrics:
+    """
+    Timing and byte counts for one uploaded file.
+
+    ``phases`` holds seconds spent per phase (see ``PHASES``; token refreshes
+    are also counted under ``token_refresh``). ``ttfb`` is the time from
+    sending the last byte of the request body until the response arrived.
+    """
+    __slots__ = (
+        "path", "size", "bytes_sent", "started", "finished", "phases",
+        "ttfb", "status", "error", "extra", "_request_start", "_first_byte", "_last_byte",
+    )
+
+    def __init__(self, path: str, size: int) -> None:
+        self.path: str = path
+        self.size: int = size
+        self.bytes_sent: int = 0
+        self.started: float = time.time()
+        self.finished: Optional[float] = None
+        self.phases: Dict[str, float] = {}
+        self.ttfb: Optional[float] = None
+        self.status: str = "running"
+        self.error: Optional[str] = None
+        # Free-form per-file fields added by other stages (e.g. media probing)
+        self.extra: Dict[str, Any] = {}
+        self._request_start: Optional[float] = None
+        self._first_byte: Optional[float] = None
+        self._last_byte: Optional[float] = None
+
+    def add_phase(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        duration = (self.finished or time.time()) - self.started
+        row = {
+            "path": self.path,
+            "size": self.size,
+            "bytes_sent": self.bytes_sent,
+            "status": self.status,
+            "error": self.error,
+            "started": round(self.started, 3),
+            "duration_s": round(duration, 4),
+            "mb_per_s": round(self.bytes_sent / duration / 1e6, 3) if duration > 0 else None,
+            "ttfb_s": round(self.ttfb, 4) if self.ttfb is not None else None,
+        }
+        for name in PHASES + ("token_refresh",):
+            row[f"{name}_s"] = round(self.phases.get(name, 0.0), 4)
+        row.update(self.extra)
+        return row
+
+
+class MetricsRecorder:
+    """
+    Collect UploadMetrics for every file of a run.
+
+    ``track()`` binds a record to the current thread, so the hooks called
+    by ``PeerTubeClient`` and ``TokenManager`` from that thread (``phase``,
+    ``bytes_sent``, ``request_started``, ``request_finished``) are attributed
+    to the file being uploaded. Hooks called outside ``track()`` only update
+    the run totals.
+    """
+    def __init__(self) -> None:
+        self.records: List[UploadMetrics] = []
+        self.started: float = time.monotonic()
+        self.total_bytes_sent: int = 0
+        self.bytes_queued: int = 0
+        self.files_done: int = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def current(self) -> Optional[UploadMetrics]:
+        return getattr(self._local, "record", None)
+
+    def queued(self, size: int) -> None:
+        """
+        Count a file that will be uploaded, for the ETA estimate.
+        """
+        with self._lock:
+            self.bytes_queued += size
+
+    @contextlib.contextmanager
+    def track(self, path: str, size: int) -> Iterator[UploadMetrics]:
+        """
+        Record metrics for uploading ``path`` in the current thread.
+        """
+        record = UploadMetrics(path, size)
+        with self._lock:
+            self.records.append(record)
+        self._local.record = record
+        try:
+            yield record
+            record.status = "ok"
+        except BaseException as exc:
+            record.status = "failed"
+            record.error = str(exc)
+            raise
+        finally:
+            record.finished = time.time()
+            self._local.record = None
+            with self._lock:
+                self.files_done += 1
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Time a block as phase ``name`` of the current file.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record = self.current
+            if record is not None:
+                record.add_phase(name, time.perf_counter() - start)
+
+    def bytes_sent(self, nbytes: int) -> None:
+        now = time.perf_counter()
+        with self._lock:
+            self.total_bytes_sent += nbytes
+        record = self.current
+        if record is not None:
+            record.bytes_sent += nbytes
+            if record._first_byte is None:
+                record._first_byte = now
+            record._last_byte = now
+
+    def request_started(self) -> None:
+        record = self.current
+        if record is not None:
+            record._request_start = time.perf_counter()
+            record._first_byte = record._last_byte = None
+
+    def request_finished(self) -> None:
+        """
+        Split the request just finished into connect, body_send and
+        response_wait using the byte timestamps. The response wait is also
+        recorded as the TTFB, since it excludes the time spent on the body.
+        """
+        record = self.current
+        if record is None or record._request_start is None:
+            return
+        end = time.perf_counter()
+        first = record._first_byte or end
+        last = record._last_byte or first
+        record.add_phase("connect", first - record._request_start)
+        record.add_phase("body_send", last - first)
+        record.add_phase("response_wait", end - last)
+        record.ttfb = end - last
+        record._request_start = None
+
+    def aggregate(self) -> Dict[str, Any]:
+        """
+        Run totals: files done, bytes sent, average rate and ETA.
+        """
+        with self._lock:
+            sent, queued, done, started = (
+                self.total_bytes_sent, self.bytes_queued, self.files_done, len(self.records)
+            )
+        elapsed = time.monotonic() - self.started
+        rate = sent / elapsed if elapsed > 0 else 0.0
+        remaining = max(0, queued - sent)
+        return {
+            "files_done": done,
+            "files_started": started,
+            "bytes_sent": sent,
+            "bytes_queued": queued,
+            "elapsed_s": elapsed,
+            "bytes_per_s": rate,
+            "eta_s": remaining / rate if rate > 0 else None,
+        }
+
+    def write_report(self, path: str) -> None:
+        """
+        Write per-file metrics as CSV (if ``path`` ends in .csv) or JSON.
+        """
+        rows = [record.to_dict() for record in self.records]
+        if path.lower().endswith(".csv"):
+            fieldnames: List[str] = []
+            for row in rows:
+                fieldnames.extend(k for k in row if k not in fieldnames)
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=fieldnames)
+                writer.writeheader()
+                writer.writerows(rows)
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"summary": self.aggregate(), "files": rows}, f, indent=2)
+
+
+def format_progress(stats: Dict[str, Any]) -> str:
+    """
+    Render aggregate stats as a one-line progress summary.
+    """
+    eta = stats["eta_s"]
+    eta_text = f"{int(eta // 60)}m{int(eta % 60):02d}s" if eta is not None else "--"
+    return (
+        f"{stats['files_done']}/{stats['files_started']} files, "
+        f"{stats['bytes_sent'] / 1e6:.1f} MB sent, "
+        f"{stats['bytes_per_s'] / 1e6:.2f} MB/s, ETA {eta_text}"
+    )
+
+
+class ProgressLine:
+    """
+    Print the recorder's aggregate progress every ``interval`` seconds from a
+    background thread. On a terminal the line is redrawn in place.
+    """
+    def __init__(
+        self,
+        recorder: MetricsRecorder,
+        interval: float = 1.0,
+        stream: TextIO = sys.stderr,
+        lock: Optional[Any] = None,
+    ) -> None:
+        self.recorder = recorder
+        self.interval = interval
+        self.stream = stream
+        self.lock = lock or threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._draw()
+
+    def _draw(self) -> None:
+        line = format_progress(self.recorder.aggregate())
+        with self.lock:
+            if self.stream.isatty():
+                self.stream.write(f"\r\033[K{line}")
+            else:
+                self.stream.write(f"{line}\n")
+            self.stream.flush()
+
+    def __enter__(self) -> "ProgressLine":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._draw()
+        if self.stream.isatty():
+            self.stream.write("\n")
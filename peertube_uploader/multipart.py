@@ -0,0 +1,104 @@
+"""
+Streaming multipart/form-data body for large video uploads.
+"""
+import os
+import uuid
+from typing import Callable, Dict, Iterator, Optional, Union
+
+from .throttle import BandwidthLimiter
+
+# Size of the reusable read buffer (1 MiB)
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+# Characters percent-encoded in quoted Content-Disposition parameters, as
+# urllib3 and browsers (HTML5 form encoding) do: quote, CR and LF
+_PARAM_ESCAPES = {ord('"'): "%22", ord("\r"): "%0D", ord("\n"): "%0A"}
+
+
+def _header_param(name: str, value: str) -> str:
+    """
+    Format a quoted Content-Disposition parameter, escaping the characters
+    that would end the value or the header line.
+    """
+    return f'{name}="{value.translate(_PARAM_ESCAPES)}"'
+
+
+class MultipartEncoder:
+    """
+    Build a multipart/form-data body with one file part without loading the
+    file into memory.
+
+    The encoder is iterable: each iteration re-opens the file and yields the
+    body in pieces, reading the file with ``readinto`` into a single reused
+    buffer and yielding ``memoryview`` slices of it, so memory use is bounded
+    by ``buffer_size`` whatever the file size. Because the body is
+    re-iterable, a request can be retried by iterating again. ``len()``
+    returns the exact body size so callers can send Content-Length up front.
+    If a ``limiter`` is given, every file buffer is paid for before it is
+    yielded. ``on_sent`` is called with the size of each file buffer once the
+    consumer has taken it (i.e. written it to the connection).
+    """
+    def __init__(
+        self,
+        fields: Dict[str, Union[str, int]],
+        file_field: str,
+        file_path: str,
+        filename: Optional[str] = None,
+        file_content_type: str = "video/mp4",
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        boundary: Optional[str] = None,
+        limiter: Optional[BandwidthLimiter] = None,
+        on_sent: Optional[Callable[[int], None]] = None,
+    ) -> None:
+        self.file_path: str = file_path
+        self.buffer_size: int = buffer_size
+        self.limiter: Optional[BandwidthLimiter] = limiter
+        self.on_sent: Optional[Callable[[int], None]] = on_sent
+        self.boundary: str = boundary or uuid.uuid4().hex
+        self.file_size: int = os.path.getsize(file_path)
+
+        parts = []
+        for key, val in fields.items():
+            parts.append(
+                f"--{self.boundary}\r\n"
+                f"Content-Disposition: form-data; {_header_param('name', key)}\r\n\r\n"
+                f"{val}\r\n"
+            )
+        name = filename or os.path.basename(file_path)
+        parts.append(
+            f"--{self.boundary}\r\n"
+            f"Content-Disposition: form-data; {_header_param('name', file_field)}; "
+            f"{_header_param('filename', name)}\r\n"
+            f"Content-Type: {file_content_type}\r\n\r\n"
+        )
+        self.head: bytes = "".join(parts).encode("utf-8")
+        self.tail: bytes = f"\r\n--{self.boundary}--\r\n".encode("utf-8")
+
+    @property
+    def content_type(self) -> str:
+        """
+        Value for the request's Content-Type header.
+        """
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self) -> int:
+        return len(self.head) + self.file_size + len(self.tail)
+
+    def __iter__(self) -> Iterator[Union[bytes, memoryview]]:
+        yield self.head
+        buf = bytearray(self.buffer_size)
+        view = memoryview(buf)
+        remaining = self.file_size
+        with open(self.file_path, "rb", buffering=0) as f:
+            while remaining > 0:
+                n = f.readinto(view[:min(self.buffer_size, remaining)])
+                if not n:
+                    raise IOError(f"File shrank during upload: {self.file_path}")
+                remaining -= n
+                if self.limiter:
+                    self.limiter.consume(n)
+                # The slice is sent before the next readinto reuses the buffer
+                yield view[:n]
+                if self.on_sent:
+                    self.on_sent(n)
+        yield self.tail
@@ -0,0 +1,204 @@
+"""
+Build one playlist per course and language from uploaded videos, in chapter order.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from .utils import parse_filename
+
+if TYPE_CHECKING:
+    from .client import PeerTubeClient
+
+# Placeholders: {course} (upper case, as in "BTC101") and {lang}
+DEFAULT_TITLE_FORMAT = "{course} ({lang})"
+
+# Page size used when listing playlists and their elements
+PAGE_SIZE = 100
+
+
+class PlaylistItem(NamedTuple):
+    """
+    One uploaded video and its place in a course.
+    """
+    part: int
+    chapter: int
+    path: str
+    uuid: str
+
+
+class PlaylistResult(NamedTuple):
+    """
+    Outcome of syncing one (course, language) playlist.
+    """
+    course: str
+    lang: str
+    playlist_id: Optional[int]
+    created: bool
+    added: int
+    moved: int
+    # (path, error) of videos that could not be added
+    failed: List[Tuple[str, BaseException]]
+    error: Optional[BaseException]
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and not self.failed
+
+
+def group_by_course(videos: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], List[PlaylistItem]]:
+    """
+    Group (path, uuid) pairs by (course, language), each sorted by
+    (part, chapter). Files whose names lack any of those are left out; if a
+    path appears more than once, the last uuid wins.
+    """
+    latest: Dict[str, str] = {}
+    for path, uuid in videos:
+        if uuid:
+            latest[path] = uuid
+    groups: Dict[Tuple[str, str], List[PlaylistItem]] = {}
+    for path, uuid in latest.items():
+        info = parse_filename(path)
+        if info.course is None or info.lang is None or info.part is None:
+            continue
+        item = PlaylistItem(info.part, info.chapter, path, uuid)
+        groups.setdefault((info.course, info.lang), []).append(item)
+    for items in groups.values():
+        items.sort()
+    return groups
+
+
+class PlaylistBuilder:
+    """
+    Create or reuse one playlist per (course, language) in a channel and add
+    the missing videos in (part, chapter) order.
+
+    Existing playlists are found by display name among the account's
+    playlists in ``channel_id``, which are listed once per ``sync()``. Each
+    playlist's elements are read and only videos not already in it are
+    added, so reruns send nothing for complete playlists. A video that
+    belongs before elements already present is appended and then moved
+    behind its nearest predecessor; the order of existing elements is left
+    alone. Playlists are synced on up to ``jobs`` threads; calls for one
+    playlist are sequential since each position depends on the previous.
+    """
+    def __init__(
+        self,
+        client: "PeerTubeClient",
+        channel_id: Union[int, str],
+        jobs: int = 4,
+        privacy: int = 1,
+        title_format: str = DEFAULT_TITLE_FORMAT,
+    ) -> None:
+        if jobs < 1:
+            raise ValueError("jobs must be at least 1")
+        self.client: "PeerTubeClient" = client
+        self.channel_id: Union[int, str] = channel_id
+        self.jobs: int = jobs
+        self.privacy: int = privacy
+        self.title_format: str = title_format
+        self.output_lock = threading.Lock()
+
+    def title(self, course: str, lang: str) -> str:
+        return self.title_format.format(course=course.upper(), lang=lang)
+
+    def _existing_playlists(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Map display name to playlist for this channel's playlists.
+        """
+        found: Dict[str, Dict[str, Any]] = {}
+        start = 0
+        while True:
+            page = self.client.list_playlists(start=start, count=PAGE_SIZE)
+            data = page.get("data") or []
+            for playlist in data:
+                channel = playlist.get("videoChannel") or {}
+                if str(channel.get("id")) == str(self.channel_id):
+                    # Keep the oldest if names repeat
+                    found.setdefault(playlist.get("displayName"), playlist)
+            start += len(data)
+            if not data or start >= page.get("total", 0):
+                return found
+
+    def _element_uuids(self, playlist_id: int) -> List[Optional[str]]:
+        """
+        Return the video UUID at each position; None for unavailable videos.
+        """
+        uuids: List[Optional[str]] = []
+        start = 0
+        while True:
+            page = self.client.list_playlist_elements(playlist_id, start=start, count=PAGE_SIZE)
+            data = page.get("data") or []
+            for element in data:
+                uuids.append((element.get("video") or {}).get("uuid"))
+            start += len(data)
+            if not data or start >= page.get("total", 0):
+                return uuids
+
+    def _sync_one(
+        self,
+        course: str,
+        lang: str,
+        items: List[PlaylistItem],
+        playlist: Optional[Dict[str, Any]],
+    ) -> PlaylistResult:
+        created = playlist is None
+        playlist_id = None
+        added = moved = 0
+        failed: List[Tuple[str, BaseException]] = []
+        try:
+            if playlist is None:
+                playlist = self.client.create_playlist(
+                    self.title(course, lang), self.channel_id, privacy=self.privacy
+                )
+                current: List[Optional[str]] = []
+            else:
+                current = self._element_uuids(playlist["id"])
+            playlist_id = playlist["id"]
+            # Position (1-based) of the last desired video known to be in place
+            previous = 0
+            for item in items:
+                if item.uuid in current:
+                    previous = current.index(item.uuid) + 1
+                    continue
+                try:
+                    self.client.add_playlist_element(playlist_id, item.uuid)
+                except Exception as exc:
+                    failed.append((item.path, exc))
+                    continue
+                current.append(item.uuid)
+                added += 1
+                position = len(current)
+                if previous != position - 1:
+                    self.client.reorder_playlist(playlist_id, position, previous)
+                    current.insert(previous, current.pop())
+                    moved += 1
+                previous += 1
+        except Exception as exc:
+            return PlaylistResult(course, lang, playlist_id, created, added, moved, failed, exc)
+        return PlaylistResult(course, lang, playlist_id, created, added, moved, failed, None)
+
+    def sync(
+        self,
+        groups: Dict[Tuple[str, str], List[PlaylistItem]],
+        on_result: Optional[Callable[[PlaylistResult], None]] = None,
+    ) -> List[PlaylistResult]:
+        """
+        Sync a playlist for every group from ``group_by_course()`` and
+        return the results in group order. Failures are reported in the
+        results rather than raised; ``on_result`` is called as each finishes.
+        """
+        if not groups:
+            return []
+        existing = self._existing_playlists()
+
+        def run(key: Tuple[str, str]) -> PlaylistResult:
+            course, lang = key
+            playlist = existing.get(self.title(course, lang))
+            result = self._sync_one(course, lang, groups[key], playlist)
+            if on_result is not None:
+                on_result(result)
+            return result
+
+        with ThreadPoolExecutor(max_workers=min(self.jobs, len(groups))) as pool:
+            return list(pool.map(run, list(groups)))
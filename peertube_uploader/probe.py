@@ -0,0 +1,330 @@
+"""
+Check video files before uploading them: container structure, codec,
+duration and resolution.
+"""
+import collections
+import hashlib
+import json
+import os
+import shutil
+import struct
+import subprocess
+from concurrent.futures import Executor, Future
+from typing import BinaryIO, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .cache import DEFAULT_CACHE_DIR, DiskCache
+
+# Probe results are keyed by file fingerprint, so they only expire to bound disk use
+PROBE_CACHE_TTL = 30 * 24 * 3600.0
+
+# Seconds before an ffprobe run is considered hung
+FFPROBE_TIMEOUT = 120
+
+
+class MediaInfo(NamedTuple):
+    """
+    Result of probing one video file. ``reason`` says why it is not valid.
+
+    ``transient`` marks failures caused by the environment rather than the
+    file (ffprobe missing or hung, file unreadable); they are not cached.
+    """
+    valid: bool
+    reason: Optional[str] = None
+    duration: Optional[float] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    codec: Optional[str] = None
+    prober: Optional[str] = None
+    transient: bool = False
+
+
+class MediaError(Exception):
+    """
+    Raised by the MP4 parser when a file is malformed or truncated.
+    """
+
+
+def _iter_boxes(f: BinaryIO, start: int, end: int) -> Iterator[Tuple[str, int, int]]:
+    """
+    Yield (type, payload start, box end) for the MP4 boxes in [start, end).
+    """
+    pos = start
+    while pos < end:
+        f.seek(pos)
+        header = f.read(8)
+        if len(header) < 8 or pos + 8 > end:
+            raise MediaError(f"Truncated box header at offset {pos}")
+        size, kind = struct.unpack(">I4s", header)
+        if not all(32 <= c < 127 for c in kind):
+            raise MediaError(f"No valid MP4 box at offset {pos} (corrupt or not an MP4 file)")
+        header_size = 8
+        if size == 1:
+            large = f.read(8)
+            if len(large) < 8:
+                raise MediaError(f"Truncated box header at offset {pos}")
+            size = struct.unpack(">Q", large)[0]
+            header_size = 16
+        elif size == 0:
+            # Box extends to the end of its parent (or of the file)
+            size = end - pos
+        if size < header_size:
+            raise MediaError(f"Invalid size {size} for box at offset {pos}")
+        if pos + size > end:
+            name = kind.decode("latin-1")
+            raise MediaError(
+                f"'{name}' box at offset {pos} needs {size} bytes, only {end - pos} present"
+            )
+        yield kind.decode("latin-1"), pos + header_size, pos + size
+        pos += size
+
+
+def _children(f: BinaryIO, start: int, end: int) -> Dict[str, List[Tuple[int, int]]]:
+    boxes: Dict[str, List[Tuple[int, int]]] = {}
+    for kind, payload, box_end in _iter_boxes(f, start, end):
+        boxes.setdefault(kind, []).append((payload, box_end))
+    return boxes
+
+
+def _read_at(f: BinaryIO, offset: int, size: int) -> bytes:
+    f.seek(offset)
+    data = f.read(size)
+    if len(data) < size:
+        raise MediaError(f"Truncated data at offset {offset}")
+    return data
+
+
+def _track_boxes(
+    f: BinaryIO, trak: Tuple[int, int]
+) -> Tuple[Optional[bytes], Dict[str, List[Tuple[int, int]]], Dict[str, List[Tuple[int, int]]]]:
+    """
+    Return a trak box's handler type (b"vide", b"soun", ...), its children
+    and its sample table's children.
+    """
+    boxes = _children(f, *trak)
+    mdia = _children(f, *boxes["mdia"][0]) if "mdia" in boxes else {}
+    handler = _read_at(f, mdia["hdlr"][0][0] + 8, 4) if "hdlr" in mdia else None
+    minf = _children(f, *mdia["minf"][0]) if "minf" in mdia else {}
+    stbl = _children(f, *minf["stbl"][0]) if "stbl" in minf else {}
+    return handler, boxes, stbl
+
+
+def _video_track(f: BinaryIO, trak: Tuple[int, int]) -> Optional[Tuple[Optional[str], int, int]]:
+    """
+    Return (codec, width, height) if a trak box holds a video track.
+    """
+    handler, boxes, stbl = _track_boxes(f, trak)
+    if handler != b"vide":
+        return None
+    codec = None
+    if "stsd" in stbl:
+        # version/flags, entry count, then the first sample entry's size and format
+        codec = _read_at(f, stbl["stsd"][0][0] + 12, 4).decode("latin-1").strip()
+    width = height = 0
+    if "tkhd" in boxes:
+        tkhd = boxes["tkhd"][0][0]
+        version = _read_at(f, tkhd, 1)[0]
+        offset = 88 if version == 1 else 76
+        width, height = (v >> 16 for v in struct.unpack(">II", _read_at(f, tkhd + offset, 8)))
+    return codec, width, height
+
+
+def probe_mp4(path: str) -> MediaInfo:
+    """
+    Check an MP4 file with a pure-Python box parser.
+
+    Walks the top-level boxes (a truncated file has a box running past the
+    end of the file, or no 'moov' box) and reads duration, resolution and
+    codec from the movie header and the first video track. Only box
+    headers and metadata are read, not the media data.
+    """
+    try:
+        size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            top = _children(f, 0, size)
+            if "ftyp" not in top:
+                raise MediaError("Not an MP4 file (no 'ftyp' box)")
+            if "moov" not in top:
+                raise MediaError("No 'moov' box (file truncated or not finalized)")
+            if "mdat" not in top and "moof" not in top:
+                raise MediaError("No media data ('mdat' box)")
+            moov = _children(f, *top["moov"][0])
+            if "mvhd" not in moov:
+                raise MediaError("No movie header ('mvhd' box)")
+            mvhd = moov["mvhd"][0][0]
+            if _read_at(f, mvhd, 1)[0] == 1:
+                timescale, length = struct.unpack(">IQ", _read_at(f, mvhd + 20, 12))
+            else:
+                timescale, length = struct.unpack(">II", _read_at(f, mvhd + 12, 8))
+            duration = length / timescale if timescale else None
+            video = None
+            for trak in moov.get("trak", []):
+                video = _video_track(f, trak)
+                if video:
+                    break
+    except MediaError as exc:
+        return MediaInfo(False, str(exc), prober="mp4")
+    except OSError as exc:
+        return MediaInfo(False, f"Cannot read file: {exc}", prober="mp4", transient=True)
+    if video is None:
+        return MediaInfo(False, "No video track", duration=duration, prober="mp4")
+    codec, width, height = video
+    return MediaInfo(True, None, duration, width or None, height or None, codec, "mp4")
+
+
+def media_digest(path: str) -> Optional[str]:
+    """
+    Fingerprint the video and audio tracks of an MP4 file.
+
+    Hashes each track's sample description, timing and sample size tables,
+    which only match when the same encoded streams were muxed, without
+    reading the media data. Subtitle and other tracks are left out, so
+    files differing only in those get the same digest. Returns None for
+    files that cannot be parsed, have no video track, or are fragmented
+    (their sample tables are empty).
+    """
+    try:
+        size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            top = _children(f, 0, size)
+            if "moov" not in top:
+                return None
+            digest = hashlib.sha256()
+            video = False
+            for trak in _children(f, *top["moov"][0]).get("trak", []):
+                handler, _, stbl = _track_boxes(f, trak)
+                if handler not in (b"vide", b"soun"):
+                    continue
+                if "stsz" not in stbl or _read_at(f, stbl["stsz"][0][0] + 8, 4) == bytes(4):
+                    return None
+                video = video or handler == b"vide"
+                digest.update(handler)
+                for kind in ("stsd", "stts", "stsz"):
+                    for start, end in stbl.get(kind, []):
+                        digest.update(_read_at(f, start, end - start))
+    except (MediaError, OSError):
+        return None
+    return digest.hexdigest() if video else None
+
+
+def probe_ffprobe(path: str) -> MediaInfo:
+    """
+    Check a video file with ffprobe.
+    """
+    cmd = [
+        "ffprobe", "-v", "error", "-print_format", "json",
+        "-show_format", "-show_streams", path,
+    ]
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=FFPROBE_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        return MediaInfo(False, "ffprobe timed out", prober="ffprobe", transient=True)
+    except OSError as exc:
+        return MediaInfo(False, f"Cannot run ffprobe: {exc}", prober="ffprobe", transient=True)
+    if proc.returncode != 0:
+        reason = proc.stderr.strip() or f"ffprobe exited with status {proc.returncode}"
+        # A negative status means ffprobe was killed, which says nothing about the file
+        return MediaInfo(False, reason, prober="ffprobe", transient=proc.returncode < 0)
+    try:
+        data = json.loads(proc.stdout or "{}")
+        if not isinstance(data, dict):
+            raise ValueError("expected a JSON object")
+        video = next(
+            (s for s in data.get("streams", []) if s.get("codec_type") == "video"), None
+        )
+        duration = data.get("format", {}).get("duration")
+        duration = float(duration) if duration else None
+    except (ValueError, AttributeError, TypeError) as exc:
+        return MediaInfo(
+            False, f"Unreadable ffprobe output: {exc}", prober="ffprobe", transient=True
+        )
+    if video is None:
+        return MediaInfo(False, "No video stream", duration=duration, prober="ffprobe")
+    if not duration:
+        return MediaInfo(False, "Unknown duration", prober="ffprobe")
+    return MediaInfo(
+        True, None, duration, video.get("width"), video.get("height"),
+        video.get("codec_name"), "ffprobe",
+    )
+
+
+def probe(path: str) -> MediaInfo:
+    """
+    Check a video file: MP4 files get the box structure check (which
+    catches truncation), then ffprobe if installed for codec details.
+    """
+    info = None
+    if path.lower().endswith(".mp4"):
+        info = probe_mp4(path)
+        if not info.valid:
+            return info
+    if shutil.which("ffprobe"):
+        return probe_ffprobe(path)
+    return info or MediaInfo(False, "ffprobe is not installed", prober=None, transient=True)
+
+
+class MediaValidator:
+    """
+    Probe files in a process pool, in order, with results cached on disk by
+    file fingerprint so unchanged files are not probed again. Transient
+    failures are not cached, so they are probed again on the next run.
+    """
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        cache: Optional[DiskCache] = None,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        self.workers: int = workers or os.cpu_count() or 1
+        self.cache: Optional[DiskCache] = cache
+        self._executor: Optional[Executor] = executor
+        self._owns_executor: bool = executor is None
+
+    @staticmethod
+    def default_cache() -> DiskCache:
+        return DiskCache(os.path.join(DEFAULT_CACHE_DIR, "probes"), ttl=PROBE_CACHE_TTL)
+
+    def _submit(self, path: str) -> "Future[MediaInfo]":
+        if self._executor is None:
+            from concurrent.futures import ProcessPoolExecutor
+
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor.submit(probe, path)
+
+    def check(self, items: Iterable[Tuple[str, str]]) -> Iterator[Tuple[str, MediaInfo]]:
+        """
+        Probe (path, fingerprint) pairs and yield (path, MediaInfo) in input
+        order. Up to a few probes per worker run ahead of the consumer.
+        """
+        window: Deque[Tuple[str, Optional[str], "Future[MediaInfo]"]] = collections.deque()
+        ahead = self.workers * 4
+        try:
+            for path, fingerprint in items:
+                cached = self.cache.get(fingerprint) if self.cache else None
+                if cached is not None and not window:
+                    yield path, MediaInfo(**cached)
+                    continue
+                if cached is not None:
+                    # Keep input order behind probes still running; no need to re-cache
+                    future: "Future[MediaInfo]" = Future()
+                    future.set_result(MediaInfo(**cached))
+                    window.append((path, None, future))
+                else:
+                    window.append((path, fingerprint, self._submit(path)))
+                while len(window) > ahead or (window and window[0][2].done()):
+                    yield self._finish(*window.popleft())
+            while window:
+                yield self._finish(*window.popleft())
+        finally:
+            for _, _, future in window:
+                future.cancel()
+            if self._owns_executor and self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def _finish(
+        self, path: str, fingerprint: Optional[str], future: "Future[MediaInfo]"
+    ) -> Tuple[str, MediaInfo]:
+        info = future.result()
+        if self.cache and fingerprint is not None and not info.transient:
+            self.cache.set(fingerprint, info._asdict())
+        return path, info
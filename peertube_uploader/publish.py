@@ -0,0 +1,228 @@
+"""
+Track uploaded videos until PeerTube has finished processing them.
+"""
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, NamedTuple, Optional
+
+if TYPE_CHECKING:
+    from .client import PeerTubeClient
+
+# Seconds to wait for processing unless told otherwise
+DEFAULT_PUBLISH_TIMEOUT = 3600.0
+
+# PeerTube video states (VideoState enum)
+PUBLISHED = 1
+FAILED_STATES = frozenset({
+    7,  # Transcoding failed
+    8,  # Move to external storage failed
+    11,  # Move to file system failed
+})
+
+
+class PublishStatus(NamedTuple):
+    """
+    Last known processing state of one video.
+
+    ``state`` is PeerTube's state ID, or None if the video was not found.
+    """
+    uuid: str
+    state: Optional[int]
+    label: str
+
+    @property
+    def ready(self) -> bool:
+        return self.state == PUBLISHED
+
+    @property
+    def failed(self) -> bool:
+        return self.state is None or self.state in FAILED_STATES
+
+    @property
+    def pending(self) -> bool:
+        return not self.ready and not self.failed
+
+
+class PublishWatcher:
+    """
+    Poll the processing state of many uploaded videos from a background thread.
+
+    Each round lists the account's videos, newest first, ``page_size`` at a
+    time, so one request covers many tracked videos; videos not seen in the
+    first ``max_pages`` pages are looked up one by one. Polling starts every
+    ``min_interval`` seconds and slows down by ``backoff`` after each round
+    in which no state changed, up to ``max_interval``; any change, or a new
+    video to track, brings it back to ``min_interval``.
+
+    A failed round is passed to ``on_error`` and kept in ``last_error``.
+    After ``max_errors`` rounds fail in a row (the API is down, or the token
+    is no longer accepted) polling stops and ``wait`` returns.
+    """
+    def __init__(
+        self,
+        client: "PeerTubeClient",
+        min_interval: float = 2.0,
+        max_interval: float = 60.0,
+        backoff: float = 1.5,
+        page_size: int = 100,
+        max_pages: int = 10,
+        max_errors: int = 5,
+        on_error: Optional[Callable[[BaseException], None]] = None,
+    ) -> None:
+        self.client = client
+        self.min_interval: float = min_interval
+        self.max_interval: float = max_interval
+        self.backoff: float = backoff
+        self.page_size: int = page_size
+        self.max_pages: int = max_pages
+        self.interval: float = min_interval
+        self.max_errors: int = max_errors
+        self.on_error = on_error
+        self.last_error: Optional[BaseException] = None
+        # Rounds failed in a row
+        self.errors: int = 0
+        self._statuses: Dict[str, PublishStatus] = {}
+        self._cond = threading.Condition()
+        self._stop = False
+        self._thread: Optional[threading.Thread] = None
+
+    def track(self, uuid: str) -> None:
+        """
+        Start watching a video by UUID.
+        """
+        with self._cond:
+            if uuid not in self._statuses:
+                self._statuses[uuid] = PublishStatus(uuid, 0, "Uploaded")
+                self.interval = self.min_interval
+                self._cond.notify_all()
+
+    def _pending(self) -> Dict[str, PublishStatus]:
+        with self._cond:
+            return {u: s for u, s in self._statuses.items() if s.pending}
+
+    def poll(self) -> int:
+        """
+        Refresh the state of all pending videos once. Returns how many
+        changed state.
+        """
+        pending = self._pending()
+        if not pending:
+            return 0
+        found: Dict[str, PublishStatus] = {}
+        start = 0
+        for _ in range(self.max_pages):
+            page = self.client.list_my_videos(start=start, count=self.page_size)
+            data = page.get("data") or []
+            for video in data:
+                uuid = video.get("uuid")
+                if uuid in pending:
+                    found[uuid] = _status_of(uuid, video)
+            start += len(data)
+            if len(found) == len(pending) or not data or start >= page.get("total", 0):
+                break
+        for uuid in pending:
+            if uuid not in found:
+                video = self.client.get_video(uuid)
+                found[uuid] = _status_of(uuid, video) if video else PublishStatus(uuid, None, "Not found")
+
+        changed = 0
+        with self._cond:
+            for uuid, status in found.items():
+                if self._statuses.get(uuid) != status:
+                    self._statuses[uuid] = status
+                    changed += 1
+            self._cond.notify_all()
+        return changed
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if self._stop:
+                    return
+            try:
+                changed = self.poll()
+                self.last_error = None
+                self.errors = 0
+            except Exception as exc:
+                # Transient API errors just slow the polling down
+                self.last_error = exc
+                self.errors += 1
+                changed = 0
+                if self.on_error is not None:
+                    self.on_error(exc)
+                if self.errors >= self.max_errors:
+                    with self._cond:
+                        self._stop = True
+                        self._cond.notify_all()
+                    return
+            with self._cond:
+                if changed:
+                    self.interval = self.min_interval
+                else:
+                    self.interval = min(self.interval * self.backoff, self.max_interval)
+                if not self._stop:
+                    self._cond.wait(self.interval)
+
+    def start(self) -> "PublishWatcher":
+        """
+        Start polling in a daemon thread.
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self) -> None:
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    @property
+    def gave_up(self) -> bool:
+        """
+        True once polling stopped after ``max_errors`` failed rounds.
+        """
+        return self.errors >= self.max_errors
+
+    def wait(self, timeout: Optional[float] = None) -> Dict[str, PublishStatus]:
+        """
+        Block until every tracked video is ready or failed, ``timeout``
+        seconds have passed (None waits without limit) or polling gave up,
+        then stop polling. Returns the last known status of each video;
+        videos still processing are ``pending``.
+        """
+        self.start()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while not self.gave_up and any(s.pending for s in self._statuses.values()):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            statuses = dict(self._statuses)
+        self.close()
+        return statuses
+
+
+def _status_of(uuid: str, video: Dict) -> PublishStatus:
+    state = video.get("state") or {}
+    return PublishStatus(uuid, state.get("id"), state.get("label", ""))
+
+
+def wait_until_published(
+    client: "PeerTubeClient",
+    uuids: Iterable[str],
+    timeout: Optional[float] = DEFAULT_PUBLISH_TIMEOUT,
+    **kwargs,
+) -> Dict[str, PublishStatus]:
+    """
+    Wait for the given videos to be published (or fail processing).
+    Extra keyword arguments are passed to ``PublishWatcher``.
+    """
+    watcher = PublishWatcher(client, **kwargs)
+    for uuid in uuids:
+        watcher.track(uuid)
+    return watcher.wait(timeout)
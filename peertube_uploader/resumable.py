@@ -0,0 +1,152 @@
+"""
+On-disk state for PeerTube resumable uploads.
+"""
+import hashlib
+import json
+import os
+import re
+from typing import Optional, Dict, Any
+
+from .cache import DEFAULT_CACHE_DIR
+
+# Default size of each PUT sent to the resumable endpoint (8 MiB)
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+
+DEFAULT_STATE_DIR = os.path.join(DEFAULT_CACHE_DIR, "resumable")
+
+_RANGE_RE = re.compile(r'bytes=(\d+)-(\d+)')
+
+
+def parse_range_offset(range_header: Optional[str]) -> int:
+    """
+    Convert a 308 'Range: bytes=0-N' header into the next byte offset to send.
+    A missing header means the server has not stored any bytes yet.
+    """
+    if not range_header:
+        return 0
+    match = _RANGE_RE.search(range_header)
+    if not match:
+        return 0
+    return int(match.group(2)) + 1
+
+
+class ResumableStateStore:
+    """
+    Persist upload session URL and acknowledged byte offset per video file.
+
+    State files are keyed by absolute path, size and mtime so that a file
+    replaced on disk never resumes into a stale server-side session.
+    """
+    def __init__(self, state_dir: Optional[str] = None) -> None:
+        self.state_dir: str = state_dir or DEFAULT_STATE_DIR
+
+    def _state_path(self, video_path: str) -> str:
+        st = os.stat(video_path)
+        key = f"{os.path.abspath(video_path)}|{st.st_size}|{st.st_mtime_ns}"
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.state_dir, f"{digest}.json")
+
+    def load(self, video_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the saved state for a video, or None if there is none.
+        """
+        path = self._state_path(video_path)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, video_path: str, state: Dict[str, Any]) -> None:
+        """
+        Atomically write the state for a video.
+        """
+        os.makedirs(self.state_dir, exist_ok=True)
+        path = self._state_path(video_path)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+
+    def clear(self, video_path: str) -> None:
+        """
+        Remove the saved state for a video once the upload has completed.
+        """
+        try:
+            os.remove(self._state_path(video_path))
+        except FileNotFoundError:
+            pass
+
+
+class AdaptiveChunkSizer:
+    """
+    Pick resumable chunk sizes from measured round-trip time and throughput.
+
+    Each chunk costs one round trip of dead time, and a dropped chunk is
+    resent from the server's last offset, so chunks should be large on fast,
+    high-latency links and small on slow ones. The next size targets
+    ``target_seconds`` of sending at the smoothed throughput, but at least
+    enough that the round trip stays under ``max_overhead`` of a chunk's
+    time. It changes by at most a factor of 2 per chunk, is halved after a
+    dropped connection, and stays within [``minimum``, ``maximum``], rounded
+    to ``granularity`` bytes.
+    """
+    def __init__(
+        self,
+        initial: int = DEFAULT_CHUNK_SIZE,
+        minimum: int = 1024 * 1024,
+        maximum: int = 128 * 1024 * 1024,
+        target_seconds: float = 5.0,
+        max_overhead: float = 0.05,
+        smoothing: float = 0.3,
+        granularity: int = 64 * 1024,
+    ) -> None:
+        if not 0 < minimum <= maximum:
+            raise ValueError("chunk size bounds must satisfy 0 < minimum <= maximum")
+        self.minimum: int = minimum
+        self.maximum: int = maximum
+        self.target_seconds: float = target_seconds
+        self.max_overhead: float = max_overhead
+        self.smoothing: float = smoothing
+        self.granularity: int = granularity
+        self.rtt: Optional[float] = None
+        self.throughput: Optional[float] = None
+        self.size: int = self._clamp(initial)
+
+    def _clamp(self, size: float) -> int:
+        size = int(size) // self.granularity * self.granularity
+        return max(self.minimum, min(self.maximum, size))
+
+    def observe_rtt(self, seconds: float) -> None:
+        """
+        Record the duration of a request with no body (the lowest seen is kept).
+        """
+        if seconds > 0 and (self.rtt is None or seconds < self.rtt):
+            self.rtt = seconds
+
+    def record(self, nbytes: int, seconds: float) -> int:
+        """
+        Record a chunk of ``nbytes`` acknowledged after ``seconds`` and
+        return the size to use for the next chunk.
+        """
+        send_time = seconds - (self.rtt or 0.0)
+        if nbytes <= 0 or send_time <= 0:
+            return self.size
+        rate = nbytes / send_time
+        if self.throughput is None:
+            self.throughput = rate
+        else:
+            self.throughput += self.smoothing * (rate - self.throughput)
+        duration = self.target_seconds
+        if self.rtt:
+            duration = max(duration, self.rtt / self.max_overhead)
+        wanted = min(max(self.throughput * duration, self.size / 2), self.size * 2)
+        self.size = self._clamp(wanted)
+        return self.size
+
+    def failed(self) -> int:
+        """
+        Shrink after a dropped connection; returns the next chunk size.
+        """
+        self.size = self._clamp(self.size / 2)
+        return self.size
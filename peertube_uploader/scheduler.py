@@ -0,0 +1,112 @@
+"""
+Run uploads on a bounded pool of worker threads.
+"""
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class _End:
+    """Marks the end of a prefetched stream, carrying the producer's error."""
+    def __init__(self, error: Optional[BaseException] = None) -> None:
+        self.error = error
+
+
+def prefetch(items: Iterable[T], buffer: int = 1024) -> Iterator[T]:
+    """
+    Consume ``items`` on a background thread, keeping up to ``buffer`` of
+    them ready. Lets a slow producer (such as a directory scan) keep running
+    while the caller is busy. Exceptions raised by the producer are re-raised
+    by the consumer.
+    """
+    q: "queue.Queue[Any]" = queue.Queue(maxsize=buffer)
+
+    def produce() -> None:
+        try:
+            for item in items:
+                q.put(item)
+        except BaseException as exc:
+            q.put(_End(exc))
+        else:
+            q.put(_End())
+
+    threading.Thread(target=produce, daemon=True).start()
+    while True:
+        item = q.get()
+        if isinstance(item, _End):
+            if item.error is not None:
+                raise item.error
+            return
+        yield item
+
+
+class UploadResult(NamedTuple):
+    """
+    Outcome of one scheduled upload.
+    """
+    index: int
+    path: str
+    response: Optional[Dict[str, Any]]
+    error: Optional[BaseException]
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class UploadScheduler:
+    """
+    Upload files with at most ``jobs`` transfers in flight.
+
+    ``upload`` is called as ``upload(index, path)`` from worker threads and
+    must be thread-safe; it returns the PeerTube response or raises. Files are
+    pulled lazily from the input iterable, so no more than ``jobs`` pending
+    uploads are queued at any time.
+    """
+    def __init__(
+        self,
+        upload: Callable[[int, str], Dict[str, Any]],
+        jobs: int = 1,
+        on_result: Optional[Callable[[UploadResult], None]] = None,
+    ) -> None:
+        if jobs < 1:
+            raise ValueError("jobs must be at least 1")
+        self.upload = upload
+        self.jobs: int = jobs
+        self.on_result = on_result
+        # Serializes on_result so per-file output lines never interleave
+        self.output_lock = threading.Lock()
+
+    def _run_one(self, index: int, path: str, slots: threading.Semaphore) -> UploadResult:
+        try:
+            try:
+                result = UploadResult(index, path, self.upload(index, path), None)
+            except Exception as exc:
+                result = UploadResult(index, path, None, exc)
+            if self.on_result:
+                with self.output_lock:
+                    self.on_result(result)
+            return result
+        finally:
+            slots.release()
+
+    def run(self, files: Iterable[str], start: int = 1, keep_results: bool = True) -> List[UploadResult]:
+        """
+        Upload every file and return the results in input order.
+
+        With ``keep_results=False`` nothing is kept once a file is done and
+        an empty list is returned; results only reach ``on_result``. Use it
+        for unbounded inputs, such as a watched folder.
+        """
+        slots = threading.Semaphore(self.jobs)
+        futures = []
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            for index, path in enumerate(files, start=start):
+                slots.acquire()
+                future = pool.submit(self._run_one, index, path, slots)
+                if keep_results:
+                    futures.append(future)
+        return [f.result() for f in futures]
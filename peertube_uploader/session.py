@@ -0,0 +1,198 @@
+"""
+Shared HTTP session with connection pooling and retries for PeerTube API calls.
+"""
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+import warnings
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional
+
+if TYPE_CHECKING:
+    import requests
+
+# Status codes worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Methods that can be sent twice without changing the outcome
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter, honoring Retry-After.
+
+    Attempt ``n`` (0-based) waits a random time between 0 and
+    ``min(max_backoff, backoff_factor * 2 ** n)`` seconds, unless the server
+    sent a Retry-After header, which is then used as is (capped at
+    ``max_backoff``).
+    """
+    def __init__(
+        self,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 30.0,
+        statuses: Iterable[int] = RETRY_STATUSES,
+    ) -> None:
+        self.max_retries: int = max_retries
+        self.backoff_factor: float = backoff_factor
+        self.max_backoff: float = max_backoff
+        self.statuses = frozenset(statuses)
+
+    def delay(self, attempt: int, response: Optional["requests.Response"] = None) -> float:
+        """
+        Seconds to wait before retry number ``attempt + 1``.
+        """
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            seconds = _parse_retry_after(retry_after)
+            if seconds is not None:
+                return min(self.max_backoff, seconds)
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * (2 ** attempt)))
+
+
+def _parse_retry_after(value: str) -> Optional[float]:
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def _not_processed(response: "requests.Response") -> bool:
+    """
+    True if a response says the server did not act on the request.
+    """
+    return response.status_code == 429 or (
+        response.status_code == 503 and bool(response.headers.get("Retry-After"))
+    )
+
+
+def _never_sent(exc: Exception) -> bool:
+    """
+    True if a connection error happened before the request was sent.
+    """
+    import requests
+    from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+
+    if isinstance(exc, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(exc.args[0], "reason", None) if exc.args else None
+    return isinstance(reason, (ConnectTimeoutError, NewConnectionError))
+
+
+def _disable_insecure_warnings() -> None:
+    # Disable SSL warnings for unverified HTTPS requests
+    import urllib3
+
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+    warnings.filterwarnings('ignore', message='Unverified HTTPS request')
+
+
+class HttpSession:
+    """
+    Wrap a ``requests.Session`` with a sized keep-alive pool and retries.
+
+    One instance is owned by ``PeerTubeClient`` and shared with its
+    ``TokenManager`` so token, profile and upload requests reuse the same
+    connections. It is safe to share between upload threads as long as
+    ``pool_size`` is at least the number of threads.
+    """
+    def __init__(
+        self,
+        pool_size: int = 10,
+        retry: Optional[RetryPolicy] = None,
+        verify: bool = False,
+    ) -> None:
+        # requests is imported on first use to keep CLI startup (and --help) fast
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        _disable_insecure_warnings()
+        self.retry: RetryPolicy = retry or RetryPolicy()
+        self.session = requests.Session()
+        # Disable SSL verification to avoid certificate errors
+        self.session.verify = verify
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.requests_sent: int = 0
+        self.retries: int = 0
+        self._lock = threading.Lock()
+
+    def request(
+        self, method: str, url: str, retry: Optional[bool] = None, **kwargs: Any
+    ) -> "requests.Response":
+        """
+        Send a request, retrying connection errors and retryable statuses.
+
+        Only idempotent methods are retried by default. Other methods (POST)
+        opt in with ``retry=True`` and are then retried only when the server
+        cannot have acted on the request: the connection was never made, or
+        it answered 429, or 503 with Retry-After. A retried POST can then not
+        create a duplicate. Request bodies must be re-sendable (bytes, dicts
+        or a re-iterable object such as ``MultipartEncoder``). Pass
+        ``retry=False`` when the caller handles failures itself.
+        """
+        import requests
+
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        if retry is None:
+            retry = idempotent
+        attempt = 0
+        while True:
+            with self._lock:
+                self.requests_sent += 1
+            try:
+                resp = self.session.request(method, url, **kwargs)
+            except requests.exceptions.ConnectionError as exc:
+                if not retry or attempt >= self.retry.max_retries \
+                        or not (idempotent or _never_sent(exc)):
+                    raise
+                wait = self.retry.delay(attempt)
+            else:
+                if not retry or resp.status_code not in self.retry.statuses \
+                        or not (idempotent or _not_processed(resp)) \
+                        or attempt >= self.retry.max_retries:
+                    return resp
+                wait = self.retry.delay(attempt, resp)
+                resp.close()
+            with self._lock:
+                self.retries += 1
+            attempt += 1
+            time.sleep(wait)
+
+    def get(self, url: str, **kwargs: Any) -> "requests.Response":
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> "requests.Response":
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: str, **kwargs: Any) -> "requests.Response":
+        return self.request("PUT", url, **kwargs)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return request, connection, handshakes-saved and retry counts.
+        """
+        connections = 0
+        for adapter in set(self.session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is not None:
+                    connections += pool.num_connections
+        with self._lock:
+            sent, retries = self.requests_sent, self.retries
+        return {
+            "requests": sent,
+            "connections": connections,
+            "handshakes_saved": max(0, sent - connections),
+            "retries": retries,
+        }
+
+    def close(self) -> None:
+        self.session.close()
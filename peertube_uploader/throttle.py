@@ -0,0 +1,228 @@
+"""
+Bandwidth limiting shared by concurrent uploads.
+"""
+import os
+import signal
+import threading
+import time
+from typing import Callable, Iterator, List, Optional
+
+_UNITS = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+# Control file values that remove the limit
+UNLIMITED_WORDS = ("off", "none", "unlimited", "0")
+
+# Pieces a throttled body is paced in; small enough to keep sends smooth
+DEFAULT_PIECE_SIZE = 64 * 1024
+
+
+def parse_rate(text: str) -> int:
+    """
+    Parse a byte count such as '500K', '10M' or '1.5G' into bytes.
+    A plain number is taken as bytes.
+    """
+    value = text.strip().upper().rstrip("B")
+    if not value:
+        raise ValueError(f"Invalid byte size: {text!r}")
+    if value[-1] in _UNITS:
+        return int(float(value[:-1]) * _UNITS[value[-1]])
+    return int(float(value))
+
+
+def format_rate(rate: Optional[float]) -> str:
+    """
+    Human-readable rate for log messages, e.g. '2.50 MB/s' or 'unlimited'.
+    """
+    return "unlimited" if rate is None else f"{rate / 1e6:.2f} MB/s"
+
+
+class BandwidthLimiter:
+    """
+    Token bucket limiting the total bytes per second sent by all callers.
+
+    ``consume`` reserves bytes and waits outside the lock until the bucket
+    has paid them back, so concurrent uploads share the rate fairly in the
+    order they asked for it. The rate can be changed at any time with
+    ``set_rate``; callers already waiting are re-timed to the new rate. A
+    rate of None means unlimited.
+    """
+    def __init__(self, rate: Optional[float], burst: Optional[float] = None) -> None:
+        self._cond = threading.Condition()
+        # Cumulative bytes reserved and bytes the bucket has paid back
+        self._spent: float = 0.0
+        self._earned: float = 0.0
+        self._last: float = time.monotonic()
+        self.rate: Optional[float] = None
+        self.burst: float = 0.0
+        self.set_rate(rate, burst)
+        self._earned = self.burst
+
+    def set_rate(self, rate: Optional[float], burst: Optional[float] = None) -> None:
+        """
+        Change the rate (bytes/s, None for unlimited) and burst size.
+        """
+        if rate is not None and rate <= 0:
+            raise ValueError("rate must be positive")
+        with self._cond:
+            self._refill(time.monotonic())
+            self.rate = float(rate) if rate is not None else None
+            self.burst = float(burst if burst is not None else (rate or 0))
+            if self.rate is None:
+                # Forgive outstanding debt so waiting callers go immediately
+                self._earned = max(self._earned, self._spent)
+            self._cond.notify_all()
+
+    def _refill(self, now: float) -> None:
+        if self.rate is not None:
+            self._earned = min(self._spent + self.burst, self._earned + (now - self._last) * self.rate)
+        self._last = now
+
+    def consume(self, nbytes: int) -> None:
+        """
+        Block until ``nbytes`` may be sent without exceeding the rate.
+        """
+        with self._cond:
+            if self.rate is None:
+                return
+            self._refill(time.monotonic())
+            self._spent += nbytes
+            target = self._spent
+            while self.rate is not None and self._earned < target:
+                self._cond.wait((target - self._earned) / self.rate)
+                self._refill(time.monotonic())
+
+
+class ThrottledBody:
+    """
+    Re-iterable request body that paces ``data`` through a limiter.
+
+    Sending a large chunk as one ``bytes`` object would pay for it up front
+    and then burst it at full speed; this yields it in ``piece_size`` slices
+    paid for one at a time. It has a length, so requests sends it with a
+    Content-Length header rather than chunked encoding.
+    """
+    def __init__(
+        self,
+        data: bytes,
+        limiter: Optional[BandwidthLimiter],
+        piece_size: int = DEFAULT_PIECE_SIZE,
+    ) -> None:
+        self.data = memoryview(data)
+        self.limiter: Optional[BandwidthLimiter] = limiter
+        self.piece_size: int = piece_size
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __iter__(self) -> Iterator[memoryview]:
+        for start in range(0, len(self.data), self.piece_size):
+            piece = self.data[start:start + self.piece_size]
+            if self.limiter:
+                self.limiter.consume(len(piece))
+            yield piece
+
+
+class RateControl:
+    """
+    Change a limiter's rate while uploads are running.
+
+    The control file holds a rate such as ``5M`` (or ``off`` for no limit);
+    it is checked every ``interval`` seconds and re-read at once on SIGHUP.
+    SIGUSR1 halves the current rate and SIGUSR2 doubles it. ``on_change``
+    receives a message for every change and every rejected value.
+    """
+    def __init__(
+        self,
+        limiter: BandwidthLimiter,
+        path: Optional[str] = None,
+        interval: float = 1.0,
+        on_change: Optional[Callable[[str], None]] = None,
+    ) -> None:
+        self.limiter = limiter
+        self.path: Optional[str] = path
+        self.interval: float = interval
+        self.on_change: Optional[Callable[[str], None]] = on_change
+        self._mtime: Optional[int] = None
+        # Scale factors requested by signal handlers, applied by the thread
+        self._scales: List[float] = []
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _notify(self, message: str) -> None:
+        if self.on_change:
+            self.on_change(message)
+
+    def _apply(self, rate: Optional[float], source: str) -> None:
+        self.limiter.set_rate(rate)
+        self._notify(f"Upload rate set to {format_rate(rate)} ({source})")
+
+    def poll(self) -> bool:
+        """
+        Apply the control file if it changed since the last poll.
+        Returns whether the rate was changed.
+        """
+        if not self.path:
+            return False
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+        self._mtime = mtime
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                text = f.read().strip()
+            rate = None if text.lower() in UNLIMITED_WORDS else parse_rate(text)
+        except (OSError, ValueError):
+            self._notify(f"Ignoring invalid rate in '{self.path}'")
+            return False
+        if rate is not None and rate <= 0:
+            rate = None
+        self._apply(rate, self.path)
+        return True
+
+    def scale(self, factor: float) -> None:
+        """
+        Multiply the current rate by ``factor`` (no-op while unlimited).
+        """
+        if self.limiter.rate is not None:
+            self._apply(self.limiter.rate * factor, "signal")
+
+    def install_signals(self) -> None:
+        """
+        Handle SIGHUP/SIGUSR1/SIGUSR2 (main thread, POSIX only).
+        """
+        if not hasattr(signal, "SIGUSR1"):
+            return
+        signal.signal(signal.SIGHUP, lambda signum, frame: self._wake.set())
+        signal.signal(signal.SIGUSR1, lambda signum, frame: self._request_scale(0.5))
+        signal.signal(signal.SIGUSR2, lambda signum, frame: self._request_scale(2.0))
+
+    def _request_scale(self, factor: float) -> None:
+        # Handlers only queue the change: the limiter's lock may be held
+        # by the interrupted thread
+        self._scales.append(factor)
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            while self._scales:
+                self.scale(self._scales.pop(0))
+            self.poll()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def start(self) -> "RateControl":
+        self.poll()
+        self._thread = threading.Thread(target=self._run, name="rate-control", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
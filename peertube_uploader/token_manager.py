@@ -1,21 +1,50 @@
 """
 Manage OAuth tokens for PeerTube API.
 """
+import contextlib
+import threading
 import time
-import requests
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from .config import Config
+from .metrics import MetricsRecorder
+from .session import HttpSession
+from .token_store import TokenStore
+
+# Refresh access tokens this many seconds before they expire
+DEFAULT_REFRESH_MARGIN = 60.0
 
 class TokenManager:
     """
     Handles obtaining and refreshing access tokens for PeerTube.
+
+    Tokens are refreshed ``refresh_margin`` seconds before they expire. With
+    a ``store``, tokens are shared through a file-locked on-disk store so
+    that other processes (and later runs) reuse them instead of requesting
+    new ones. Time spent renewing tokens is reported to ``metrics`` as the
+    ``token_refresh`` phase.
     """
-    def __init__(self, config: Config) -> None:
+    def __init__(
+        self,
+        config: Config,
+        session: Optional[HttpSession] = None,
+        store: Optional[TokenStore] = None,
+        refresh_margin: float = DEFAULT_REFRESH_MARGIN,
+        metrics: Optional[MetricsRecorder] = None,
+    ) -> None:
         self.config: Config = config
+        self.session: HttpSession = session or HttpSession()
+        self.store: Optional[TokenStore] = store
+        self.refresh_margin: float = refresh_margin
+        self.metrics: Optional[MetricsRecorder] = metrics
         self.access_token: Any = None
         self.refresh_token: Any = None
         self.token_expires: float = 0.0
         self.refresh_token_expires: float = 0.0
+        # When to proactively refresh: the margin before expiry, or halfway
+        # through the token lifetime if that is shorter than the margin
+        self.refresh_at: float = 0.0
+        # Guards token state when one manager is shared by upload threads
+        self._lock = threading.Lock()
 
     def _request_tokens(self, data: Dict[str, str]) -> Dict[str, Any]:
         url = f"{self.config.instance_url}/api/v1/users/token"
@@ -23,13 +52,7 @@ class TokenManager:
             "Content-Type": "application/x-www-form-urlencoded",
             "Accept": "application/json",
         }
-        # Disable SSL verification to avoid certificate errors
-        response = requests.post(
-            url,
-            headers=headers,
-            data=data,
-            verify=False,
-        )
+        response = self.session.post(url, headers=headers, data=data, retry=True)
         if response.status_code != 200:
             raise Exception(f"Token request failed: {response.status_code} {response.text}")
         return response.json()
@@ -67,18 +90,73 @@ class TokenManager:
         now = time.time()
         self.access_token = data.get("access_token")
         self.refresh_token = data.get("refresh_token")
-        self.token_expires = now + data.get("expires_in", 0)
+        expires_in = data.get("expires_in", 0)
+        self.token_expires = now + expires_in
         self.refresh_token_expires = now + data.get("refresh_token_expires_in", 0)
+        self.refresh_at = now + max(expires_in - self.refresh_margin, expires_in / 2)
+
+    def _token_state(self) -> Dict[str, Any]:
+        return {
+            "access_token": self.access_token,
+            "refresh_token": self.refresh_token,
+            "token_expires": self.token_expires,
+            "refresh_token_expires": self.refresh_token_expires,
+            "refresh_at": self.refresh_at,
+        }
+
+    def _adopt_state(self, state: Dict[str, Any]) -> None:
+        self.access_token = state.get("access_token")
+        self.refresh_token = state.get("refresh_token")
+        self.token_expires = state.get("token_expires", 0.0)
+        self.refresh_token_expires = state.get("refresh_token_expires", 0.0)
+        self.refresh_at = state.get("refresh_at", 0.0)
+
+    def _is_fresh(self, now: float) -> bool:
+        return bool(self.access_token) and now < self.refresh_at
+
+    def _renew(self) -> None:
+        """
+        Refresh the tokens if the refresh token is usable, else log in again.
+        """
+        timer = self.metrics.phase("token_refresh") if self.metrics else contextlib.nullcontext()
+        with timer:
+            self._renew_tokens()
+
+    def _renew_tokens(self) -> None:
+        if self.refresh_token and time.time() < self.refresh_token_expires:
+            try:
+                self.refresh_access_token()
+                return
+            except Exception:
+                # Refresh token revoked or rejected: fall back to the password grant
+                pass
+        self.get_new_tokens()
 
     def get_valid_token(self) -> str:
         """
         Return a valid access token, obtaining or refreshing as needed.
+
+        Safe to call from several threads and, with a store, from several
+        processes: callers that find the token stale wait for the one doing
+        the refresh and then reuse its result.
         """
-        now = time.time()
-        # If no token or expired, refresh or obtain new
-        if not self.access_token or now >= self.token_expires:
-            if self.refresh_token and now < self.refresh_token_expires:
-                self.refresh_access_token()
-            else:
-                self.get_new_tokens()
-        return self.access_token
\ No newline at end of file
+        token = self.access_token
+        # Lock-free fast path; the identity check catches a concurrent refresh
+        if self._is_fresh(time.time()) and self.access_token is token:
+            return token
+        with self._lock:
+            # Another thread may have refreshed while we waited for the lock
+            if self._is_fresh(time.time()):
+                return self.access_token
+            if self.store is None:
+                self._renew()
+                return self.access_token
+            with self.store.lock():
+                # Another process may have refreshed while we waited for the file lock
+                stored = self.store.load()
+                if stored and stored.get("access_token") != self.access_token:
+                    self._adopt_state(stored)
+                if not self._is_fresh(time.time()):
+                    self._renew()
+                    self.store.save(self._token_state())
+            return self.access_token
\ No newline at end of file
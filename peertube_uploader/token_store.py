@@ -0,0 +1,67 @@
+"""
+On-disk OAuth token store shared by processes of the same user.
+"""
+import contextlib
+import hashlib
+import json
+import os
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:
+    # fcntl is POSIX-only; without it the store works but is not locked
+    fcntl = None
+
+from .cache import DEFAULT_CACHE_DIR
+
+
+class TokenStore:
+    """
+    Keep PeerTube tokens in a JSON file keyed by instance URL and username.
+
+    ``lock()`` takes an exclusive file lock so that, across processes, only
+    one of them refreshes the tokens while the others wait and then reuse the
+    result. Files are created readable by the owner only.
+    """
+    def __init__(self, instance_url: str, username: str, store_dir: Optional[str] = None) -> None:
+        self.store_dir: str = store_dir or os.path.join(DEFAULT_CACHE_DIR, "tokens")
+        digest = hashlib.sha1(f"{instance_url}|{username}".encode("utf-8")).hexdigest()
+        self.path: str = os.path.join(self.store_dir, f"{digest}.json")
+
+    @contextlib.contextmanager
+    def lock(self) -> Iterator[None]:
+        """
+        Hold an exclusive inter-process lock on the store.
+        """
+        os.makedirs(self.store_dir, mode=0o700, exist_ok=True)
+        fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Return the stored token state, or None if there is none.
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, state: Dict[str, Any]) -> None:
+        """
+        Atomically replace the stored token state.
+        """
+        os.makedirs(self.store_dir, mode=0o700, exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.path)
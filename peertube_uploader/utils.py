@@ -3,7 +3,10 @@ Utility functions for generating video metadata.
 """
 import os
 import re
-from typing import Tuple
+from functools import lru_cache
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+from .config import Config
 
 def generate_title(file_path: str) -> str:
     """
@@ -71,11 +74,97 @@ def extract_language(filename: str) -> str:
             return part.lower()
     # No valid language code found
     raise ValueError(f"Language code not found in filename: {filename}")
-  
+
+_COURSE_RE = re.compile(r'[A-Za-z]{3}\d{3}')
+_PART_CHAPTER_RE = re.compile(r'(\d+)\.(\d+)')
+_REGION_LANG_RE = re.compile(r'([A-Za-z]{2,3})-([A-Za-z]{2})')
+_LANG_RE = re.compile(r'[A-Za-z]{2}')
+
+
+class FilenameInfo(NamedTuple):
+    """
+    Metadata parsed from a video filename. Fields are None when absent.
+    """
+    course: Optional[str]
+    part: Optional[int]
+    chapter: Optional[int]
+    lang: Optional[str]
+    region: Optional[str]
+
+
+def _parse_basename(base: str) -> FilenameInfo:
+    match = _COURSE_RE.search(base)
+    course = match.group(0).lower() if match else None
+
+    match = _PART_CHAPTER_RE.search(base)
+    part, chapter = (int(match.group(1)), int(match.group(2))) if match else (None, None)
+
+    lang = region = None
+    # Same result as os.path.splitext(base)[0] without the generic path handling
+    dot = base.rfind('.')
+    name = base[:dot] if dot > 0 and base[:dot].strip('.') else base
+    for segment in reversed(name.split('_')):
+        if '-' in segment:
+            match = _REGION_LANG_RE.fullmatch(segment)
+            if match:
+                lang, region = match.group(1).lower(), match.group(2).upper()
+                break
+            suffix = segment.rsplit('-', 1)[1]
+            if _LANG_RE.fullmatch(suffix):
+                lang = suffix.lower()
+                break
+        elif len(segment) == 2 and _LANG_RE.fullmatch(segment):
+            lang = segment.lower()
+            break
+    return FilenameInfo(course, part, chapter, lang, region)
+
+
+def parse_filename(filename: str) -> FilenameInfo:
+    """
+    Parse course index, part, chapter, language and region from a filename
+    in a single pass, with the same rules as extract_course_index,
+    extract_part_chapter and extract_language.
+    Example: "btc101_2.1_en-US.mp4" -> ('btc101', 2, 1, 'en', 'US')
+    """
+    return _parse_basename(os.path.basename(filename))
+
+
+_parse_basename_cached = lru_cache(maxsize=65536)(_parse_basename)
+
+
+def parse_filenames(filenames: Iterable[str]) -> List[FilenameInfo]:
+    """
+    Parse many filenames, caching results by base name so repeated names
+    (e.g. the same file in several folders) are parsed once.
+    """
+    basename = os.path.basename
+    return [_parse_basename_cached(basename(name)) for name in filenames]
+
+
+@lru_cache(maxsize=None)
+def _course_index(course_path: str):
+    """
+    Return the CourseIndex shared by get_chapter_name calls for course_path.
+    """
+    # Imported here: course_index imports this module
+    from .course_index import CourseIndex
+
+    return CourseIndex(course_path)
+
+
+@lru_cache(maxsize=1)
+def _default_course_path() -> str:
+    """
+    Return PATH_TO_COURSES from the configuration, read once per process.
+    """
+    return Config().course_path
+
+
 def get_chapter_name(
     course_index: str,
     part_chapter: Tuple[int, int],
     code_language: str,
+    course_path: Optional[str] = None,
 ) -> str:
     """
     Retrieve the chapter title for a given course, part, and language.
@@ -83,52 +172,18 @@ def get_chapter_name(
     course_index: directory name under PATH_TO_COURSES (e.g., 'btc101')
     part_chapter: tuple of (part_number, chapter_number)
     code_language: language code matching the markdown filename (e.g., 'en', 'fr')
+    course_path: courses directory; defaults to PATH_TO_COURSES, which is
+    read from the configuration on the first call only
 
     The markdown file is at {PATH_TO_COURSES}/{course_index}/{code_language}.md.
     A '+++' line demarcates front matter; parsing starts after this.
     Count level-1 headings (#) to identify the requested part,
     then within that part, count level-2 headings (##) to get the requested chapter.
     Returns the chapter title without leading '#' characters.
-    """
-    from .config import Config
-    import os
-
-    config = Config()
-    md_path = os.path.join(config.course_path, course_index, f"{code_language}.md")
-    if not os.path.isfile(md_path):
-        raise FileNotFoundError(f"Course markdown not found: {md_path}")
 
-    part_target, chapter_target = part_chapter
-
-    # Skip front matter marked by '+++'
-    with open(md_path, 'r', encoding='utf-8') as f:
-        # Skip until first '+++'
-        for line in f:
-            if line.strip().startswith('+++'):
-                break
-        # Skip until closing '+++'
-        for line in f:
-            if line.strip().startswith('+++'):
-                break
-
-        # Now parse content headings
-        part_count = 0
-        for line in f:
-            if line.startswith('# '):
-                part_count += 1
-                if part_count == part_target:
-                    # Found target part; search for chapters within
-                    chapter_count = 0
-                    for inner in f:
-                        if inner.startswith('# '):
-                            # Next part encountered; stop searching
-                            break
-                        if inner.startswith('## '):
-                            chapter_count += 1
-                            if chapter_count == chapter_target:
-                                return inner.lstrip('#').strip()
-                    # Part found but chapter missing
-                    break
-    raise ValueError(
-        f"Chapter {chapter_target} of part {part_target} not found in {md_path}"
-    )
+    Each markdown file is parsed once into a chapter table (see CourseIndex)
+    and re-parsed only when its mtime changes.
+    """
+    if course_path is None:
+        course_path = _default_course_path()
+    return _course_index(course_path).get_chapter_name(course_index, part_chapter, code_language)
@@ -0,0 +1,439 @@
+"""
+Watch a folder for finished .mp4 files and keep a persistent upload queue.
+"""
+import json
+import os
+import select
+import struct
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .cache import DEFAULT_CACHE_DIR
+from .finder import ScanIndex, scan_mp4_files
+
+DEFAULT_QUEUE_PATH = os.path.join(DEFAULT_CACHE_DIR, "watch_queue.json")
+
+# inotify(7) event bits
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+_EVENT = struct.Struct("iIII")
+
+
+def _is_video(name: str) -> bool:
+    return name[-4:].lower() == ".mp4"
+
+
+class Inotify:
+    """
+    Minimal inotify binding over libc (Linux only).
+
+    Raises OSError when inotify is not available, e.g. on other platforms or
+    when the per-user instance limit is reached.
+    """
+    def __init__(self) -> None:
+        # Only the watch command needs ctypes; keep it out of CLI startup
+        import ctypes
+        import ctypes.util
+
+        try:
+            self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            self._add_watch = self._libc.inotify_add_watch
+        except (OSError, AttributeError) as e:
+            raise OSError(f"inotify is not available: {e}")
+        self._get_errno = ctypes.get_errno
+        self.fd: int = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            errno = self._get_errno()
+            raise OSError(errno, f"inotify_init1 failed: {os.strerror(errno)}")
+
+    def add_watch(self, path: str, mask: int = WATCH_MASK) -> int:
+        wd = self._add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            errno = self._get_errno()
+            raise OSError(errno, os.strerror(errno), path)
+        return wd
+
+    def read(self, timeout: float) -> List[Tuple[int, int, str]]:
+        """
+        Wait up to ``timeout`` seconds and return (wd, mask, name) events.
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        pos = 0
+        while pos + _EVENT.size <= len(data):
+            wd, mask, _cookie, length = _EVENT.unpack_from(data, pos)
+            pos += _EVENT.size
+            name = os.fsdecode(data[pos:pos + length].rstrip(b"\0"))
+            pos += length
+            events.append((wd, mask, name))
+        return events
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class CompletenessTracker:
+    """
+    Decide when files that are being written are complete.
+
+    A file is complete once it was closed after writing (or renamed into
+    place) and then left alone for ``settle`` seconds, or, when no such
+    event is seen, once its size and mtime have not changed for
+    ``stable_seconds``. Empty files are never complete. Reported files are
+    remembered, so unchanged ones are not reported again, until ``release``
+    is called. Not thread-safe.
+    """
+    def __init__(self, settle: float = 1.0, stable_seconds: float = 5.0) -> None:
+        self.settle: float = settle
+        self.stable_seconds: float = stable_seconds
+        # path -> [size, mtime_ns, unchanged since, closed at or None]
+        self._pending: Dict[str, List[Any]] = {}
+        # Size and mtime of files reported complete and not released yet
+        self._complete: Dict[str, Tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._pending
+
+    def observe(self, path: str, closed: bool = False, stat: Optional[Tuple[int, int]] = None) -> None:
+        """
+        Note that ``path`` was created, written or (with ``closed``) closed.
+        ``stat`` is its (size, mtime_ns) if the caller already has them.
+        """
+        entry = self._pending.get(path)
+        if entry is not None and not closed:
+            # Still being written; check() picks up the new size
+            return
+        if stat is None:
+            try:
+                st = os.stat(path)
+            except OSError:
+                self.forget(path)
+                return
+            stat = (st.st_size, st.st_mtime_ns)
+        if entry is None and not closed and self._complete.get(path) == stat:
+            return
+        now = time.monotonic()
+        if entry is None or (entry[0], entry[1]) != stat:
+            entry = [stat[0], stat[1], now, None]
+            self._pending[path] = entry
+        if closed:
+            entry[3] = now
+
+    def forget(self, path: str) -> None:
+        self._pending.pop(path, None)
+        self._complete.pop(path, None)
+
+    def release(self, path: str) -> None:
+        """
+        Stop remembering a reported file once the caller has taken it over.
+        """
+        self._complete.pop(path, None)
+
+    def check(self) -> List[str]:
+        """
+        Return the pending files that are now complete.
+        """
+        now = time.monotonic()
+        ready = []
+        for path, entry in list(self._pending.items()):
+            try:
+                st = os.stat(path)
+            except OSError:
+                del self._pending[path]
+                continue
+            if (st.st_size, st.st_mtime_ns) != (entry[0], entry[1]):
+                # Written again, possibly after a close
+                self._pending[path] = [st.st_size, st.st_mtime_ns, now, None]
+                continue
+            if not entry[0]:
+                continue
+            closed_at = entry[3]
+            if (closed_at is not None and now - closed_at >= self.settle) or \
+                    now - entry[2] >= self.stable_seconds:
+                del self._pending[path]
+                self._complete[path] = (entry[0], entry[1])
+                ready.append(path)
+        return ready
+
+
+class FolderWatcher:
+    """
+    Call ``on_ready(path)`` for each complete .mp4 file under ``root``.
+
+    Uses inotify when available: close-write and rename events mark files
+    complete after ``settle`` seconds, and new subdirectories are watched as
+    they appear. Otherwise (or with ``use_inotify=False``) the folder is
+    rescanned every ``poll_interval`` seconds with ``scan_mp4_files`` and
+    files are complete once their size and mtime are stable. Files already
+    present at start are reported once they are complete, too.
+
+    Nothing is kept about a file once ``on_ready`` has returned. Polling
+    skips files whose ctime and mtime are older than the previous scan;
+    ctime also moves on renames and on copies that keep the mtime.
+    """
+    def __init__(
+        self,
+        root: str,
+        on_ready: Callable[[str], None],
+        settle: float = 1.0,
+        stable_seconds: float = 5.0,
+        poll_interval: float = 2.0,
+        use_inotify: Optional[bool] = None,
+        index: Optional[ScanIndex] = None,
+    ) -> None:
+        self.root: str = root
+        self.on_ready = on_ready
+        self.poll_interval: float = poll_interval
+        self.index: Optional[ScanIndex] = index
+        self.tracker = CompletenessTracker(settle, stable_seconds)
+        self._inotify: Optional[Inotify] = None
+        if use_inotify or use_inotify is None:
+            try:
+                self._inotify = Inotify()
+            except OSError:
+                if use_inotify:
+                    raise
+        self.mode: str = "inotify" if self._inotify is not None else "polling"
+        self._dirs: Dict[int, str] = {}
+        # Files changed before this time (ns) were seen by an earlier scan
+        self._scanned_before: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _scan(self) -> None:
+        # The margin covers coarse file system timestamps; it is shorter than
+        # the time a file takes to be reported, so none is reported twice
+        margin = min(1.0, self.tracker.stable_seconds / 2)
+        started = time.time_ns() - int(margin * 1e9)
+        for entry in scan_mp4_files(self.root, self.index):
+            # The index only tracks directories: a file growing in place keeps
+            # its cached size and mtime, so stat it for the real ones
+            try:
+                st = os.stat(entry.path)
+            except OSError:
+                self.tracker.forget(entry.path)
+                continue
+            if self._scanned_before is not None and entry.path not in self.tracker \
+                    and max(st.st_ctime_ns, st.st_mtime_ns) < self._scanned_before:
+                continue
+            self.tracker.observe(entry.path, stat=(st.st_size, st.st_mtime_ns))
+        self._scanned_before = started
+
+    def _watch_tree(self, directory: str) -> None:
+        # Add the watches first so files created meanwhile are not missed
+        for current, dirs, _ in os.walk(directory):
+            try:
+                self._dirs[self._inotify.add_watch(current)] = current
+            except OSError:
+                dirs[:] = []
+        for entry in scan_mp4_files(directory):
+            self.tracker.observe(entry.path, stat=(entry.size, entry.mtime_ns))
+
+    def _handle(self, wd: int, mask: int, name: str) -> None:
+        if mask & IN_Q_OVERFLOW:
+            # Events were lost; look at everything again
+            self._watch_tree(self.root)
+            return
+        directory = self._dirs.get(wd)
+        if directory is None:
+            return
+        if mask & IN_IGNORED:
+            del self._dirs[wd]
+            return
+        path = os.path.join(directory, name)
+        if mask & IN_ISDIR:
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                self._watch_tree(path)
+        elif _is_video(name):
+            if mask & (IN_DELETE | IN_MOVED_FROM):
+                self.tracker.forget(path)
+            else:
+                self.tracker.observe(path, closed=bool(mask & (IN_CLOSE_WRITE | IN_MOVED_TO)))
+
+    def poll(self, timeout: float) -> List[str]:
+        """
+        Wait up to ``timeout`` seconds for changes and return (and report)
+        the files that became complete.
+        """
+        if self._inotify is not None:
+            for wd, mask, name in self._inotify.read(timeout):
+                self._handle(wd, mask, name)
+        else:
+            self._stop.wait(timeout)
+            self._scan()
+        ready = self.tracker.check()
+        for path in ready:
+            self.on_ready(path)
+            self.tracker.release(path)
+        return ready
+
+    def run(self) -> None:
+        """
+        Watch until ``close()`` is called.
+        """
+        if self._inotify is not None:
+            self._watch_tree(self.root)
+            if not self._dirs:
+                # Out of watches, or a file system without inotify support
+                self._inotify.close()
+                self._inotify = None
+                self.mode = "polling"
+        if self._inotify is None:
+            self._scan()
+        # Pending files are re-checked at least every second
+        timeout = min(self.poll_interval, 1.0) if self._inotify is not None else self.poll_interval
+        while not self._stop.is_set():
+            self.poll(timeout)
+
+    def start(self) -> "FolderWatcher":
+        self._thread = threading.Thread(target=self.run, name="folder-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._inotify is not None:
+            self._inotify.close()
+
+
+class UploadQueue:
+    """
+    Persistent FIFO of files waiting to be uploaded.
+
+    The queue is rewritten atomically on every change, so files that were
+    found but not uploaded yet, including those in flight, survive a restart.
+    ``get`` hands out each file to one worker at a time; a file stays queued
+    until ``done`` is called, and ``retry`` makes it available again later.
+    Safe to share between threads.
+    """
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path: str = path or DEFAULT_QUEUE_PATH
+        self._entries: List[Dict[str, Any]] = []
+        self._in_flight: set = set()
+        self._closed: bool = False
+        self._cond = threading.Condition()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = []
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._entries)
+
+    def _save(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f)
+        os.replace(tmp_path, self.path)
+
+    def _find(self, path: str) -> Optional[Dict[str, Any]]:
+        for entry in self._entries:
+            if entry["path"] == path:
+                return entry
+        return None
+
+    def put(self, path: str) -> bool:
+        """
+        Queue a file; returns False if it is already queued.
+        """
+        with self._cond:
+            if self._find(path) is not None:
+                return False
+            self._entries.append({"path": path, "attempts": 0, "not_before": 0})
+            self._save()
+            self._cond.notify_all()
+            return True
+
+    def get(self, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Take the oldest file that is due and not being uploaded, waiting for
+        one if needed. Returns None on timeout or once the queue is closed.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while not self._closed:
+                now = time.time()
+                wait = None
+                for entry in self._entries:
+                    if entry["path"] in self._in_flight:
+                        continue
+                    if entry["not_before"] <= now:
+                        self._in_flight.add(entry["path"])
+                        return entry["path"]
+                    due = entry["not_before"] - now
+                    wait = due if wait is None else min(wait, due)
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return None
+                    wait = remaining if wait is None else min(wait, remaining)
+                self._cond.wait(wait)
+            return None
+
+    def done(self, path: str) -> None:
+        """
+        Remove a file from the queue (uploaded, or given up on).
+        """
+        with self._cond:
+            self._in_flight.discard(path)
+            entry = self._find(path)
+            if entry is not None:
+                self._entries.remove(entry)
+                self._save()
+            self._cond.notify_all()
+
+    def retry(self, path: str, delay: float, backoff: float = 2.0) -> int:
+        """
+        Make a file available again later and return the number of failed
+        attempts so far. The wait is ``delay`` seconds after the first
+        failure and grows by ``backoff`` times with each further one.
+        """
+        with self._cond:
+            self._in_flight.discard(path)
+            entry = self._find(path)
+            if entry is None:
+                return 0
+            entry["attempts"] += 1
+            entry["not_before"] = time.time() + delay * backoff ** (entry["attempts"] - 1)
+            self._save()
+            self._cond.notify_all()
+            return entry["attempts"]
+
+    def close(self) -> None:
+        """
+        Wake up waiting ``get`` calls, which then return None.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
@@ -12,10 +12,11 @@ setup(
     ],
     extras_require={
         'dev': ['pytest'],
+        'async': ['aiohttp>=3.8'],
     },
     entry_points={
         "console_scripts": [
-            "upload-folder-peertube=upload_folder_peertube:main",
+            "upload-folder-peertube=peertube_uploader.cli:main",
         ],
     },
 )
\ No newline at end of file
@@ -0,0 +1,462 @@
+"""
+Local stand-in for the PeerTube API endpoints used by this package.
+
+Runs a threaded HTTP server on 127.0.0.1 with an ephemeral port. Only the
+behaviour the uploader relies on is implemented: OAuth token grant,
+users/me, the user's video list, video details, single-request upload,
+the resumable upload protocol, playlists (create, list, add, reorder) and
+caption tracks (list, upload).
+"""
+import json
+import random
+import threading
+import time
+import uuid
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Union
+from urllib.parse import parse_qs, urlparse
+
+from peertube_uploader.throttle import BandwidthLimiter
+
+STATE_LABELS = {1: "Published", 2: "To transcode", 7: "Transcoding failed"}
+
+# Request bodies are read in pieces of this size (and paced by ``bandwidth``)
+READ_PIECE = 64 * 1024
+
+
+class StubConfig:
+    """
+    Config pointing at a local PeerTube stand-in.
+    """
+    def __init__(self, url: str) -> None:
+        self.upload_url = url
+        self.instance_url = url
+        self.client_id = "id"
+        self.client_secret = "secret"
+        self.username = "user"
+        self.password = "pass"
+        self.verify_ssl = False
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "PeerTubeStub"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _send_json(self, status: int, payload: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, val in (headers or {}).items():
+            self.send_header(key, val)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_empty(self, status: int, headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        for key, val in (headers or {}).items():
+            self.send_header(key, val)
+        self.end_headers()
+
+    def _read(self, length: int) -> bytes:
+        """Read ``length`` body bytes at the configured bandwidth; b"" if not kept."""
+        limiter = self.server.limiter
+        keep = self.server.keep_data
+        parts = []
+        remaining = length
+        while remaining > 0:
+            piece = self.rfile.read(min(READ_PIECE, remaining))
+            if not piece:
+                break
+            remaining -= len(piece)
+            if limiter:
+                limiter.consume(len(piece))
+            if keep:
+                parts.append(piece)
+        with self.server.lock:
+            self.server.bytes_received += length - remaining
+        return b"".join(parts)
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self._read(length) if length else b""
+
+    def _read_multipart(self) -> Dict[str, Any]:
+        """Parse a multipart/form-data body into {field: str or bytes}."""
+        if not self.server.keep_data:
+            # Only the size is known: the body was counted and dropped
+            length = int(self.headers.get("Content-Length") or 0)
+            self._read(length)
+            return {"videofile_size": length}
+        header = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode("utf-8")
+        message = BytesParser(policy=HTTP).parsebytes(header + self._read_body())
+        form: Dict[str, Any] = {}
+        for part in message.iter_parts():
+            name = part.get_param("name", header="content-disposition")
+            payload = part.get_payload(decode=True)
+            form[name] = payload if part.get_filename() else payload.decode("utf-8")
+        return form
+
+    def _record(self) -> bool:
+        """Log the request; return True if an injected error was sent instead."""
+        with self.server.lock:
+            self.server.requests.append((self.command, urlparse(self.path).path))
+            status = self.server.errors.pop(0) if self.server.errors else None
+            if status is None and self.server.error_rate \
+                    and self.server.random.random() < self.server.error_rate:
+                status = self.server.random.choice(self.server.error_statuses)
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if status is None:
+            return False
+        self._read_body()
+        self._send_json(status, {"error": "injected"}, {"Retry-After": "0"})
+        return True
+
+    def do_POST(self) -> None:
+        if self._record():
+            return
+        path = urlparse(self.path).path
+        if path == "/api/v1/users/token":
+            self._read_body()
+            self.server.token_grants += 1
+            self._send_json(200, {
+                "access_token": f"access-{self.server.token_grants}",
+                "refresh_token": f"refresh-{self.server.token_grants}",
+                "expires_in": self.server.token_ttl,
+                "refresh_token_expires_in": 3600,
+            })
+        elif path == "/api/v1/videos/upload":
+            form = self._read_multipart()
+            size = form.pop("videofile_size", None) or len(form.get("videofile", b""))
+            video = self.server.create_video(size, form)
+            self._send_json(200, {"video": video})
+        elif path == "/api/v1/videos/upload-resumable":
+            meta = json.loads(self._read_body() or b"{}")
+            upload_id = uuid.uuid4().hex
+            with self.server.lock:
+                self.server.sessions[upload_id] = {
+                    "size": int(self.headers["X-Upload-Content-Length"]),
+                    "data": bytearray(),
+                    "received": 0,
+                    "meta": meta,
+                }
+            host = self.headers.get("Host")
+            location = f"//{host}/api/v1/videos/upload-resumable?upload_id={upload_id}"
+            self._send_empty(201, {"Location": location})
+        elif path == "/api/v1/video-playlists":
+            form = self._read_multipart()
+            playlist = self.server.create_playlist(
+                form["displayName"], int(form["videoChannelId"]), int(form.get("privacy", 1))
+            )
+            self._send_json(200, {"videoPlaylist": {k: playlist[k] for k in ("id", "uuid", "shortUUID")}})
+        elif path.startswith("/api/v1/video-playlists/"):
+            self._post_playlist(path)
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def _post_playlist(self, path: str) -> None:
+        key, _, action = path[len("/api/v1/video-playlists/"):].partition("/")
+        body = json.loads(self._read_body() or b"{}")
+        playlist = self.server.find_playlist(key)
+        if playlist is None:
+            self._send_json(404, {"error": "playlist not found"})
+        elif action == "videos":
+            video = self.server.find_video(body.get("videoId", ""))
+            if video is None:
+                self._send_json(400, {"error": "unknown video"})
+                return
+            with self.server.lock:
+                element_id = self.server.next_element_id
+                self.server.next_element_id += 1
+                playlist["elements"].append({"id": element_id, "video": video["id"]})
+            self._send_json(200, {"videoPlaylistElement": {"id": element_id}})
+        elif action == "videos/reorder":
+            start = body["startPosition"]
+            after = body["insertAfterPosition"]
+            length = body.get("reorderLength", 1)
+            with self.server.lock:
+                elements = playlist["elements"]
+                block = elements[start - 1:start - 1 + length]
+                del elements[start - 1:start - 1 + length]
+                index = after if after < start else after - length
+                elements[index:index] = block
+            self._send_empty(204)
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_GET(self) -> None:
+        if self._record():
+            return
+        path = urlparse(self.path).path
+        if path == "/api/v1/users/me":
+            self._send_json(200, {
+                "username": "user",
+                "videoChannels": self.server.channels,
+            })
+        elif path == "/api/v1/users/me/videos":
+            query = parse_qs(urlparse(self.path).query)
+            start = int(query.get("start", ["0"])[0])
+            count = int(query.get("count", ["15"])[0])
+            with self.server.lock:
+                newest = [self.server.public_video(v) for v in reversed(self.server.videos)]
+            self._send_json(200, {"total": len(newest), "data": newest[start:start + count]})
+        elif path == "/api/v1/accounts/user/video-playlists":
+            query = parse_qs(urlparse(self.path).query)
+            start = int(query.get("start", ["0"])[0])
+            count = int(query.get("count", ["15"])[0])
+            with self.server.lock:
+                playlists = [self.server.public_playlist(p) for p in self.server.playlists]
+            self._send_json(200, {"total": len(playlists), "data": playlists[start:start + count]})
+        elif path.startswith("/api/v1/video-playlists/") and path.endswith("/videos"):
+            playlist = self.server.find_playlist(path.split("/")[4])
+            if playlist is None:
+                self._send_json(404, {"error": "playlist not found"})
+                return
+            query = parse_qs(urlparse(self.path).query)
+            start = int(query.get("start", ["0"])[0])
+            count = int(query.get("count", ["15"])[0])
+            with self.server.lock:
+                elements = [
+                    {
+                        "id": element["id"],
+                        "position": position,
+                        "video": self.server.public_video(self.server.videos[element["video"] - 1]),
+                    }
+                    for position, element in enumerate(playlist["elements"], 1)
+                ]
+            self._send_json(200, {"total": len(elements), "data": elements[start:start + count]})
+        elif path.startswith("/api/v1/videos/") and path.endswith("/captions"):
+            video = self.server.find_video(path.split("/")[4])
+            if video is None:
+                self._send_json(404, {"error": "not found"})
+                return
+            with self.server.lock:
+                captions = [
+                    {"language": {"id": lang, "label": lang}, "captionPath": f"/lazy-static/{lang}.vtt"}
+                    for lang in sorted(video["captions"])
+                ]
+            self._send_json(200, {"total": len(captions), "data": captions})
+        elif path.startswith("/api/v1/videos/"):
+            video = self.server.find_video(path.rsplit("/", 1)[1])
+            if video is None:
+                self._send_json(404, {"error": "not found"})
+            else:
+                self._send_json(200, self.server.public_video(video))
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_PUT(self) -> None:
+        if self._record():
+            return
+        parsed = urlparse(self.path)
+        if parsed.path.startswith("/api/v1/videos/") and "/captions/" in parsed.path:
+            self._put_caption(parsed.path)
+            return
+        if parsed.path != "/api/v1/videos/upload-resumable":
+            self._send_json(404, {"error": "not found"})
+            return
+        upload_id = parse_qs(parsed.query).get("upload_id", [""])[0]
+        session = self.server.sessions.get(upload_id)
+        if session is None:
+            self._read_body()
+            self._send_json(404, {"error": "unknown upload"})
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        content_range = self.headers.get("Content-Range", "")
+        if length and self.server.disconnects:
+            # Simulate a dropped connection halfway through this chunk
+            self.server.disconnects -= 1
+            keep = length // 2
+            session["data"] += self._read(keep)
+            session["received"] += keep
+            self.close_connection = True
+            self.connection.close()
+            return
+
+        if length and not self.server.accept_chunks:
+            # Answer as if the chunk was lost, without moving the offset
+            self._read(length)
+            length = 0
+        if length:
+            start = int(content_range.split(" ", 1)[1].split("-", 1)[0])
+            if start != session["received"]:
+                self._read(length)
+                self._send_json(409, {"error": "offset mismatch"})
+                return
+            session["data"] += self._read(length)
+            session["received"] += length
+
+        received = session["received"]
+        if received >= session["size"]:
+            if "video" not in session:
+                session["video"] = self.server.create_video(received, session["meta"])
+            self._send_json(200, {"video": session["video"]})
+            return
+        headers = {"Range": f"bytes=0-{received - 1}"} if received else {}
+        self._send_empty(308, headers)
+
+    def _put_caption(self, path: str) -> None:
+        parts = path.split("/")
+        video = self.server.find_video(parts[4])
+        form = self._read_multipart()
+        if video is None:
+            self._send_json(404, {"error": "not found"})
+        elif "captionfile" not in form:
+            self._send_json(400, {"error": "captionfile is required"})
+        else:
+            with self.server.lock:
+                video["captions"][parts[6]] = form["captionfile"]
+            self._send_empty(204)
+
+
+class PeerTubeStub(ThreadingHTTPServer):
+    """
+    In-process PeerTube stand-in. Use as a context manager.
+
+    Set ``disconnects`` to the number of upcoming resumable PUTs that should
+    drop mid-chunk, ``latency`` to delay every request by that many
+    seconds and ``errors`` to a list of status codes returned (with
+    Retry-After: 0) by the next requests. ``error_rate`` additionally fails
+    that fraction of requests with one of ``error_statuses`` (seeded, so runs
+    repeat). ``bandwidth`` caps how fast request bodies are read (bytes/s,
+    shared by all connections) and ``keep_data = False`` counts uploaded
+    bytes without storing them, for large benchmark files. Uploaded sizes are
+    kept in ``videos`` (with caption files under "captions") and playlists,
+    with their elements in order, in ``playlists``.
+    New videos get ``initial_state``; change it later with ``set_state()``.
+    With ``accept_chunks = False`` resumable PUTs are answered with a 308
+    that does not move the upload offset.
+    """
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.lock = threading.Lock()
+        self.requests: List[Any] = []
+        self.sessions: Dict[str, Dict[str, Any]] = {}
+        self.videos: List[Dict[str, Any]] = []
+        self.channels: List[Dict[str, Any]] = [
+            {"id": 7, "name": "main", "displayName": "Main", "host": "127.0.0.1"},
+            {"id": 8, "name": "courses_fr", "displayName": "Cours", "host": "127.0.0.1"},
+        ]
+        self.token_grants = 0
+        self.token_ttl = 3600
+        self.disconnects = 0
+        self.latency = 0.0
+        self.errors: List[int] = []
+        self.error_rate = 0.0
+        self.error_statuses: List[int] = [503]
+        self.random = random.Random(0)
+        self.keep_data = True
+        self.bytes_received = 0
+        self.limiter: Optional[BandwidthLimiter] = None
+        self.initial_state = 1
+        self.accept_chunks = True
+        self.playlists: List[Dict[str, Any]] = []
+        self.next_element_id = 1
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def bandwidth(self) -> Optional[float]:
+        return self.limiter.rate if self.limiter else None
+
+    @bandwidth.setter
+    def bandwidth(self, rate: Optional[float]) -> None:
+        # A small burst keeps the cap tight even for short uploads
+        self.limiter = BandwidthLimiter(rate, burst=READ_PIECE) if rate else None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def create_video(self, size: int, meta: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        with self.lock:
+            video_id = len(self.videos) + 1
+            video = {
+                "id": video_id,
+                "uuid": uuid.uuid4().hex,
+                "shortUUID": f"v{video_id}",
+                "size": size,
+                "meta": meta or {},
+                "state": self.initial_state,
+                "captions": {},
+            }
+            self.videos.append(video)
+        return {k: video[k] for k in ("id", "uuid", "shortUUID")}
+
+    def find_video(self, key: Union[int, str]) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            for video in self.videos:
+                if str(key) in (str(video["id"]), video["uuid"], video["shortUUID"]):
+                    return video
+        return None
+
+    def set_state(self, key: Union[int, str], state: int) -> None:
+        video = self.find_video(key)
+        with self.lock:
+            video["state"] = state
+
+    def public_video(self, video: Dict[str, Any]) -> Dict[str, Any]:
+        state = video["state"]
+        public = {k: video[k] for k in ("id", "uuid", "shortUUID")}
+        public["state"] = {"id": state, "label": STATE_LABELS.get(state, str(state))}
+        return public
+
+    def create_playlist(self, display_name: str, channel_id: int, privacy: int = 1) -> Dict[str, Any]:
+        with self.lock:
+            playlist_id = len(self.playlists) + 1
+            playlist = {
+                "id": playlist_id,
+                "uuid": uuid.uuid4().hex,
+                "shortUUID": f"p{playlist_id}",
+                "displayName": display_name,
+                "privacy": privacy,
+                "channelId": channel_id,
+                "elements": [],
+            }
+            self.playlists.append(playlist)
+        return playlist
+
+    def find_playlist(self, key: Union[int, str]) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            for playlist in self.playlists:
+                if str(key) in (str(playlist["id"]), playlist["uuid"], playlist["shortUUID"]):
+                    return playlist
+        return None
+
+    def playlist_names(self, key: Union[int, str]) -> List[str]:
+        """
+        Return the "name" of each video in a playlist, in position order.
+        """
+        playlist = self.find_playlist(key)
+        with self.lock:
+            return [self.videos[e["video"] - 1]["meta"].get("name") for e in playlist["elements"]]
+
+    def public_playlist(self, playlist: Dict[str, Any]) -> Dict[str, Any]:
+        public = {k: playlist[k] for k in ("id", "uuid", "shortUUID", "displayName")}
+        public["privacy"] = {"id": playlist["privacy"]}
+        public["videosLength"] = len(playlist["elements"])
+        public["videoChannel"] = {"id": playlist["channelId"]}
+        return public
+
+    def count(self, method: str, path: str) -> int:
+        with self.lock:
+            return sum(1 for m, p in self.requests if m == method and p == path)
+
+    def __enter__(self) -> "PeerTubeStub":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.shutdown()
+        self.server_close()
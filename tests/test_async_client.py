@@ -0,0 +1,81 @@
+import asyncio
+import os
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+from aiohttp import web
+
+from peertube_uploader.async_client import AsyncPeerTubeClient
+
+from .peertube_stub import StubConfig
+
+async def _start_stub(state):
+    """Minimal aiohttp PeerTube stand-in tracking upload concurrency."""
+    async def token(request):
+        await request.post()
+        state["token_grants"] += 1
+        return web.json_response({
+            "access_token": "access", "refresh_token": "refresh",
+            "expires_in": 3600, "refresh_token_expires_in": 3600,
+        })
+
+    async def me(request):
+        state["me_calls"] += 1
+        return web.json_response({"videoChannels": [{"id": 7, "name": "main"}]})
+
+    async def upload(request):
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        try:
+            fields = {}
+            reader = await request.multipart()
+            async for part in reader:
+                data = await part.read()
+                fields[part.name] = data if part.filename else data.decode()
+            await asyncio.sleep(0.02)
+        finally:
+            state["active"] -= 1
+        if fields["name"] == "broken":
+            return web.json_response({"error": "bad video"}, status=400)
+        state["uploads"].append(fields)
+        return web.json_response({"video": {"id": len(state["uploads"]), "shortUUID": "x"}})
+
+    app = web.Application(client_max_size=1024 ** 3)
+    app.router.add_post("/api/v1/users/token", token)
+    app.router.add_get("/api/v1/users/me", me)
+    app.router.add_post("/api/v1/videos/upload", upload)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+def test_upload_many_bounded_concurrency(tmp_path):
+    files = []
+    for i in range(12):
+        path = tmp_path / f"btc101_1.{i}_en.mp4"
+        path.write_bytes(os.urandom(30_000 + i))
+        files.append(path)
+
+    async def scenario():
+        state = {"token_grants": 0, "me_calls": 0, "active": 0, "peak": 0, "uploads": []}
+        runner, url = await _start_stub(state)
+        try:
+            async with AsyncPeerTubeClient(StubConfig(url), buffer_size=8192) as client:
+                videos = [(str(p), p.stem, "") for p in files] + [(str(files[0]), "broken", "")]
+                results = await client.upload_many(videos, concurrency=4)
+        finally:
+            await runner.cleanup()
+        return state, results
+
+    state, results = asyncio.run(scenario())
+    assert [r.path for r in results[:-1]] == [str(p) for p in files]
+    assert all(r.ok for r in results[:-1])
+    assert not results[-1].ok and "HTTP 400" in str(results[-1].error)
+    assert state["peak"] == 4
+    assert state["token_grants"] == 1
+    assert state["me_calls"] == 1
+    uploaded = {f["name"]: f["videofile"] for f in state["uploads"]}
+    assert all(uploaded[p.stem] == p.read_bytes() for p in files)
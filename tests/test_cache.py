@@ -0,0 +1,29 @@
+import os
+import stat
+import time
+
+from peertube_uploader.cache import DiskCache, TTLCache
+
+def test_ttl_cache_expires():
+    cache = TTLCache(0.05)
+    cache.set("k", {"a": 1})
+    assert cache.get("k") == {"a": 1}
+    time.sleep(0.06)
+    assert cache.get("k") is None
+
+def test_disk_cache_roundtrip_and_expiry(tmp_path):
+    cache = DiskCache(str(tmp_path), ttl=60)
+    assert cache.get("https://a|user") is None
+    cache.set("https://a|user", {"videoChannels": [{"id": 1}]})
+    assert cache.get("https://a|user") == {"videoChannels": [{"id": 1}]}
+    assert cache.get("https://b|user") is None
+    expired = DiskCache(str(tmp_path), ttl=-1)
+    expired.set("https://a|user", {})
+    assert expired.get("https://a|user") is None
+
+def test_disk_cache_files_are_private(tmp_path):
+    cache = DiskCache(str(tmp_path / "profiles"))
+    cache.set("https://a|user", {"account": {"id": 1}})
+    assert stat.S_IMODE(os.stat(tmp_path / "profiles").st_mode) == 0o700
+    [name] = os.listdir(tmp_path / "profiles")
+    assert stat.S_IMODE(os.stat(tmp_path / "profiles" / name).st_mode) == 0o600
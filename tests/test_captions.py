@@ -0,0 +1,96 @@
+import os
+
+from peertube_uploader.captions import CaptionFolder, CaptionTrack, CaptionUploader, group_variants
+from peertube_uploader.client import PeerTubeClient
+from peertube_uploader.finder import scan_mp4_files
+
+from .peertube_stub import PeerTubeStub, StubConfig
+from .test_probe import mp4_bytes
+
+def touch(path, data=b"x"):
+    path.write_bytes(data)
+    return str(path)
+
+def same_media(path):
+    return "same"
+
+def test_group_variants_folds_languages_with_captions():
+    groups = group_variants([
+        "/v/btc101_1.1_en.mp4", "/v/btc101_1.1_fr.mp4", "/v/btc101_1.1_es.mp4",
+        "/v/btc101_1.1_fr.srt", "/v/btc101_1.1_fr.vtt", "/v/btc101_1.1_en.srt",
+        "/v/btc101_1.2_fr.mp4", "/v/notes.mp4", "/v/notes_fr.srt",
+    ], digest=same_media)
+    by_base = {g.base: g for g in groups}
+    assert set(by_base) == {"/v/btc101_1.1_en.mp4", "/v/btc101_1.1_es.mp4", "/v/btc101_1.2_fr.mp4", "/v/notes.mp4"}
+    base = by_base["/v/btc101_1.1_en.mp4"]
+    assert base.folded == ["/v/btc101_1.1_fr.mp4"]
+    # .vtt is preferred over .srt for the same language
+    assert base.captions == [
+        CaptionTrack("en", "/v/btc101_1.1_en.srt"), CaptionTrack("fr", "/v/btc101_1.1_fr.vtt"),
+    ]
+    # Without a caption file (burned-in subtitles only) a variant is still uploaded
+    assert by_base["/v/btc101_1.1_es.mp4"].folded == []
+    assert by_base["/v/notes.mp4"].captions == []
+
+def test_group_variants_base_choice():
+    paths = ["/v/btc101_1.1_en.mp4", "/v/btc101_1.1_fr.mp4", "/v/btc101_1.1_en.vtt", "/v/btc101_1.1_fr.vtt"]
+    assert [g.base for g in group_variants(paths, digest=same_media)] == ["/v/btc101_1.1_en.mp4"]
+    assert [g.base for g in group_variants(paths, base_lang="fr", digest=same_media)] == ["/v/btc101_1.1_fr.mp4"]
+    [group] = group_variants(paths + ["/v/btc101_1.1.mp4"], digest=same_media)
+    assert group.base == "/v/btc101_1.1.mp4"
+    assert sorted(group.folded) == ["/v/btc101_1.1_en.mp4", "/v/btc101_1.1_fr.mp4"]
+
+def test_group_variants_keeps_variants_with_other_media():
+    paths = ["/v/btc101_1.1_en.mp4", "/v/btc101_1.1_fr.mp4", "/v/btc101_1.1_fr.vtt"]
+    groups = group_variants(paths, digest=lambda path: path)
+    assert sorted((g.base, g.folded) for g in groups) == [
+        ("/v/btc101_1.1_en.mp4", []), ("/v/btc101_1.1_fr.mp4", []),
+    ]
+    # Unreadable media is never folded either
+    assert len(group_variants(paths, digest=lambda path: None)) == 2
+
+def test_folder_streams_base_videos_only(tmp_path):
+    course = tmp_path / "btc101"
+    course.mkdir()
+    video = mp4_bytes(samples=(500, 300), audio=(20, 21))
+    touch(course / "btc101_1.1_en.mp4", video)
+    touch(course / "btc101_1.1_fr.mp4", video)
+    # Dubbed: same video, other audio
+    touch(course / "btc101_1.1_es.mp4", mp4_bytes(samples=(500, 300), audio=(22, 19)))
+    for name in ("btc101_1.1_fr.vtt", "btc101_1.1_es.vtt", "btc101_1.2_en.mp4"):
+        touch(course / name)
+    folder = CaptionFolder()
+    kept = [entry.path for entry in folder.fold(scan_mp4_files(str(tmp_path)))]
+    assert sorted(kept) == [
+        str(course / "btc101_1.1_en.mp4"), str(course / "btc101_1.1_es.mp4"), str(course / "btc101_1.2_en.mp4"),
+    ]
+    assert folder.folded_count == 1
+    assert folder.groups[str(course / "btc101_1.1_en.mp4")].captions == [
+        CaptionTrack("es", str(course / "btc101_1.1_es.vtt")),
+        CaptionTrack("fr", str(course / "btc101_1.1_fr.vtt")),
+    ]
+
+def test_uploader_attaches_missing_captions_only(tmp_path):
+    with PeerTubeStub() as stub:
+        client = PeerTubeClient(StubConfig(stub.url))
+        video = touch(tmp_path / "btc101_1.1_en.mp4", os.urandom(100))
+        uuid = client.upload_video(video, "v", channel_id=7)["video"]["uuid"]
+        tracks = [
+            (uuid, CaptionTrack(lang, touch(tmp_path / f"btc101_1.1_{lang}.vtt", f"WEBVTT {lang}".encode())))
+            for lang in ("en", "fr", "es")
+        ]
+        uploader = CaptionUploader(client, jobs=3)
+        results = uploader.sync(tracks)
+        assert [(r.track.lang, r.uploaded, r.ok) for r in results] == [
+            ("en", True, True), ("fr", True, True), ("es", True, True),
+        ]
+        assert stub.find_video(uuid)["captions"]["fr"] == b"WEBVTT fr"
+
+        del stub.find_video(uuid)["captions"]["es"]
+        results = uploader.sync(tracks + [("missing", tracks[0][1])])
+        assert [(r.video, r.track.lang, r.uploaded, r.ok) for r in results] == [
+            (uuid, "en", False, True), (uuid, "fr", False, True), (uuid, "es", True, True),
+            ("missing", "en", False, False),
+        ]
+        assert stub.count("PUT", f"/api/v1/videos/{uuid}/captions/es") == 2
+        assert stub.count("PUT", f"/api/v1/videos/{uuid}/captions/fr") == 1
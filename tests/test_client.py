@@ -1,9 +1,12 @@
 import os
 import pytest
 
+from peertube_uploader.cache import DiskCache
 from peertube_uploader.client import PeerTubeClient
 from peertube_uploader.config import Config
 
+from .peertube_stub import PeerTubeStub, StubConfig
+
 class DummyConfig:
     """Minimal dummy config for testing PeerTubeClient."""
     def __init__(self):
@@ -23,4 +26,26 @@ def test_upload_video_file_not_found(tmp_path, monkeypatch):
     monkeypatch.setattr(client.token_manager, 'get_valid_token', lambda: 'dummy-token')
     non_existing = tmp_path / "no_video.mp4"
     with pytest.raises(FileNotFoundError):
-        client.upload_video(str(non_existing), "Title", "Desc", channel_id="123")
\ No newline at end of file
+        client.upload_video(str(non_existing), "Title", "Desc", channel_id="123")
+
+def test_channel_id_is_cached_and_selectable(tmp_path):
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"data")
+    with PeerTubeStub() as stub:
+        client = PeerTubeClient(StubConfig(stub.url))
+        for _ in range(3):
+            client.upload_video(str(video), "Title")
+        assert client.get_channel_id() == 7
+        assert client.get_channel_id("courses_fr") == 8
+        assert client.get_channel_id("@Courses_FR@127.0.0.1") == 8
+        assert client.get_channel_id("Cours") == 8
+        with pytest.raises(ValueError):
+            client.get_channel_id("missing")
+        assert stub.count("GET", "/api/v1/users/me") == 1
+
+def test_profile_disk_cache_shared_between_clients(tmp_path):
+    cache = DiskCache(str(tmp_path / "profiles"))
+    with PeerTubeStub() as stub:
+        PeerTubeClient(StubConfig(stub.url), profile_cache=cache).get_channel_id()
+        PeerTubeClient(StubConfig(stub.url), profile_cache=cache).get_channel_id()
+        assert stub.count("GET", "/api/v1/users/me") == 1
@@ -36,4 +36,13 @@ def test_config_missing(monkeypatch):
     with pytest.raises(ValueError) as excinfo:
         Config()
     msg = str(excinfo.value)
-    assert "Missing required environment variables" in msg
\ No newline at end of file
+    assert "Missing required environment variables" in msg
+
+def test_config_max_upload_rate(monkeypatch):
+    for name in ("UPLOAD_URL", "PEERTUBE_INSTANCE", "CLIENT_ID", "CLIENT_SECRET", "USERNAME", "PASSWORD"):
+        monkeypatch.setenv(name, "x")
+    monkeypatch.setenv("PATH_TO_COURSES", "/courses")
+    monkeypatch.delenv("MAX_UPLOAD_RATE", raising=False)
+    assert Config().max_bandwidth is None
+    monkeypatch.setenv("MAX_UPLOAD_RATE", "'20M'")
+    assert Config().max_bandwidth == 20 * 1024 * 1024
@@ -0,0 +1,75 @@
+import os
+import textwrap
+
+import pytest
+
+from peertube_uploader.course_index import CourseIndex
+
+COURSE_MD = textwrap.dedent('''
+    +++
+    # FrontMatter
+    +++
+    # Part 1
+    ## Intro
+    ## Setup
+    # Part 2
+    ## Basics
+''')
+
+@pytest.fixture
+def courses(tmp_path):
+    course_dir = tmp_path / "courses" / "btc101"
+    course_dir.mkdir(parents=True)
+    (course_dir / "en.md").write_text(COURSE_MD, encoding="utf-8")
+    (course_dir / "fr.md").write_text(COURSE_MD.replace("Intro", "Intro FR"), encoding="utf-8")
+    return tmp_path / "courses"
+
+def test_course_index_parses_each_file_once(courses, monkeypatch):
+    import peertube_uploader.course_index as course_index
+
+    parsed = []
+    real_parse = course_index.parse_course_markdown
+    monkeypatch.setattr(course_index, "parse_course_markdown", lambda p: parsed.append(p) or real_parse(p))
+
+    index = CourseIndex(str(courses))
+    titles = index.resolve_titles([
+        "/videos/btc101_1.1_en.mp4",
+        "/videos/btc101_1.2_en.mp4",
+        "/videos/btc101_2.1_en.mp4",
+        "/videos/btc101_1.1_fr.mp4",
+        "/videos/btc101_3.1_en.mp4",
+        "/videos/xyz999_1.1_en.mp4",
+    ])
+    assert titles == {
+        "/videos/btc101_1.1_en.mp4": "Intro",
+        "/videos/btc101_1.2_en.mp4": "Setup",
+        "/videos/btc101_2.1_en.mp4": "Basics",
+        "/videos/btc101_1.1_fr.mp4": "Intro FR",
+        "/videos/btc101_3.1_en.mp4": None,
+        "/videos/xyz999_1.1_en.mp4": None,
+    }
+    assert len(parsed) == 2
+    with pytest.raises(ValueError):
+        index.get_chapter_name("btc101", (2, 2), "en")
+
+    # Editing a file invalidates only that file
+    en_md = courses / "btc101" / "en.md"
+    en_md.write_text(COURSE_MD.replace("Basics", "Basics v2"), encoding="utf-8")
+    os.utime(en_md, ns=(1, 1))
+    assert index.get_chapter_name("btc101", (2, 1), "en") == "Basics v2"
+    assert len(parsed) == 3
+
+def test_course_index_persists_to_disk(courses, tmp_path, monkeypatch):
+    import peertube_uploader.course_index as course_index
+
+    cache_path = str(tmp_path / "course_index.json")
+    index = CourseIndex(str(courses), cache_path=cache_path)
+    index.get_chapter_name("btc101", (1, 2), "en")
+    index.save()
+
+    def fail(path):
+        raise AssertionError(f"{path} parsed again")
+
+    monkeypatch.setattr(course_index, "parse_course_markdown", fail)
+    reloaded = CourseIndex(str(courses), cache_path=cache_path)
+    assert reloaded.get_chapter_name("btc101", (1, 2), "en") == "Setup"
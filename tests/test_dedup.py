@@ -0,0 +1,63 @@
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+from peertube_uploader.dedup import Deduplicator
+from peertube_uploader.finder import scan_mp4_files
+from peertube_uploader.fingerprint import full_hash
+
+class CountingExecutor(ThreadPoolExecutor):
+    def __init__(self):
+        super().__init__(max_workers=2)
+        self.calls = []
+
+    def submit(self, fn, *args):
+        self.calls.append((fn.__name__, args[0]))
+        return super().submit(fn, *args)
+
+def _tree(tmp_path):
+    intro = b"i" * 200_000
+    for lang in ("en", "fr", "es"):
+        (tmp_path / lang).mkdir()
+        (tmp_path / lang / "intro.mp4").write_bytes(intro)
+    # Same size and same head/tail as the intro, different middle
+    (tmp_path / "en" / "trap.mp4").write_bytes(b"i" * 100_000 + b"x" + b"i" * 99_999)
+    # Same size, different head
+    (tmp_path / "en" / "other.mp4").write_bytes(b"o" * 200_000)
+    (tmp_path / "en" / "unique.mp4").write_bytes(b"u" * 10)
+
+def test_full_hash_matches_hashlib(tmp_path):
+    data = b"abc" * 100_000
+    path = tmp_path / "v.mp4"
+    path.write_bytes(data)
+    assert full_hash(str(path), chunk_size=4096) == hashlib.blake2b(data, digest_size=32).hexdigest()
+    empty = tmp_path / "empty.mp4"
+    empty.write_bytes(b"")
+    assert full_hash(str(empty)) == hashlib.blake2b(b"", digest_size=32).hexdigest()
+
+def test_duplicates_are_dropped_in_stages(tmp_path):
+    _tree(tmp_path)
+    executor = CountingExecutor()
+    dedup = Deduplicator(executor=executor)
+    entries = sorted(scan_mp4_files(str(tmp_path)), key=lambda e: e.path)
+    kept = [e.path for e in dedup.unique(entries)]
+    executor.shutdown()
+
+    en, es, fr = (str(tmp_path / lang / "intro.mp4") for lang in ("en", "es", "fr"))
+    assert sorted(kept) == sorted([
+        en, str(tmp_path / "en" / "trap.mp4"),
+        str(tmp_path / "en" / "other.mp4"), str(tmp_path / "en" / "unique.mp4"),
+    ])
+    assert dedup.duplicates == {en: [es, fr]}
+    assert dedup.duplicate_count == 2
+    hashed = {(name, path.rsplit("/", 2)[-2] + "/" + path.rsplit("/", 1)[1]) for name, path in executor.calls}
+    # The unique size is never read; "other" differs at the head and is not fully hashed
+    assert not any(path.endswith("unique.mp4") for _, path in hashed)
+    assert ("full_hash", "en/other.mp4") not in hashed
+    assert ("full_hash", "en/trap.mp4") in hashed
+
+def test_process_pool(tmp_path):
+    _tree(tmp_path)
+    dedup = Deduplicator(workers=2)
+    kept = list(dedup.unique(scan_mp4_files(str(tmp_path))))
+    assert len(kept) == 4
+    assert dedup.duplicate_count == 2
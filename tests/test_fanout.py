@@ -0,0 +1,134 @@
+import os
+import threading
+import time
+
+import pytest
+
+from peertube_uploader.client import PeerTubeClient
+from peertube_uploader.config import Config
+from peertube_uploader.fanout import BufferRing, FanoutTarget, FanoutUploader
+from peertube_uploader.session import HttpSession, RetryPolicy
+
+from .peertube_stub import PeerTubeStub, StubConfig
+
+def read_all(reader, size, chunk, delay=0.0, first_delay=0.0):
+    parts = []
+    offset = 0
+    while offset < size:
+        data = reader.read(offset, chunk)
+        parts.append(data)
+        offset += len(data)
+        time.sleep(first_delay if offset == len(data) else delay)
+    reader.close()
+    return b"".join(parts)
+
+def test_ring_reads_file_once_for_all_consumers(tmp_path):
+    path = tmp_path / "v.mp4"
+    payload = os.urandom(100_000)
+    path.write_bytes(payload)
+    ring = BufferRing(str(path), consumers=3, chunk_size=8192, slots=2).start()
+    results = [None] * 3
+
+    def consume(i):
+        results[i] = read_all(ring.readers[i], len(payload), 8192)
+
+    threads = [threading.Thread(target=consume, args=(i,)) for i in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == [payload] * 3
+    assert ring.bytes_read == len(payload)
+    assert [r.disk_bytes for r in ring.readers] == [0, 0, 0]
+
+def test_lagging_consumer_is_detached_instead_of_stalling(tmp_path):
+    path = tmp_path / "v.mp4"
+    payload = os.urandom(80_000)
+    path.write_bytes(payload)
+    ring = BufferRing(str(path), consumers=2, chunk_size=8192, slots=2, stall_timeout=0.05).start()
+    done = {}
+
+    def consume(i, first_delay):
+        data = read_all(ring.readers[i], len(payload), 8192, first_delay=first_delay)
+        done[i] = (data, time.monotonic())
+
+    start = time.monotonic()
+    threads = [
+        threading.Thread(target=consume, args=(0, 0.0)),
+        threading.Thread(target=consume, args=(1, 0.5)),
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert done[0][0] == payload and done[1][0] == payload
+    # The fast reader waited for at most a few stall timeouts, not the slow one
+    assert done[0][1] - start < 0.3
+    assert ring.readers[1].detached
+    assert ring.readers[1].disk_bytes > 0
+    assert ring.bytes_read == len(payload)
+
+def test_fanout_uploads_to_every_instance(tmp_path):
+    path = tmp_path / "btc101_1.1_en.mp4"
+    payload = os.urandom(300_000)
+    path.write_bytes(payload)
+    with PeerTubeStub() as fast, PeerTubeStub() as slow, PeerTubeStub() as broken:
+        slow.latency = 0.02
+        fast.disconnects = 1
+        broken.errors = [500] * 10
+        targets = [
+            FanoutTarget(name, PeerTubeClient(
+                StubConfig(stub.url), session=HttpSession(retry=RetryPolicy(max_retries=1, backoff_factor=0.01))
+            ), 7)
+            for name, stub in (("fast", fast), ("slow", slow), ("broken", broken))
+        ]
+        uploader = FanoutUploader(targets, chunk_size=32_768, slots=4, state_dir=str(tmp_path / "state"))
+        results = uploader.upload(str(path), "Title")
+
+        assert results["fast"].ok and results["slow"].ok
+        assert not results["broken"].ok
+        for stub in (fast, slow):
+            session = next(iter(stub.sessions.values()))
+            assert bytes(session["data"]) == payload
+            assert stub.videos[0]["meta"]["channelId"] == 7
+    assert uploader.bytes_read == len(payload)
+
+def test_empty_file_ends_the_ring_and_fails_the_upload(tmp_path):
+    path = tmp_path / "empty.mp4"
+    path.write_bytes(b"")
+    ring = BufferRing(str(path), consumers=2, chunk_size=8192).start()
+    assert [reader.read(0, 8192) for reader in ring.readers] == [b"", b""]
+    ring.close()
+
+    with PeerTubeStub() as stub:
+        targets = [FanoutTarget("a", PeerTubeClient(StubConfig(stub.url)), 7)]
+        uploader = FanoutUploader(targets, state_dir=str(tmp_path / "state"))
+        result = uploader.upload(str(path), "Title")["a"]
+        assert isinstance(result.error, ValueError)
+        assert stub.count("POST", "/api/v1/videos/upload-resumable") == 0
+
+def test_config_from_env_file(tmp_path, monkeypatch):
+    profile = tmp_path / "mirror.env"
+    profile.write_text(
+        "UPLOAD_URL=https://mirror/\nPEERTUBE_INSTANCE=https://mirror\nCLIENT_ID=id\n"
+        "CLIENT_SECRET=s\nUSERNAME=u\nPASSWORD='p w'\nPEERTUBE_CHANNEL=courses\n",
+        encoding="utf-8",
+    )
+    monkeypatch.setenv("UPLOAD_URL", "https://main")
+    monkeypatch.setenv("PATH_TO_COURSES", str(tmp_path))
+    monkeypatch.setenv("MAX_UPLOAD_RATE", "1M")
+    config = Config.from_env_file(str(profile))
+    assert config.upload_url == "https://mirror"
+    assert config.password == "p w"
+    assert config.channel == "courses"
+    assert config.course_path == str(tmp_path)
+    # Only the shared keys come from the environment
+    assert config.max_bandwidth is None
+
+def test_config_from_env_file_does_not_inherit_credentials(tmp_path, monkeypatch):
+    profile = tmp_path / "mirror.env"
+    profile.write_text("UPLOAD_URL=https://mirror\nPEERTUBE_INSTANCE=https://mirror\n", encoding="utf-8")
+    for name in ("CLIENT_ID", "CLIENT_SECRET", "USERNAME", "PASSWORD"):
+        monkeypatch.setenv(name, "main")
+    with pytest.raises(ValueError, match="CLIENT_ID"):
+        Config.from_env_file(str(profile))
@@ -22,4 +22,57 @@ def test_find_mp4_files(tmp_path):
     assert str(file2) in results
     # No non-mp4 files
     assert all(path.lower().endswith('.mp4') for path in results)
-    assert len(results) == 2
\ No newline at end of file
+    assert len(results) == 2
+
+def test_scan_index_reuses_unchanged_directories(tmp_path, monkeypatch):
+    from peertube_uploader.finder import ScanIndex, scan_mp4_files
+
+    index_path = tmp_path / "index.json"
+    tmp_path = tmp_path / "videos"
+    for course in ("btc101", "cyp201"):
+        (tmp_path / course).mkdir(parents=True)
+        (tmp_path / course / f"{course}_1.1_en.mp4").write_bytes(b"1234")
+
+    index = ScanIndex(str(index_path))
+    cold = sorted(scan_mp4_files(str(tmp_path), index))
+    index.save()
+    assert [e.size for e in cold] == [4, 4]
+
+    listed = []
+    real_scandir = os.scandir
+    monkeypatch.setattr(os, "scandir", lambda d: listed.append(d) or real_scandir(d))
+    (tmp_path / "cyp201" / "cyp201_1.2_en.mp4").write_bytes(b"")
+    os.utime(tmp_path / "cyp201", ns=(1, 1))
+
+    warm = sorted(scan_mp4_files(str(tmp_path), ScanIndex(str(index_path))))
+    # Only the directory whose mtime changed is listed again
+    assert listed == [str(tmp_path / "cyp201")]
+    assert [os.path.basename(e.path) for e in warm] == [
+        "btc101_1.1_en.mp4", "cyp201_1.1_en.mp4", "cyp201_1.2_en.mp4",
+    ]
+
+def test_warm_scan_stats_directories_only(tmp_path, monkeypatch):
+    from peertube_uploader import finder
+    from peertube_uploader.finder import ScanIndex, scan_mp4_files
+
+    index = ScanIndex(str(tmp_path / "index.json"))
+    videos = tmp_path / "videos"
+    (videos / "btc101").mkdir(parents=True)
+    path = videos / "btc101" / "btc101_1.1_en.mp4"
+    path.write_bytes(b"x" * 10)
+    (videos / "btc101" / "btc101_1.2_en.mp4").write_bytes(b"x")
+    assert sorted(e.size for e in scan_mp4_files(str(videos), index)) == [1, 10]
+    mtime_ns = os.stat(videos / "btc101").st_mtime_ns
+    # Rewritten in place: the directory mtime does not change
+    path.write_bytes(b"x" * 20)
+    os.utime(videos / "btc101", ns=(mtime_ns, mtime_ns))
+
+    stats = []
+    real_stat = os.stat
+    monkeypatch.setattr(finder.os, "stat", lambda p, *a, **kw: stats.append(p) or real_stat(p, *a, **kw))
+    warm = list(scan_mp4_files(str(videos), index))
+    monkeypatch.undo()
+    assert sorted(stats) == [str(videos), str(videos / "btc101")]
+    # The cached listing keeps the old size; a scan without the index sees the new one
+    assert sorted(e.size for e in warm) == [1, 10]
+    assert sorted(e.size for e in scan_mp4_files(str(videos))) == [1, 20]
@@ -0,0 +1,188 @@
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from peertube_uploader.client import PeerTubeClient
+from peertube_uploader.coordinator import JobServer
+from peertube_uploader.jobqueue import HttpJobQueue, JobQueue, QueueWorker, SQLiteJobQueue, open_job_queue
+
+from .peertube_stub import PeerTubeStub, StubConfig
+
+def make_files(root, count):
+    paths = []
+    for i in range(count):
+        path = root / f"btc101_1.{i}_en.mp4"
+        path.write_bytes(os.urandom(2000))
+        paths.append((str(path), 2000))
+    return paths
+
+def test_claims_are_exclusive_and_completed_once(tmp_path):
+    queue = SQLiteJobQueue(str(tmp_path / "q.sqlite"))
+    files = make_files(tmp_path, 2)
+    assert queue.add(str(tmp_path), files) == 2
+    assert queue.add(str(tmp_path), files) == 0
+    # A second connection, as another process would have
+    other = SQLiteJobQueue(str(tmp_path / "q.sqlite"))
+    first = queue.claim("a")
+    second = other.claim("b")
+    assert {first.path, second.path} == {"btc101_1.0_en.mp4", "btc101_1.1_en.mp4"}
+    assert other.claim("b") is None
+    assert queue.complete(first.token, {"uuid": "u1"})
+    # Retried completions are accepted, not recorded twice
+    assert other.complete(first.token, {"uuid": "u1"})
+    assert queue.counts() == {"pending": 0, "claimed": 1, "done": 1, "failed": 0}
+    assert other.root() == str(tmp_path)
+    with pytest.raises(ValueError):
+        queue.add("/elsewhere", [("/elsewhere/x.mp4", 1)])
+
+def test_expired_lease_is_reclaimed_and_stale_claim_rejected(tmp_path):
+    queue = SQLiteJobQueue(str(tmp_path / "q.sqlite"))
+    queue.add(str(tmp_path), make_files(tmp_path, 1))
+    stale = queue.claim("crashed", lease=0.5)
+    assert queue.claim("b") is None
+    time.sleep(0.6)
+    fresh = queue.claim("b")
+    assert fresh.id == stale.id and fresh.attempts == 2
+    assert not queue.heartbeat(stale.token)
+    assert not queue.complete(stale.token)
+    assert queue.heartbeat(fresh.token)
+    assert queue.complete(fresh.token)
+    assert queue.jobs("done")[0]["worker"] == "b"
+
+def test_worker_retries_failures_up_to_max_attempts(tmp_path):
+    queue = SQLiteJobQueue(str(tmp_path / "q.sqlite"))
+    queue.add(str(tmp_path), make_files(tmp_path, 2))
+    calls = []
+
+    def upload(job):
+        calls.append(job.path)
+        if job.path == "btc101_1.1_en.mp4":
+            raise IOError("boom")
+        return {"uuid": job.path}
+
+    results = QueueWorker(queue, upload, jobs=2, max_attempts=2, poll_interval=0.01).run()
+    assert calls.count("btc101_1.1_en.mp4") == 2
+    assert queue.counts() == {"pending": 0, "claimed": 0, "done": 1, "failed": 1}
+    assert queue.jobs("failed")[0]["error"] == "boom"
+    assert sum(1 for r in results if r.ok) == 1
+
+def worker_process(spec, url, crash_after, barrier, token=None):
+    """
+    One simulated node: uploads to the stub, and with ``crash_after`` dies
+    (without releasing its claims) when it claims one more job than that.
+    """
+    queue = open_job_queue(spec, token)
+    client = PeerTubeClient(StubConfig(url))
+    root = queue.root()
+    claimed = []
+
+    def upload(job):
+        claimed.append(job.id)
+        if crash_after is not None and len(claimed) > crash_after:
+            os._exit(3)
+        return client.upload_video(os.path.join(root, job.path), job.path)
+
+    barrier.wait()
+    # A crashing node runs one upload at a time, so it never dies mid-upload
+    jobs = 2 if crash_after is None else 1
+    QueueWorker(queue, upload, jobs=jobs, lease=3.0, poll_interval=0.2).run()
+
+@pytest.mark.parametrize("backend", ["sqlite", "http"])
+def test_nodes_share_a_batch_and_take_over_from_crashed_ones(tmp_path, backend):
+    videos = tmp_path / "videos"
+    videos.mkdir()
+    files = make_files(videos, 24)
+    db = SQLiteJobQueue(str(tmp_path / "q.sqlite"))
+    db.add(str(videos), files)
+    ctx = multiprocessing.get_context("spawn")
+    with PeerTubeStub() as stub, JobServer(db) as server:
+        stub.latency = 0.1
+        spec = server.url if backend == "http" else db.path
+        # Two nodes crash while holding claims; the others must take them over
+        crashes = [None, None, 0, 1]
+        barrier = ctx.Barrier(len(crashes))
+        procs = [ctx.Process(target=worker_process, args=(spec, stub.url, c, barrier, server.token)) for c in crashes]
+        for proc in procs:
+            proc.start()
+        for proc in procs:
+            proc.join(timeout=60)
+        assert [p.exitcode for p in procs] == [0, 0, 3, 3]
+
+        assert db.counts() == {"pending": 0, "claimed": 0, "done": 24, "failed": 0}
+        names = sorted(video["meta"]["name"] for video in stub.videos)
+        # Every file uploaded exactly once: crashes happen before uploading
+        assert names == sorted(os.path.basename(path) for path, _ in files)
+        reclaimed = [job for job in db.jobs("done") if job["attempts"] > 1]
+        assert len(reclaimed) == 2
+
+def test_http_queue_reports_errors(tmp_path):
+    db = SQLiteJobQueue(str(tmp_path / "q.sqlite"))
+    db.add(str(tmp_path), [])
+    with JobServer(db, token="secret") as server:
+        queue = HttpJobQueue(server.url, token="secret")
+        with pytest.raises(Exception, match="outside the queue root"):
+            queue.add("/elsewhere", [("/elsewhere/x.mp4", 1)])
+        assert queue.counts()["pending"] == 0
+        assert queue.claim("a") is None
+
+def test_coordinator_refuses_requests_without_the_token(tmp_path):
+    db = SQLiteJobQueue(str(tmp_path / "q.sqlite"))
+    db.add(str(tmp_path), make_files(tmp_path, 1))
+    with JobServer(db) as server:
+        for token in (None, "wrong"):
+            with pytest.raises(Exception, match="401 missing or wrong queue token"):
+                HttpJobQueue(server.url, token=token).claim("intruder")
+        assert db.counts()["pending"] == 1
+        assert HttpJobQueue(server.url, token=server.token).claim("a") is not None
+
+def test_job_queue_is_abstract():
+    with pytest.raises(TypeError):
+        JobQueue()
+
+def test_abandoned_job_on_its_last_attempt_is_failed(tmp_path):
+    queue = SQLiteJobQueue(str(tmp_path / "q.sqlite"))
+    queue.add(str(tmp_path), make_files(tmp_path, 1))
+    # A file that kills its worker every time
+    for _ in range(2):
+        assert queue.claim("crashing", lease=0.2, max_attempts=2) is not None
+        time.sleep(0.3)
+    assert queue.claim("b", max_attempts=2) is None
+    assert queue.counts() == {"pending": 0, "claimed": 0, "done": 0, "failed": 1}
+    assert "lease expired" in queue.jobs("failed")[0]["error"]
+
+class FlakyQueue:
+    """
+    Wraps a queue so its first calls to some methods raise.
+    """
+    def __init__(self, queue, **failures):
+        self.queue = queue
+        self.failures = failures
+
+    def __getattr__(self, name):
+        method = getattr(self.queue, name)
+
+        def call(*args, **kwargs):
+            if self.failures.get(name):
+                self.failures[name] -= 1
+                raise IOError(f"{name} unavailable")
+            return method(*args, **kwargs)
+        return call
+
+def test_worker_survives_queue_errors(tmp_path):
+    db = SQLiteJobQueue(str(tmp_path / "q.sqlite"))
+    db.add(str(tmp_path), make_files(tmp_path, 3))
+    queue = FlakyQueue(db, claim=2, complete=1)
+    errors = []
+    worker = QueueWorker(
+        queue, lambda job: {"uuid": job.path}, lease=0.5, poll_interval=0.05,
+        on_queue_error=errors.append,
+    )
+    results = worker.run()
+    assert [str(e) for e in errors] == ["claim unavailable"] * 2
+    unsaved = [r for r in results if r.queue_error is not None]
+    assert len(unsaved) == 1 and not unsaved[0].recorded
+    # The job whose completion was lost is claimed again after its lease
+    assert db.counts() == {"pending": 0, "claimed": 0, "done": 3, "failed": 0}
+    assert len(results) == 4
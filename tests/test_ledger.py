@@ -0,0 +1,40 @@
+import os
+
+from peertube_uploader.fingerprint import file_fingerprint, partial_hash
+from peertube_uploader.ledger import UploadLedger
+
+def test_fingerprint_tracks_content_size_and_mtime(tmp_path):
+    path = tmp_path / "video.mp4"
+    path.write_bytes(b"a" * 200_000)
+    first = file_fingerprint(str(path))
+    assert file_fingerprint(str(path)) == first
+    os.utime(path, ns=(0, 0))
+    assert file_fingerprint(str(path)) != first
+
+    other = tmp_path / "other.mp4"
+    other.write_bytes(b"a" * 199_999 + b"b")
+    assert partial_hash(str(other)) != partial_hash(str(path))
+
+def test_ledger_persists_and_is_keyed_by_instance(tmp_path):
+    ledger_path = tmp_path / "ledger.jsonl"
+    ledger = UploadLedger(str(ledger_path))
+    ledger.record("https://a", "fp1", "/videos/x.mp4", "uuid-1", "https://a/w/1")
+    # Simulate a crash that left a truncated line behind
+    with open(ledger_path, "a", encoding="utf-8") as f:
+        f.write('{"instance": "https://a", "finger')
+
+    reopened = UploadLedger(str(ledger_path))
+    assert len(reopened) == 1
+    assert reopened.get("https://a", "fp1")["uuid"] == "uuid-1"
+    assert reopened.get("https://b", "fp1") is None
+    assert reopened.get("https://a", "fp2") is None
+    reopened.record("https://a", "fp2", "/videos/y.mp4", "uuid-2", "https://a/w/2")
+    assert UploadLedger(str(ledger_path)).get("https://a", "fp2")["uuid"] == "uuid-2"
+
+def test_ledger_entries_lists_one_instance_oldest_first(tmp_path):
+    ledger = UploadLedger(str(tmp_path / "ledger.jsonl"))
+    ledger.record("https://a", "fp1", "/videos/x.mp4", "uuid-1", None)
+    ledger.record("https://b", "fp2", "/videos/y.mp4", "uuid-2", None)
+    ledger.record("https://a", "fp3", "/videos/z.mp4", "uuid-3", None)
+    assert [e["uuid"] for e in ledger.entries("https://a")] == ["uuid-1", "uuid-3"]
+    assert ledger.entries("https://c") == []
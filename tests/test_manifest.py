@@ -0,0 +1,53 @@
+import textwrap
+
+import pytest
+
+from peertube_uploader.course_index import CourseIndex
+from peertube_uploader.finder import scan_mp4_files
+from peertube_uploader.manifest import parse_line_range, plan_entries, read_manifest, write_manifest
+
+COURSE_MD = textwrap.dedent('''
+    +++
+    title = "BTC 101"
+    +++
+    # Part 1
+    ## Intro
+    # Part 2
+    ## Keys
+''')
+
+def test_parse_line_range():
+    assert parse_line_range("1-5000") == (1, 5000)
+    assert parse_line_range("5001-") == (5001, None)
+    assert parse_line_range("42") == (42, 42)
+    for bad in ("0-3", "5-2", "a-b", ""):
+        with pytest.raises(ValueError):
+            parse_line_range(bad)
+
+def test_plan_write_and_read_ranges(tmp_path):
+    courses = tmp_path / "courses" / "btc101"
+    courses.mkdir(parents=True)
+    (courses / "en.md").write_text(COURSE_MD, encoding="utf-8")
+    videos = tmp_path / "videos"
+    videos.mkdir()
+    for name in ("btc101_1.1_en.mp4", "btc101_2.1_en.mp4", "intro.mp4"):
+        (videos / name).write_bytes(b"data")
+
+    entries = sorted(scan_mp4_files(str(videos)), key=lambda e: e.path)
+    records = plan_entries(entries, channel_id=7, course_index=CourseIndex(str(tmp_path / "courses")))
+    manifest = tmp_path / "plan" / "manifest.jsonl"
+    assert write_manifest(str(manifest), records) == 3
+
+    rows = list(read_manifest(str(manifest)))
+    assert [line for line, _ in rows] == [1, 2, 3]
+    first = rows[0][1]
+    assert first["title"] == "btc101_1.1_en"
+    assert first["channel_id"] == 7
+    assert (first["course"], first["part"], first["chapter"], first["lang"]) == ("btc101", 1, 1, "en")
+    assert first["chapter_title"] == "Intro"
+    assert rows[1][1]["chapter_title"] == "Keys"
+    assert rows[2][1]["chapter_title"] is None
+    assert first["size"] == 4
+
+    assert [line for line, _ in read_manifest(str(manifest), 2, 2)] == [2]
+    assert [line for line, _ in read_manifest(str(manifest), 2)] == [2, 3]
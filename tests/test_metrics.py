@@ -0,0 +1,89 @@
+import csv
+import json
+
+import pytest
+
+from peertube_uploader.client import PeerTubeClient
+from peertube_uploader.metrics import MetricsRecorder, format_progress
+from peertube_uploader.resumable import ResumableStateStore
+
+from .peertube_stub import PeerTubeStub, StubConfig
+
+def test_upload_records_bytes_and_phases(tmp_path):
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"x" * 300_000)
+    metrics = MetricsRecorder()
+    with PeerTubeStub() as stub:
+        client = PeerTubeClient(StubConfig(stub.url), metrics=metrics)
+        with metrics.track(str(video), 300_000) as record:
+            client.upload_video(str(video), "Title")
+    assert record.status == "ok"
+    assert record.bytes_sent == 300_000
+    for phase in ("token", "token_refresh", "channel_lookup", "connect", "body_send", "response_wait"):
+        assert phase in record.phases
+    assert record.ttfb is not None
+    assert metrics.aggregate()["bytes_sent"] == 300_000
+
+def test_resumable_upload_counts_chunks(tmp_path):
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"y" * 5000)
+    metrics = MetricsRecorder()
+    with PeerTubeStub() as stub:
+        client = PeerTubeClient(StubConfig(stub.url), metrics=metrics)
+        with metrics.track(str(video), 5000) as record:
+            client.upload_video_resumable(
+                str(video), "Title", chunk_size=1024,
+                state_store=ResumableStateStore(str(tmp_path / "state")),
+            )
+    assert record.bytes_sent == 5000
+    assert record.phases["body_send"] > 0
+
+def test_resumable_upload_counts_acknowledged_bytes_only(tmp_path):
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"y" * 5000)
+    metrics = MetricsRecorder()
+    with PeerTubeStub() as stub:
+        stub.accept_chunks = False
+        client = PeerTubeClient(StubConfig(stub.url), metrics=metrics)
+        with pytest.raises(Exception, match="stopped accepting data"):
+            with metrics.track(str(video), 5000) as record:
+                client.upload_video_resumable(
+                    str(video), "Title", chunk_size=1024, max_retries=1,
+                    state_store=ResumableStateStore(str(tmp_path / "state")),
+                )
+    assert record.bytes_sent == 0
+
+def test_failed_upload_is_recorded(tmp_path):
+    metrics = MetricsRecorder()
+    with pytest.raises(FileNotFoundError):
+        with metrics.track("missing.mp4", 10):
+            raise FileNotFoundError("missing.mp4")
+    assert metrics.records[0].status == "failed"
+    assert metrics.aggregate()["files_done"] == 1
+
+def test_write_report_json_and_csv(tmp_path):
+    metrics = MetricsRecorder()
+    metrics.queued(100)
+    with metrics.track("a.mp4", 100) as record:
+        metrics.bytes_sent(100)
+        record.extra["duration"] = 12.5
+    json_path = tmp_path / "metrics.json"
+    metrics.write_report(str(json_path))
+    data = json.loads(json_path.read_text())
+    assert data["files"][0]["bytes_sent"] == 100
+    assert data["files"][0]["duration"] == 12.5
+    assert data["summary"]["files_done"] == 1
+
+    csv_path = tmp_path / "metrics.csv"
+    metrics.write_report(str(csv_path))
+    with open(csv_path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert rows[0]["path"] == "a.mp4"
+    assert rows[0]["status"] == "ok"
+
+def test_format_progress():
+    stats = {
+        "files_done": 1, "files_started": 2, "bytes_sent": 5_000_000,
+        "bytes_per_s": 2_500_000, "eta_s": 75.0,
+    }
+    assert format_progress(stats) == "1/2 files, 5.0 MB sent, 2.50 MB/s, ETA 1m15s"
@@ -0,0 +1,41 @@
+import os
+
+from peertube_uploader.client import PeerTubeClient
+from peertube_uploader.multipart import MultipartEncoder
+
+from .peertube_stub import PeerTubeStub, StubConfig
+
+def test_multipart_encoder_length_and_reuse(tmp_path):
+    path = tmp_path / "video.mp4"
+    path.write_bytes(os.urandom(10_000))
+    encoder = MultipartEncoder({"name": "Title", "privacy": 1}, "videofile", str(path), buffer_size=4096)
+    body = b"".join(bytes(piece) for piece in encoder)
+    assert len(body) == len(encoder)
+    assert path.read_bytes() in body
+    # Iterating again produces the same body, so requests can be retried
+    assert b"".join(bytes(piece) for piece in encoder) == body
+
+def test_multipart_encoder_escapes_filename(tmp_path):
+    path = tmp_path / "video.mp4"
+    path.write_bytes(b"x")
+    name = 'a"b\r\nContent-Type: text/html.mp4'
+    encoder = MultipartEncoder({}, "videofile", str(path), filename=name)
+    assert (
+        b'Content-Disposition: form-data; name="videofile"; '
+        b'filename="a%22b%0D%0AContent-Type: text/html.mp4"\r\n'
+        b"Content-Type: video/mp4\r\n\r\n"
+    ) in encoder.head
+    assert len(b"".join(bytes(piece) for piece in encoder)) == len(encoder)
+
+def test_upload_video_streams_multipart(tmp_path):
+    path = tmp_path / "btc101_1.1_en.mp4"
+    content = os.urandom(50_000)
+    path.write_bytes(content)
+    with PeerTubeStub() as stub:
+        client = PeerTubeClient(StubConfig(stub.url))
+        result = client.upload_video(str(path), "Title", "Desc", channel_id=7)
+        form = stub.videos[0]["meta"]
+    assert result["video"]["id"] == 1
+    assert form["videofile"] == content
+    assert form["name"] == "Title"
+    assert form["channelId"] == "7"
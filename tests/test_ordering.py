@@ -0,0 +1,43 @@
+import pytest
+
+from peertube_uploader.finder import ScanEntry
+from peertube_uploader.ordering import makespans, order_entries, simulate_makespan
+
+ENTRIES = [
+    ScanEntry("/v/cyp201_1.2_en.mp4", 300, 5),
+    ScanEntry("/v/btc101_2.1_en.mp4", 100, 9),
+    ScanEntry("/v/btc101_1.3_en.mp4", 900, 1),
+    ScanEntry("/v/intro.mp4", 50, 7),
+]
+
+def _names(entries):
+    return [e.path.rsplit("/", 1)[1] for e in entries]
+
+def test_scan_order_is_kept():
+    assert list(order_entries(iter(ENTRIES))) == ENTRIES
+
+def test_largest_and_newest_first():
+    assert [e.size for e in order_entries(ENTRIES, "largest-first")] == [900, 300, 100, 50]
+    assert [e.mtime_ns for e in order_entries(ENTRIES, "newest-first")] == [9, 7, 5, 1]
+
+def test_course_priority():
+    ordered = order_entries(ENTRIES, "course", ["CYP201"])
+    assert _names(ordered) == [
+        "cyp201_1.2_en.mp4", "intro.mp4", "btc101_1.3_en.mp4", "btc101_2.1_en.mp4",
+    ]
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        list(order_entries(ENTRIES, "random"))
+
+def test_simulate_makespan():
+    assert simulate_makespan([1, 1, 1, 1], jobs=2) == 2
+    # A big task scheduled last stretches the run; LPT order avoids it
+    assert simulate_makespan([1, 1, 1, 1, 4], jobs=2) == 6
+    assert simulate_makespan([4, 1, 1, 1, 1], jobs=2) == 4
+
+def test_largest_first_minimizes_makespan():
+    entries = [ScanEntry(f"/v/{i}.mp4", size, i) for i, size in enumerate([1, 1, 1, 1, 4])]
+    results = makespans(entries, jobs=2, bandwidth=1)
+    assert results["largest-first"] == 4
+    assert results["scan"] == 6
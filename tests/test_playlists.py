@@ -0,0 +1,78 @@
+import os
+
+from peertube_uploader.client import PeerTubeClient
+from peertube_uploader.playlists import PlaylistBuilder, group_by_course
+
+from .peertube_stub import PeerTubeStub, StubConfig
+
+def upload(client, tmp_path, name):
+    path = tmp_path / name
+    path.write_bytes(os.urandom(100))
+    response = client.upload_video(str(path), name, channel_id=7)
+    return str(path), response["video"]["uuid"]
+
+def test_group_by_course_orders_by_part_and_chapter():
+    videos = [
+        ("/v/btc101_2.1_en.mp4", "a"),
+        ("/v/btc101_1.10_en.mp4", "b"),
+        ("/v/btc101_1.2_en.mp4", "c"),
+        ("/v/btc101_1.2_fr.mp4", "d"),
+        ("/v/notes.mp4", "e"),
+        ("/v/btc101_1.1_en.mp4", None),
+        # Re-uploaded: the later uuid wins
+        ("/v/btc101_1.2_en.mp4", "f"),
+    ]
+    groups = group_by_course(videos)
+    assert list(groups) == [("btc101", "en"), ("btc101", "fr")]
+    assert [(i.part, i.chapter, i.uuid) for i in groups[("btc101", "en")]] == [
+        (1, 2, "f"), (1, 10, "b"), (2, 1, "a"),
+    ]
+
+def test_builder_creates_playlists_and_reruns_send_nothing(tmp_path):
+    with PeerTubeStub() as stub:
+        client = PeerTubeClient(StubConfig(stub.url))
+        names = ["btc101_2.1_en.mp4", "btc101_1.2_en.mp4", "btc101_1.1_en.mp4", "cyp201_1.1_fr.mp4"]
+        videos = [upload(client, tmp_path, name) for name in names]
+        builder = PlaylistBuilder(client, 7, jobs=2)
+        results = builder.sync(group_by_course(videos))
+        assert [(r.course, r.lang, r.created, r.added, r.moved, r.ok) for r in results] == [
+            ("btc101", "en", True, 3, 0, True),
+            ("cyp201", "fr", True, 1, 0, True),
+        ]
+        # Playlists are built in parallel, so they may be created in any order
+        assert sorted(p["displayName"] for p in stub.playlists) == ["BTC101 (en)", "CYP201 (fr)"]
+        btc = results[0].playlist_id
+        assert stub.playlist_names(btc) == [
+            "btc101_1.1_en.mp4", "btc101_1.2_en.mp4", "btc101_2.1_en.mp4",
+        ]
+
+        posts = stub.count("POST", f"/api/v1/video-playlists/{btc}/videos")
+        results = builder.sync(group_by_course(videos))
+        assert [(r.created, r.added) for r in results] == [(False, 0), (False, 0)]
+        assert stub.count("POST", f"/api/v1/video-playlists/{btc}/videos") == posts
+        assert len(stub.playlists) == 2
+
+def test_builder_inserts_missing_chapters_in_place(tmp_path):
+    with PeerTubeStub() as stub:
+        client = PeerTubeClient(StubConfig(stub.url))
+        first = [upload(client, tmp_path, n) for n in ("btc101_1.1_en.mp4", "btc101_1.3_en.mp4")]
+        builder = PlaylistBuilder(client, 7)
+        builder.sync(group_by_course(first))
+        # A chapter uploaded later lands between the existing ones
+        late = [upload(client, tmp_path, n) for n in ("btc101_1.2_en.mp4", "btc101_1.0_en.mp4", "btc101_1.4_en.mp4")]
+        [result] = builder.sync(group_by_course(first + late))
+        assert (result.created, result.added, result.moved) == (False, 3, 2)
+        assert stub.playlist_names(1) == [
+            "btc101_1.0_en.mp4", "btc101_1.1_en.mp4", "btc101_1.2_en.mp4",
+            "btc101_1.3_en.mp4", "btc101_1.4_en.mp4",
+        ]
+        assert stub.count("POST", "/api/v1/video-playlists/1/videos/reorder") == 2
+
+def test_builder_reports_videos_that_cannot_be_added(tmp_path):
+    with PeerTubeStub() as stub:
+        client = PeerTubeClient(StubConfig(stub.url))
+        videos = [upload(client, tmp_path, "btc101_1.1_en.mp4"), ("/v/btc101_1.2_en.mp4", "gone")]
+        [result] = PlaylistBuilder(client, 7).sync(group_by_course(videos))
+        assert not result.ok and result.error is None
+        assert [path for path, _ in result.failed] == ["/v/btc101_1.2_en.mp4"]
+        assert stub.playlist_names(1) == ["btc101_1.1_en.mp4"]
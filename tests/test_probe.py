@@ -0,0 +1,121 @@
+import struct
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+from peertube_uploader.cache import DiskCache
+from peertube_uploader.probe import MediaValidator, media_digest, probe_ffprobe, probe_mp4
+
+def box(kind, payload=b""):
+    return struct.pack(">I4s", 8 + len(payload), kind.encode()) + payload
+
+def trak(handler, codec, samples, width=0, height=0):
+    tkhd = box("tkhd", bytes(76) + struct.pack(">II", width << 16, height << 16))
+    hdlr = box("hdlr", bytes(8) + handler.encode() + bytes(12))
+    stsd = box("stsd", bytes(4) + struct.pack(">I", 1) + box(codec, bytes(70)))
+    stsz = box("stsz", bytes(8) + struct.pack(f">I{len(samples)}I", len(samples), *samples))
+    return box("trak", tkhd + box("mdia", hdlr + box("minf", box("stbl", stsd + stsz))))
+
+def mp4_bytes(width=1280, height=720, seconds=5, media=b"\0" * 1000, samples=(1000,), audio=None):
+    mvhd = box("mvhd", bytes(12) + struct.pack(">II", 1000, seconds * 1000) + bytes(80))
+    traks = trak("vide", "avc1", samples, width, height)
+    if audio is not None:
+        traks += trak("soun", "mp4a", audio)
+    moov = box("moov", mvhd + traks)
+    return box("ftyp", b"isom" + bytes(4)) + moov + box("mdat", media)
+
+def test_probe_mp4_reads_metadata(tmp_path):
+    path = tmp_path / "ok.mp4"
+    path.write_bytes(mp4_bytes())
+    info = probe_mp4(str(path))
+    assert info.valid
+    assert (info.duration, info.width, info.height, info.codec) == (5.0, 1280, 720, "avc1")
+
+def test_probe_mp4_detects_truncation(tmp_path):
+    data = mp4_bytes()
+    path = tmp_path / "cut.mp4"
+    path.write_bytes(data[:-200])
+    info = probe_mp4(str(path))
+    assert not info.valid
+    assert "'mdat'" in info.reason
+
+    # moov written last and never reached
+    path.write_bytes(box("ftyp", b"isom" + bytes(4)) + box("mdat", bytes(100)))
+    assert "moov" in probe_mp4(str(path)).reason
+
+    path.write_bytes(b"not a video at all")
+    assert not probe_mp4(str(path)).valid
+
+def test_media_digest_compares_video_and_audio_tracks(tmp_path):
+    paths = {}
+    for name, data in {
+        "en": mp4_bytes(samples=(500, 300), audio=(20, 21)),
+        "fr": mp4_bytes(samples=(500, 300), audio=(20, 21), media=b"\1" * 1000),
+        "dub": mp4_bytes(samples=(500, 300), audio=(22, 19)),
+        "other": mp4_bytes(samples=(400, 400), audio=(20, 21)),
+        "fragmented": mp4_bytes(samples=()),
+    }.items():
+        paths[name] = tmp_path / f"{name}.mp4"
+        paths[name].write_bytes(data)
+    digests = {name: media_digest(str(path)) for name, path in paths.items()}
+    assert digests["en"] is not None and digests["en"] == digests["fr"]
+    assert digests["dub"] != digests["en"]
+    assert digests["other"] != digests["en"]
+    assert digests["fragmented"] is None
+    assert media_digest(str(tmp_path / "missing.mp4")) is None
+
+def test_validator_keeps_order_and_caches(tmp_path, monkeypatch):
+    monkeypatch.setattr("peertube_uploader.probe.shutil.which", lambda name: None)
+    paths = []
+    for i in range(6):
+        path = tmp_path / f"v{i}.mp4"
+        path.write_bytes(mp4_bytes(width=100 + i) if i != 3 else b"broken")
+        paths.append(str(path))
+    cache = DiskCache(str(tmp_path / "probes"))
+    with ThreadPoolExecutor(2) as executor:
+        validator = MediaValidator(workers=1, cache=cache, executor=executor)
+        results = list(validator.check((p, f"fp{i}") for i, p in enumerate(paths)))
+    assert [p for p, _ in results] == paths
+    assert [info.valid for _, info in results] == [True, True, True, False, True, True]
+    assert results[5][1].width == 105
+    assert cache.get("fp5")["width"] == 105
+
+    # Cached results are used without probing the (now deleted) files
+    for path in paths:
+        (tmp_path / path).unlink()
+    results = list(MediaValidator(cache=cache).check((p, f"fp{i}") for i, p in enumerate(paths)))
+    assert [info.valid for _, info in results] == [True, True, True, False, True, True]
+
+def test_probe_ffprobe_reports_bad_output_as_invalid(tmp_path, monkeypatch):
+    outputs = [(0, ""), (0, "{\"streams\": [tru"), (0, "[]"), (1, "")]
+
+    def run(cmd, **kwargs):
+        code, stdout = outputs.pop(0)
+        return subprocess.CompletedProcess(cmd, code, stdout, "")
+    monkeypatch.setattr("peertube_uploader.probe.subprocess.run", run)
+    path = str(tmp_path / "video.mp4")
+    reasons = [probe_ffprobe(path).reason for _ in range(4)]
+    assert reasons[0] == "No video stream"
+    assert reasons[1].startswith("Unreadable ffprobe output")
+    assert reasons[2].startswith("Unreadable ffprobe output")
+    assert reasons[3] == "ffprobe exited with status 1"
+
+def test_transient_failures_are_probed_again(tmp_path, monkeypatch):
+    monkeypatch.setattr("peertube_uploader.probe.shutil.which", lambda name: "/usr/bin/ffprobe")
+    replies = [None, '{"streams": [{"codec_type": "video"}], "format": {"duration": "5"}}']
+
+    def run(cmd, **kwargs):
+        stdout = replies.pop(0)
+        if stdout is None:
+            raise subprocess.TimeoutExpired(cmd, kwargs["timeout"])
+        return subprocess.CompletedProcess(cmd, 0, stdout, "")
+    monkeypatch.setattr("peertube_uploader.probe.subprocess.run", run)
+    path = tmp_path / "video.mkv"
+    path.write_bytes(b"data")
+    cache = DiskCache(str(tmp_path / "probes"))
+    with ThreadPoolExecutor(1) as executor:
+        for expected in (False, True):
+            validator = MediaValidator(workers=1, cache=cache, executor=executor)
+            [(_, info)] = validator.check([(str(path), "fp")])
+            assert info.valid is expected
+    assert replies == []
+    assert cache.get("fp")["valid"]
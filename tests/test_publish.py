@@ -0,0 +1,85 @@
+import threading
+import time
+
+from peertube_uploader.client import PeerTubeClient
+from peertube_uploader.publish import PublishStatus, PublishWatcher
+from peertube_uploader.session import HttpSession, RetryPolicy
+
+from .peertube_stub import PeerTubeStub, StubConfig
+
+def _upload(client, tmp_path, count):
+    uuids = []
+    for i in range(count):
+        video = tmp_path / f"video{i}.mp4"
+        video.write_bytes(b"data")
+        uuids.append(client.upload_video(str(video), f"Title {i}")["video"]["uuid"])
+    return uuids
+
+def test_wait_until_published_reports_ready_and_failed(tmp_path):
+    with PeerTubeStub() as stub:
+        stub.initial_state = 2
+        client = PeerTubeClient(StubConfig(stub.url))
+        uuids = _upload(client, tmp_path, 3)
+
+        def finish():
+            time.sleep(0.2)
+            stub.set_state(uuids[0], 1)
+            stub.set_state(uuids[1], 1)
+            stub.set_state(uuids[2], 7)
+        threading.Thread(target=finish).start()
+
+        statuses = client.wait_until_published(uuids, timeout=10, min_interval=0.05)
+        assert [statuses[u].ready for u in uuids] == [True, True, False]
+        assert statuses[uuids[2]].failed
+        assert statuses[uuids[2]].label == "Transcoding failed"
+        # All lookups were batched into list queries
+        assert stub.count("GET", f"/api/v1/videos/{uuids[0]}") == 0
+        assert stub.count("GET", "/api/v1/users/me/videos") >= 2
+
+def test_move_to_file_system_failure_is_terminal():
+    status = PublishStatus("uuid", 11, "Move to file system failed")
+    assert status.failed and not status.pending
+
+def test_unknown_video_is_looked_up_and_failed(tmp_path):
+    with PeerTubeStub() as stub:
+        client = PeerTubeClient(StubConfig(stub.url))
+        statuses = client.wait_until_published(["missing"], timeout=5, min_interval=0.01)
+        assert statuses["missing"].failed
+        assert statuses["missing"].state is None
+        assert stub.count("GET", "/api/v1/videos/missing") == 1
+
+def test_timeout_leaves_video_pending_and_backs_off(tmp_path):
+    with PeerTubeStub() as stub:
+        stub.initial_state = 2
+        client = PeerTubeClient(StubConfig(stub.url))
+        watcher = PublishWatcher(client, min_interval=0.01, max_interval=0.04, backoff=2)
+        watcher.track(_upload(client, tmp_path, 1)[0])
+        statuses = watcher.wait(timeout=0.5)
+        assert all(s.pending for s in statuses.values())
+        assert watcher.interval == 0.04
+
+def test_watcher_gives_up_after_failed_polls_in_a_row(tmp_path):
+    with PeerTubeStub() as stub:
+        stub.initial_state = 2
+        client = PeerTubeClient(StubConfig(stub.url), session=HttpSession(retry=RetryPolicy(max_retries=0)))
+        uuid = _upload(client, tmp_path, 1)[0]
+        stub.errors = [500] * 10
+        errors = []
+        watcher = PublishWatcher(client, min_interval=0.01, max_errors=3, on_error=errors.append)
+        watcher.track(uuid)
+        started = time.monotonic()
+        statuses = watcher.wait(timeout=30)
+        assert time.monotonic() - started < 5
+        assert statuses[uuid].pending
+        assert watcher.gave_up and len(errors) == 3
+        assert "500" in str(watcher.last_error)
+
+def test_tracking_while_uploading(tmp_path):
+    with PeerTubeStub() as stub:
+        client = PeerTubeClient(StubConfig(stub.url))
+        watcher = PublishWatcher(client, min_interval=0.01).start()
+        for uuid in _upload(client, tmp_path, 4):
+            watcher.track(uuid)
+        statuses = watcher.wait(timeout=5)
+        assert len(statuses) == 4
+        assert all(s.ready for s in statuses.values())
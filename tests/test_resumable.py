@@ -0,0 +1,102 @@
+import os
+import pytest
+import requests
+
+from peertube_uploader.client import PeerTubeClient
+from peertube_uploader.resumable import AdaptiveChunkSizer, ResumableStateStore, parse_range_offset
+from peertube_uploader.throttle import BandwidthLimiter
+
+from .peertube_stub import PeerTubeStub, StubConfig
+
+@pytest.fixture
+def video(tmp_path):
+    path = tmp_path / "btc101_1.1_en.mp4"
+    path.write_bytes(os.urandom(100_000))
+    return path
+
+def test_parse_range_offset():
+    assert parse_range_offset(None) == 0
+    assert parse_range_offset("bytes=0-1023") == 1024
+
+def test_resumable_upload_survives_mid_chunk_disconnects(tmp_path, video):
+    store = ResumableStateStore(str(tmp_path / "state"))
+    with PeerTubeStub() as stub:
+        stub.disconnects = 2
+        client = PeerTubeClient(StubConfig(stub.url))
+        result = client.upload_video_resumable(
+            str(video), "Title", chunk_size=16_384, state_store=store
+        )
+        session = next(iter(stub.sessions.values()))
+        assert bytes(session["data"]) == video.read_bytes()
+        assert stub.count("POST", "/api/v1/videos/upload-resumable") == 1
+    assert result["video"]["id"] == 1
+    assert store.load(str(video)) is None
+
+def test_resumable_upload_resumes_after_crash(tmp_path, video):
+    store = ResumableStateStore(str(tmp_path / "state"))
+    with PeerTubeStub() as stub:
+        client = PeerTubeClient(StubConfig(stub.url))
+        # First run gives up on the first dropped connection, like a crash
+        stub.disconnects = 1
+        with pytest.raises(requests.exceptions.ConnectionError):
+            client.upload_video_resumable(
+                str(video), "Title", chunk_size=40_000, state_store=store, max_retries=0
+            )
+        assert store.load(str(video)) is not None
+
+        # Rerun with a fresh client picks up the existing session
+        client = PeerTubeClient(StubConfig(stub.url))
+        client.upload_video_resumable(str(video), "Title", chunk_size=40_000, state_store=store)
+        session = next(iter(stub.sessions.values()))
+        assert bytes(session["data"]) == video.read_bytes()
+        assert stub.count("POST", "/api/v1/videos/upload-resumable") == 1
+        assert len(stub.videos) == 1
+
+def test_resumable_upload_gives_up_when_the_offset_stops_moving(tmp_path, video):
+    store = ResumableStateStore(str(tmp_path / "state"))
+    with PeerTubeStub() as stub:
+        client = PeerTubeClient(StubConfig(stub.url))
+        stub.accept_chunks = False
+        with pytest.raises(Exception, match="stopped accepting data at byte 0"):
+            client.upload_video_resumable(
+                str(video), "Title", chunk_size=40_000, state_store=store, max_retries=2
+            )
+        # The first try plus two retries
+        assert stub.count("PUT", "/api/v1/videos/upload-resumable") == 3
+        assert store.load(str(video)) is not None
+
+def test_adaptive_chunk_sizer_follows_throughput_and_rtt():
+    mib = 1024 * 1024
+    sizer = AdaptiveChunkSizer(initial=4 * mib, minimum=mib, maximum=64 * mib, target_seconds=2.0)
+    sizer.observe_rtt(0.05)
+    sizer.observe_rtt(0.2)
+    assert sizer.rtt == 0.05
+    # Fast link: grows by at most 2x per chunk up to the maximum
+    sizes = [sizer.record(sizer.size, 0.05 + sizer.size / (40 * mib)) for _ in range(6)]
+    assert sizes == [8 * mib, 16 * mib, 32 * mib, 64 * mib, 64 * mib, 64 * mib]
+    # Slow link: shrinks toward 2 s worth of data
+    for _ in range(20):
+        sizer.record(sizer.size, 0.05 + sizer.size / mib)
+    assert 2 * mib <= sizer.size <= 3 * mib
+    assert sizer.failed() < 2 * mib
+    # High latency keeps the round trip under 5% of a chunk's time
+    slow_rtt = AdaptiveChunkSizer(initial=mib, maximum=256 * mib, target_seconds=2.0)
+    slow_rtt.observe_rtt(1.0)
+    for _ in range(10):
+        slow_rtt.record(slow_rtt.size, 1.0 + slow_rtt.size / mib)
+    assert slow_rtt.size >= 15 * mib
+
+def test_resumable_upload_with_adaptive_chunks(tmp_path, video):
+    store = ResumableStateStore(str(tmp_path / "state"))
+    sizer = AdaptiveChunkSizer(initial=16_384, minimum=16_384, target_seconds=0.05, granularity=4096)
+    with PeerTubeStub() as stub:
+        # The limiter makes the link speed (and so the chunk sizes) predictable
+        limiter = BandwidthLimiter(1_000_000, burst=4096)
+        client = PeerTubeClient(StubConfig(stub.url), limiter=limiter)
+        client.upload_video_resumable(str(video), "Title", state_store=store, chunk_sizer=sizer)
+        session = next(iter(stub.sessions.values()))
+        assert bytes(session["data"]) == video.read_bytes()
+        # 100 KB in growing chunks instead of seven fixed 16 KB ones
+        assert stub.count("PUT", "/api/v1/videos/upload-resumable") <= 5
+    # About 50 ms worth of data at 1 MB/s
+    assert 36_000 <= sizer.size <= 64_000
@@ -0,0 +1,67 @@
+import gc
+import threading
+import time
+import weakref
+
+from peertube_uploader.scheduler import UploadScheduler
+
+def test_scheduler_bounds_concurrency_and_keeps_order():
+    lock = threading.Lock()
+    state = {"active": 0, "peak": 0}
+
+    def upload(idx, path):
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        time.sleep(0.02)
+        with lock:
+            state["active"] -= 1
+        if path == "bad.mp4":
+            raise Exception("boom")
+        return {"path": path}
+
+    seen = []
+    files = [f"{i}.mp4" for i in range(10)] + ["bad.mp4"]
+    results = UploadScheduler(upload, jobs=3, on_result=seen.append).run(files)
+    assert state["peak"] == 3
+    assert [r.path for r in results] == files
+    assert [r.index for r in results] == list(range(1, 12))
+    assert not results[-1].ok and str(results[-1].error) == "boom"
+    assert all(r.ok for r in results[:-1])
+    assert len(seen) == 11
+
+def test_scheduler_can_run_without_keeping_results():
+    class Response(dict):
+        pass
+
+    responses = []
+
+    def upload(idx, path):
+        response = Response(path=path)
+        responses.append(weakref.ref(response))
+        return response
+
+    seen = []
+    results = UploadScheduler(upload, jobs=2, on_result=lambda r: seen.append(r.path)).run(
+        (f"{i}.mp4" for i in range(50)), keep_results=False
+    )
+    gc.collect()
+    assert results == []
+    assert sorted(seen) == sorted(f"{i}.mp4" for i in range(50))
+    # Nothing holds on to finished uploads
+    assert all(ref() is None for ref in responses)
+
+def test_prefetch_streams_items_and_reraises():
+    from peertube_uploader.scheduler import prefetch
+
+    def produce():
+        yield from range(5)
+        raise ValueError("scan failed")
+
+    seen = []
+    try:
+        for item in prefetch(produce(), buffer=2):
+            seen.append(item)
+    except ValueError as exc:
+        assert str(exc) == "scan failed"
+    assert seen == [0, 1, 2, 3, 4]
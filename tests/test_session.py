@@ -0,0 +1,65 @@
+import time
+
+import requests
+
+from peertube_uploader.client import PeerTubeClient
+from peertube_uploader.session import HttpSession, RetryPolicy
+
+from .peertube_stub import PeerTubeStub, StubConfig
+
+def _response(headers):
+    resp = requests.Response()
+    resp.headers.update(headers)
+    return resp
+
+def test_retry_policy_delay():
+    policy = RetryPolicy(backoff_factor=1.0, max_backoff=5.0)
+    assert policy.delay(0, _response({"Retry-After": "3"})) == 3.0
+    assert policy.delay(0, _response({"Retry-After": "120"})) == 5.0
+    for attempt in range(6):
+        assert 0 <= policy.delay(attempt) <= min(5.0, 2 ** attempt)
+
+def test_session_reuses_connections_and_retries():
+    with PeerTubeStub() as stub:
+        session = HttpSession(retry=RetryPolicy(backoff_factor=0.01))
+        client = PeerTubeClient(StubConfig(stub.url), session=session)
+        stub.errors = [503, 429]
+        assert client.get_user_info(refresh=True)["username"] == "user"
+        assert client.get_user_info(refresh=True)["username"] == "user"
+        stats = session.stats()
+    # token request retried twice, then 2 users/me, all on one keep-alive connection
+    assert stub.count("POST", "/api/v1/users/token") == 3
+    assert stats["requests"] == 5
+    assert stats["retries"] == 2
+    assert stats["connections"] == 1
+    assert stats["handshakes_saved"] == 4
+
+def test_posts_are_retried_only_when_not_processed(tmp_path):
+    with PeerTubeStub() as stub:
+        session = HttpSession(retry=RetryPolicy(backoff_factor=0.01))
+        stub.errors = [500]
+        assert session.post(f"{stub.url}/api/v1/users/token", retry=True).status_code == 500
+        stub.errors = [500]
+        assert session.get(f"{stub.url}/api/v1/users/me").status_code != 500
+        stub.errors = [429, 503]
+        assert session.post(f"{stub.url}/api/v1/users/token").status_code == 429
+        assert session.post(f"{stub.url}/api/v1/users/token", retry=True).status_code == 200
+        assert stub.count("POST", "/api/v1/users/token") == 4
+        assert session.stats()["retries"] == 2
+
+def test_stub_bandwidth_and_error_rate(tmp_path):
+    video = tmp_path / "v.mp4"
+    video.write_bytes(b"\0" * 400_000)
+    with PeerTubeStub() as stub:
+        stub.bandwidth = 1_000_000
+        stub.keep_data = False
+        stub.error_rate = 0.5
+        session = HttpSession(retry=RetryPolicy(max_retries=10, backoff_factor=0.01))
+        client = PeerTubeClient(StubConfig(stub.url), session=session)
+        start = time.monotonic()
+        client.upload_video(str(video), "Title")
+        elapsed = time.monotonic() - start
+        assert stub.videos[0]["size"] >= 400_000
+        assert session.stats()["retries"] > 0
+    # The body is read at 1 MB/s
+    assert elapsed >= 0.35
@@ -0,0 +1,65 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Cumulative import time allowed for the CLI module (best of a few runs)
+IMPORT_BUDGET_US = 60_000
+HEAVY_MODULES = ("requests", "urllib3", "aiohttp", "concurrent.futures.process", "dotenv")
+
+def run_python(code, cwd=ROOT, *flags):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code], cwd=cwd, env=env,
+        capture_output=True, text=True, check=True,
+    )
+
+def cli_import_us():
+    proc = run_python("import upload_folder_peertube", ROOT, "-X", "importtime")
+    for line in proc.stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == "upload_folder_peertube":
+            return int(fields[1])
+    raise AssertionError(proc.stderr[-2000:])
+
+def test_cli_import_time_budget():
+    best = min(cli_import_us() for _ in range(3))
+    assert best <= IMPORT_BUDGET_US, f"CLI import took {best / 1000:.1f} ms"
+
+def test_cli_import_skips_heavy_modules():
+    code = (
+        "import sys, upload_folder_peertube\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    assert run_python(code).stdout.strip() == ""
+
+def test_config_reads_env_file_only_on_demand(tmp_path):
+    (tmp_path / ".env").write_text("PTU_STARTUP_TEST='one'\n", encoding="utf-8")
+    code = (
+        "import os\n"
+        "from peertube_uploader.config import load_env\n"
+        "print(os.environ.get('PTU_STARTUP_TEST'))\n"
+        "print(load_env(), os.environ.get('PTU_STARTUP_TEST'))\n"
+        "open('.env', 'w').write('PTU_STARTUP_TEST=two')\n"
+        "print(load_env(), os.environ.get('PTU_STARTUP_TEST'))\n"
+    )
+    assert run_python(code, str(tmp_path)).stdout.split("\n")[:3] == ["None", "True one", "True one"]
+
+def run_cli(tmp_path, *args):
+    # No configuration: neither .env nor credentials in the environment
+    env = {"PATH": os.environ.get("PATH", ""), "PYTHONPATH": ROOT}
+    return subprocess.run(
+        [sys.executable, os.path.join(ROOT, "upload_folder_peertube.py"), *args],
+        cwd=str(tmp_path), env=env, capture_output=True, text=True,
+    )
+
+def test_cli_parses_arguments_before_loading_config(tmp_path):
+    for command in ([], ["plan"], ["execute"], ["fanout"], ["watch"], ["queue"], ["worker"], ["playlists"]):
+        proc = run_cli(tmp_path, *command, "--help")
+        assert proc.returncode == 0, proc.stderr
+    proc = run_cli(tmp_path, str(tmp_path), "--jobs", "0")
+    assert proc.returncode == 2
+    assert "--jobs must be at least 1" in proc.stderr
+    proc = run_cli(tmp_path, str(tmp_path))
+    assert proc.returncode == 1
+    assert "Configuration error" in proc.stderr
@@ -0,0 +1,119 @@
+import os
+import threading
+import time
+
+import pytest
+
+from peertube_uploader.throttle import BandwidthLimiter, RateControl, ThrottledBody, parse_rate
+
+from .throttled_socket import ThrottledSocketServer
+
+def test_parse_rate():
+    assert parse_rate("500") == 500
+    assert parse_rate("2K") == 2048
+    assert parse_rate("1.5M") == int(1.5 * 1024 * 1024)
+    assert parse_rate("1GB") == 1024 ** 3
+    with pytest.raises(ValueError):
+        parse_rate("")
+
+def test_limiter_caps_total_rate_across_threads():
+    limiter = BandwidthLimiter(200_000, burst=10_000)
+
+    def send():
+        for _ in range(10):
+            limiter.consume(10_000)
+
+    start = time.monotonic()
+    threads = [threading.Thread(target=send) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.monotonic() - start
+    # 400 KB at 200 KB/s, less the initial 10 KB burst
+    assert 1.8 <= elapsed <= 2.4
+
+def send_through(server, limiter, total, piece=16_384):
+    with server.connect() as sock:
+        for _ in range(total // piece):
+            limiter.consume(piece)
+            sock.sendall(b"x" * piece)
+
+def test_limiter_holds_target_over_throttled_socket():
+    # Link is 4x faster than the cap, so the cap is what the sink observes
+    with ThrottledSocketServer(capacity=4_000_000) as server:
+        limiter = BandwidthLimiter(1_000_000, burst=16_384)
+        threads = [threading.Thread(target=send_through, args=(server, limiter, 400_000)) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        deadline = time.monotonic() + 2
+        while server.received() < 3 * (400_000 // 16_384) * 16_384 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        rate = server.rate(skip=16_384)
+    assert 0.9 * 1_000_000 <= rate <= 1.1 * 1_000_000
+
+def test_slow_link_caps_rate_below_limiter():
+    with ThrottledSocketServer(capacity=500_000) as server:
+        send_through(server, BandwidthLimiter(4_000_000), 600_000)
+        deadline = time.monotonic() + 3
+        while server.received() < (600_000 // 16_384) * 16_384 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        rate = server.rate(skip=64_000)
+    assert rate <= 1.15 * 500_000
+
+def test_set_rate_retimes_waiting_callers():
+    limiter = BandwidthLimiter(100_000, burst=1)
+    done = threading.Event()
+    thread = threading.Thread(target=lambda: (limiter.consume(100_000), done.set()))
+    start = time.monotonic()
+    thread.start()
+    time.sleep(0.1)
+    assert not done.is_set()
+    limiter.set_rate(None)
+    assert done.wait(1)
+    assert time.monotonic() - start < 0.5
+
+    limiter.set_rate(50_000, burst=1)
+    start = time.monotonic()
+    limiter.consume(25_000)
+    assert 0.4 <= time.monotonic() - start <= 0.7
+    with pytest.raises(ValueError):
+        limiter.set_rate(0)
+
+def test_throttled_body_paces_pieces():
+    limiter = BandwidthLimiter(400_000, burst=40_000)
+    body = ThrottledBody(b"y" * 200_000, limiter, piece_size=40_000)
+    assert len(body) == 200_000
+    start = time.monotonic()
+    assert b"".join(bytes(p) for p in body) == b"y" * 200_000
+    # 160 KB beyond the burst at 400 KB/s
+    assert 0.35 <= time.monotonic() - start <= 0.6
+
+def test_rate_control_file(tmp_path):
+    control_file = tmp_path / "rate"
+    limiter = BandwidthLimiter(1_000_000)
+    messages = []
+    control = RateControl(limiter, str(control_file), on_change=messages.append)
+    assert not control.poll()
+
+    control_file.write_text("2M\n")
+    assert control.poll()
+    assert limiter.rate == 2 * 1024 * 1024
+    assert not control.poll()
+
+    control_file.write_text("off")
+    os.utime(control_file, ns=(1, 1))
+    assert control.poll()
+    assert limiter.rate is None
+
+    control_file.write_text("fast please")
+    os.utime(control_file, ns=(2, 2))
+    assert not control.poll()
+    assert limiter.rate is None
+    assert "Ignoring invalid rate" in messages[-1]
+
+    limiter.set_rate(1000)
+    control.scale(2.0)
+    assert limiter.rate == 2000
@@ -0,0 +1,44 @@
+import threading
+
+from peertube_uploader.session import HttpSession
+from peertube_uploader.token_manager import TokenManager
+from peertube_uploader.token_store import TokenStore
+
+from .peertube_stub import PeerTubeStub, StubConfig
+
+def test_concurrent_callers_share_one_token_request():
+    with PeerTubeStub() as stub:
+        stub.latency = 0.05
+        manager = TokenManager(StubConfig(stub.url))
+        tokens = []
+        threads = [threading.Thread(target=lambda: tokens.append(manager.get_valid_token())) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert stub.token_grants == 1
+        assert set(tokens) == {"access-1"}
+
+def test_token_refreshed_before_expiry(monkeypatch):
+    import peertube_uploader.token_manager as token_manager
+
+    with PeerTubeStub() as stub:
+        stub.token_ttl = 100
+        manager = TokenManager(StubConfig(stub.url), refresh_margin=10)
+        assert manager.get_valid_token() == "access-1"
+        now = token_manager.time.time()
+        monkeypatch.setattr(token_manager.time, "time", lambda: now + 85)
+        assert manager.get_valid_token() == "access-1"
+        # Still valid for 5 seconds, but within the margin: refresh proactively
+        monkeypatch.setattr(token_manager.time, "time", lambda: now + 95)
+        assert manager.get_valid_token() == "access-2"
+        assert stub.token_grants == 2
+
+def test_token_store_shared_between_managers(tmp_path):
+    with PeerTubeStub() as stub:
+        cfg = StubConfig(stub.url)
+        store_dir = str(tmp_path / "tokens")
+        first = TokenManager(cfg, HttpSession(), TokenStore(cfg.instance_url, cfg.username, store_dir))
+        second = TokenManager(cfg, HttpSession(), TokenStore(cfg.instance_url, cfg.username, store_dir))
+        assert first.get_valid_token() == second.get_valid_token() == "access-1"
+        assert stub.token_grants == 1
@@ -7,6 +7,8 @@ from peertube_uploader.utils import (
     extract_part_chapter,
     extract_language,
     get_chapter_name,
+    parse_filename,
+    parse_filenames,
 )
 
 def test_generate_title(tmp_path):
@@ -37,6 +39,23 @@ def test_extract_language():
     assert extract_language('cyp201_4.7_fr_test.txt') == 'fr'
     assert extract_language('cyp201_1.1_Loic_en-US.mp4') == 'en'
 
+def test_parse_filename():
+    assert parse_filename('btc101_2.1_es.mp4') == ('btc101', 2, 1, 'es', None)
+    assert parse_filename('/path/to/ECO201-3.2-fr.MP4') == ('eco201', 3, 2, 'fr', None)
+    assert parse_filename('cyp201_1.1_Loic_en-US.mp4') == ('cyp201', 1, 1, 'en', 'US')
+    assert parse_filename('intro.mp4') == (None, None, None, None, None)
+
+def test_parse_filename_matches_extract_functions():
+    names = [
+        'btc101_2.1_es.txt', 'btc101_2.1-es.txt', 'cyp201_4.7_fr_test.txt',
+        'cyp201_1.1_Loic_en-US.mp4', 'btc101_1.1_en_US.mp4', '/a/b/lnp201-5.2-es.mp4',
+    ]
+    for name, info in zip(names, parse_filenames(names)):
+        assert info == parse_filename(name)
+        assert info.course == extract_course_index(name)
+        assert (info.part, info.chapter) == extract_part_chapter(name)
+        assert info.lang == extract_language(name)
+
 def test_get_chapter_name(tmp_path, monkeypatch):
     import textwrap
     # Set required environment variables for Config
@@ -105,3 +124,22 @@ def test_get_chapter_name(tmp_path, monkeypatch):
     assert get_chapter_name('btc101', (3, 1), 'en') == 'What are Bitcoin wallets?'
     assert get_chapter_name('btc101', (3, 1), 'fr') == "Qu'est-ce qu'un portefeuille Bitcoin ?"
     assert get_chapter_name('lnp201', (5, 2), 'es') == 'Gestionando Tu Liquidez'
+
+def test_get_chapter_name_reads_config_once(tmp_path, monkeypatch):
+    (tmp_path / 'btc101').mkdir()
+    (tmp_path / 'btc101' / 'en.md').write_text('+++\n+++\n# Part 1\n## Intro\n## Setup\n', encoding='utf-8')
+    for name in ('UPLOAD_URL', 'PEERTUBE_INSTANCE', 'CLIENT_ID', 'CLIENT_SECRET', 'USERNAME', 'PASSWORD'):
+        monkeypatch.setenv(name, 'x')
+    monkeypatch.setenv('PATH_TO_COURSES', str(tmp_path))
+    import peertube_uploader.utils as utils
+    built = []
+    real_config = utils.Config
+    monkeypatch.setattr(utils, 'Config', lambda: built.append(1) or real_config())
+    utils._default_course_path.cache_clear()
+    try:
+        assert utils.get_chapter_name('btc101', (1, 1), 'en') == 'Intro'
+        assert utils.get_chapter_name('btc101', (1, 2), 'en') == 'Setup'
+        assert utils.get_chapter_name('btc101', (1, 2), 'en', course_path=str(tmp_path)) == 'Setup'
+    finally:
+        utils._default_course_path.cache_clear()
+    assert len(built) == 1
@@ -0,0 +1,162 @@
+import threading
+import time
+
+import pytest
+
+from peertube_uploader.finder import ScanIndex
+from peertube_uploader.watch import CompletenessTracker, FolderWatcher, Inotify, UploadQueue
+
+def inotify_available():
+    try:
+        Inotify().close()
+    except OSError:
+        return False
+    return True
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+def test_tracker_waits_for_stable_size(tmp_path):
+    path = tmp_path / "a.mp4"
+    path.write_bytes(b"x" * 10)
+    tracker = CompletenessTracker(settle=0.05, stable_seconds=0.2)
+    tracker.observe(str(path))
+    assert tracker.check() == []
+    time.sleep(0.1)
+    with open(path, "ab") as f:
+        f.write(b"more")
+    assert tracker.check() == []
+    assert wait_for(lambda: tracker.check() == [str(path)])
+    # Reported once, until it changes again
+    tracker.observe(str(path))
+    assert len(tracker) == 0
+
+def test_tracker_close_write_completes_after_settle(tmp_path):
+    path = tmp_path / "a.mp4"
+    path.write_bytes(b"x" * 10)
+    tracker = CompletenessTracker(settle=0.05, stable_seconds=60)
+    tracker.observe(str(path), closed=True)
+    time.sleep(0.06)
+    assert tracker.check() == [str(path)]
+
+def test_tracker_ignores_empty_files(tmp_path):
+    path = tmp_path / "a.mp4"
+    path.write_bytes(b"")
+    tracker = CompletenessTracker(settle=0, stable_seconds=0)
+    tracker.observe(str(path), closed=True)
+    assert tracker.check() == []
+
+def test_queue_persists_and_retries(tmp_path):
+    queue_path = str(tmp_path / "queue.json")
+    queue = UploadQueue(queue_path)
+    assert queue.put("/v/a.mp4")
+    assert queue.put("/v/b.mp4")
+    assert not queue.put("/v/a.mp4")
+    assert queue.get(timeout=0) == "/v/a.mp4"
+    assert queue.get(timeout=0) == "/v/b.mp4"
+    assert queue.get(timeout=0) is None
+    assert queue.retry("/v/a.mp4", delay=1.0) == 1
+    queue.done("/v/b.mp4")
+
+    # In-flight and retried files are still there after a restart
+    reloaded = UploadQueue(queue_path)
+    assert len(reloaded) == 1
+    assert reloaded.get(timeout=0) is None
+    assert reloaded.get(timeout=3) == "/v/a.mp4"
+
+def test_queue_close_wakes_waiting_workers(tmp_path):
+    queue = UploadQueue(str(tmp_path / "queue.json"))
+    results = []
+    worker = threading.Thread(target=lambda: results.append(queue.get()))
+    worker.start()
+    queue.close()
+    worker.join(timeout=2)
+    assert results == [None]
+
+@pytest.mark.parametrize("use_inotify", [True, False])
+def test_watcher_reports_finished_files_only(tmp_path, use_inotify):
+    if use_inotify and not inotify_available():
+        pytest.skip("inotify not available")
+    existing = tmp_path / "old.mp4"
+    existing.write_bytes(b"old")
+    ready = []
+    watcher = FolderWatcher(
+        str(tmp_path), ready.append, settle=0.05, stable_seconds=0.5,
+        poll_interval=0.05, use_inotify=use_inotify,
+    ).start()
+    try:
+        assert watcher.mode == ("inotify" if use_inotify else "polling")
+        assert wait_for(lambda: str(existing) in ready)
+        subdir = tmp_path / "render" / "btc101"
+        subdir.mkdir(parents=True)
+        time.sleep(0.2)
+        partial = subdir / "partial.mp4"
+        stop = threading.Event()
+
+        def write_slowly():
+            with open(partial, "wb") as f:
+                while not stop.is_set():
+                    f.write(b"frame")
+                    f.flush()
+                    time.sleep(0.05)
+
+        writer = threading.Thread(target=write_slowly)
+        writer.start()
+        finished = subdir / "done.mp4"
+        finished.write_bytes(b"frames")
+        assert wait_for(lambda: str(finished) in ready)
+        time.sleep(0.6)
+        # A file still being written is not reported
+        assert str(partial) not in ready
+        stop.set()
+        writer.join()
+        assert wait_for(lambda: str(partial) in ready)
+    finally:
+        watcher.close()
+    assert sorted(ready) == sorted([str(existing), str(finished), str(partial)])
+
+def test_polling_with_scan_index_reports_each_change_once(tmp_path):
+    videos = tmp_path / "videos"
+    videos.mkdir()
+    path = videos / "a.mp4"
+    path.write_bytes(b"x" * 10)
+    ready = []
+    watcher = FolderWatcher(
+        str(videos), ready.append, settle=0.05, stable_seconds=0.2,
+        poll_interval=0.05, use_inotify=False, index=ScanIndex(str(tmp_path / "index.json")),
+    ).start()
+    try:
+        assert wait_for(lambda: ready == [str(path)])
+        # Rewritten in place: the directory mtime, and so the index, is unchanged
+        with open(path, "ab") as f:
+            f.write(b"more")
+        assert wait_for(lambda: len(ready) == 2)
+        time.sleep(0.8)
+    finally:
+        watcher.close()
+    assert ready == [str(path)] * 2
+
+@pytest.mark.parametrize("use_inotify", [True, False])
+def test_watcher_keeps_nothing_about_reported_files(tmp_path, use_inotify):
+    if use_inotify and not inotify_available():
+        pytest.skip("inotify not available")
+    ready = []
+    watcher = FolderWatcher(
+        str(tmp_path), ready.append, settle=0.05, stable_seconds=0.2,
+        poll_interval=0.05, use_inotify=use_inotify,
+    ).start()
+    try:
+        paths = [tmp_path / f"v{i}.mp4" for i in range(3)]
+        for path in paths:
+            path.write_bytes(b"frames")
+        assert wait_for(lambda: len(ready) == 3)
+        time.sleep(0.5)
+        assert sorted(ready) == sorted(str(p) for p in paths)
+        assert watcher.tracker._complete == {} and len(watcher.tracker) == 0
+    finally:
+        watcher.close()
@@ -0,0 +1,93 @@
+"""
+Local TCP sink with a capped link speed, for bandwidth tests.
+"""
+import socket
+import threading
+import time
+from typing import Any, List, Optional, Tuple
+
+
+class ThrottledSocketServer:
+    """
+    Accept connections and read them at most ``capacity`` bytes/s in total,
+    logging when each piece arrives. Use as a context manager.
+
+    The receive buffer is kept small so the kernel cannot absorb a burst:
+    arrival times track what a sender manages to push through the link.
+    """
+    def __init__(self, capacity: Optional[float] = None, recv_size: int = 16 * 1024) -> None:
+        self.capacity: Optional[float] = capacity
+        self.recv_size: int = recv_size
+        self.arrivals: List[Tuple[float, int]] = []
+        self._lock = threading.Lock()
+        self._allowed_at: float = time.monotonic()
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, recv_size)
+        self._sock.bind(("127.0.0.1", 0))
+        self._sock.listen()
+        self._threads: List[threading.Thread] = []
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._sock.getsockname()
+
+    def connect(self) -> socket.socket:
+        sock = socket.create_connection(self.address)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.recv_size)
+        return sock
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            thread = threading.Thread(target=self._read, args=(conn,), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _read(self, conn: socket.socket) -> None:
+        with conn:
+            while True:
+                data = conn.recv(self.recv_size)
+                if not data:
+                    return
+                now = time.monotonic()
+                with self._lock:
+                    self.arrivals.append((now, len(data)))
+                    if self.capacity:
+                        # Hold the link busy for as long as these bytes take
+                        self._allowed_at = max(self._allowed_at, now) + len(data) / self.capacity
+                        wait = self._allowed_at - now
+                    else:
+                        wait = 0.0
+                if wait > 0:
+                    time.sleep(wait)
+
+    def received(self) -> int:
+        with self._lock:
+            return sum(n for _, n in self.arrivals)
+
+    def rate(self, skip: int = 0) -> float:
+        """
+        Average bytes/s between the first and last arrivals, ignoring the
+        first ``skip`` bytes (an initial burst allowance).
+        """
+        with self._lock:
+            arrivals = list(self.arrivals)
+        seen = 0
+        while arrivals and seen < skip:
+            seen += arrivals.pop(0)[1]
+        if len(arrivals) < 2:
+            return 0.0
+        elapsed = arrivals[-1][0] - arrivals[0][0]
+        return sum(n for _, n in arrivals[1:]) / elapsed
+
+    def __enter__(self) -> "ThrottledSocketServer":
+        threading.Thread(target=self._accept, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._sock.close()
+        for thread in self._threads:
+            thread.join(timeout=5)